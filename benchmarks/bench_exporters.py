@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+
+''' Throughput of the export formats.
+
+Exports synthetic players with every available exporter and reads the
+file back the way an analytics tool would, so the formats can be compared
+by the write speed, the load speed and the file size.
+
+    python benchmarks/bench_exporters.py --rows 100000 --output results.json
+'''
+
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+import platform
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from model.player import Player
+from model.player_profile import PlayerProfile
+from misc.exporters import exporters, available_formats
+
+try:
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+class FakePlayersManager:
+    ''' PlayersManager replacement serving synthetic players with profiles. '''
+
+    def __init__(self, row_count):
+        self.players = [Player('Player {}'.format(n), 'Centre-Forward', 18 + n % 20, 'Country {}'.format(n % 40),
+                               'Club {}'.format(n % 300), '£{:.2f}m'.format(200 - n * 0.001), n, None)
+                        for n in range(1, row_count + 1)]
+
+        self.profiles = {n: PlayerProfile(n, 'right', '1,80 m', '30.06.2024', [['Jan 1, 2020', 1000000 + n]])
+                         for n in range(1, row_count + 1)}
+
+    def cached_player_batches(self, batch_size):
+        for start in range(0, len(self.players), batch_size):
+            yield self.players[start:start + batch_size]
+
+    def get_profiles_blocking(self, players):
+        return {player.player_id: self.profiles[player.player_id] for player in players}
+
+
+def load_csv(path):
+    with open(path, 'r', encoding='utf-8', newline='') as csv_file:
+        return sum(1 for _ in csv.reader(csv_file)) - 1
+
+
+def load_jsonl(path):
+    with open(path, 'r', encoding='utf-8') as jsonl_file:
+        return sum(1 for line in jsonl_file if json.loads(line))
+
+
+def load_parquet(path):
+    return pyarrow.parquet.read_table(path).num_rows
+
+
+def load_arrow(path):
+    with pyarrow.ipc.open_file(path) as reader:
+        return reader.read_all().num_rows
+
+
+# Readers of the formats, xlsx is not loaded by the analytics tools.
+loaders = {
+    'csv': load_csv,
+    'jsonl': load_jsonl,
+    'parquet': load_parquet,
+    'arrow': load_arrow,
+}
+
+
+def run(row_count, formats):
+    manager = FakePlayersManager(row_count)
+    results = {}
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        for format_name in formats:
+            exporter = exporters[format_name]()
+            path = os.path.join(output_dir, 'export.' + exporter.extension)
+
+            start = time.perf_counter()
+            exporter.export(manager, path)
+            write_seconds = time.perf_counter() - start
+
+            result = {
+                'write_rows_per_sec': row_count / write_seconds,
+                'file_size_mb': os.path.getsize(path) / 2 ** 20,
+            }
+
+            loader = loaders.get(format_name)
+            if loader is not None:
+                start = time.perf_counter()
+                loaded_rows = loader(path)
+                load_seconds = time.perf_counter() - start
+
+                assert loaded_rows == row_count, '{} loaded {} rows'.format(format_name, loaded_rows)
+
+                result['load_rows_per_sec'] = row_count / load_seconds
+
+            results[format_name] = result
+
+    return results
+
+
+def main(args):
+    formats = args.formats or available_formats()
+
+    unavailable = set(exporters).difference(available_formats())
+    if unavailable:
+        print('Skipped, dependencies are not installed: {}'.format(', '.join(sorted(unavailable))))
+
+    results = run(args.rows, formats)
+
+    print('{:10} {:>18} {:>18} {:>12}'.format('format', 'write rows/sec', 'load rows/sec', 'size MB'))
+
+    for format_name, result in results.items():
+        load_rate = result.get('load_rows_per_sec')
+
+        print('{:10} {:18.0f} {:>18} {:12.2f}'.format(format_name, result['write_rows_per_sec'],
+                                                      '{:.0f}'.format(load_rate) if load_rate else '-',
+                                                      result['file_size_mb']))
+
+    if args.output:
+        document = {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'rows': args.rows,
+            'results': results,
+        }
+
+        with open(args.output, 'w') as output_file:
+            json.dump(document, output_file, indent=4, sort_keys=True)
+
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='throughput of the export formats')
+
+    parser.add_argument('--rows', type=int, default=100000, help='number of the exported players')
+    parser.add_argument('--formats', type=str, nargs='+', choices=sorted(exporters), help='formats to compare, all available by default')
+    parser.add_argument('--output', type=str, help='path to store the results in JSON')
+
+    args = parser.parse_args()
+
+    sys.exit(main(args))
@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+
+''' Headless benchmarks of the PlayersTableModel hot paths.
+
+Runs under the Qt offscreen platform with a fake PlayersManager
+that serves synthetic pages, so no network is involved.
+
+    python benchmarks/bench_table_model.py --output results.json
+    python benchmarks/bench_table_model.py --compare results.json
+'''
+
+import os
+import sys
+import io
+import json
+import time
+import argparse
+import contextlib
+import platform
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from PyQt5.QtCore import Qt, QObject, QEvent, QTimer, QElapsedTimer, pyqtSignal
+from PyQt5.QtWidgets import QApplication, QTableView
+
+from model.player import Player
+from model.player_profile import PlayerProfile
+from model.players_table_model import PlayersTableModel
+
+
+class BenchConfig:
+    ''' Minimal stand-in for AppConfig. '''
+
+    def __init__(self, row_count):
+        self.players_table_model = {
+            'initRowCount': 150,
+            'maxRowCount': row_count,
+            'rowCountIncStep': 100,
+        }
+
+        # no previous session, every row comes from the fake manager
+        self.binary_snapshot = {'path': ''}
+
+
+class FakePlayersManager(QObject):
+    ''' PlayersManager replacement serving synthetic pages.
+    Requested pages arrive on the next event loop iteration.
+    '''
+
+    download_finished_signal = pyqtSignal(int, int, name='page_download_finished')
+    profiles_ready_signal = pyqtSignal(int, int, name='profiles_ready')
+    page_evicted_signal = pyqtSignal(int, int, name='page_evicted')
+    download_progress_signal = pyqtSignal(int, int, name='page_download_progress')
+    page_failed_signal = pyqtSignal(int, int, str, bool, name='page_download_failed')
+
+    def __init__(self, players_on_page=25):
+        super(self.__class__, self).__init__()
+
+        self.players_on_page = players_on_page
+        self.pages = {}
+        self.requested = set()
+
+    def page_range(self, page_number):
+        return self.players_on_page * (page_number - 1) + 1, self.players_on_page * page_number
+
+    def make_page(self, page_number):
+        first, _ = self.page_range(page_number)
+
+        return [Player('Player {}'.format(n), 'Centre-Forward', 18 + n % 20, 'Country {}'.format(n % 40),
+                       'Club {}'.format(n % 300), '£{:.2f}m'.format(200 - n * 0.01), n, None)
+                for n in range(first, first + self.players_on_page)]
+
+    def page_number(self, player_number):
+        return (player_number - 1) // self.players_on_page + 1
+
+    def deliver(self, page_number):
+        ''' Puts the page into the cache and notifies the model. '''
+
+        self.requested.discard(page_number)
+        self.pages[page_number] = self.make_page(page_number)
+        self.download_finished_signal.emit(*self.page_range(page_number))
+
+    def fill(self, row_count):
+        for page_number in range(1, self.page_number(row_count) + 1):
+            self.pages[page_number] = self.make_page(page_number)
+
+    def is_cached(self, player_number):
+        return self.page_number(player_number) in self.pages
+
+    def get(self, player_number, priority=None):
+        page_number = self.page_number(player_number)
+
+        if page_number in self.pages or page_number in self.requested:
+            return
+
+        self.requested.add(page_number)
+        QTimer.singleShot(0, lambda: self.deliver(page_number))
+
+    def get_cached(self, player_number):
+        page = self.pages.get(self.page_number(player_number))
+        if page is None:
+            return None
+
+        return page[(player_number - 1) % self.players_on_page]
+
+    def get_partial(self, player_number):
+        return None
+
+    def page_error(self, player_number):
+        return None
+
+    def sort_method(self):
+        return 'DESC'
+
+    def get_profile(self, player_number, player):
+        return PlayerProfile(player.player_id, 'right', '1,80 m', '30.06.2024', [['Jan 1, 2020', 1000000]])
+
+    def drop_cache(self):
+        self.pages.clear()
+
+
+class BenchView(QTableView):
+    ''' Table view playing the MainWindow role for the model.
+    Counts the spinner toggles and the viewport repaints.
+    '''
+
+    def __init__(self):
+        super(self.__class__, self).__init__()
+
+        self.spinner_toggles = 0
+        self.paint_count = 0
+        self.viewport().installEventFilter(self)
+
+    def set_table_active(self):
+        self.spinner_toggles += 1
+
+    def set_table_inactive(self):
+        self.spinner_toggles += 1
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint:
+            self.paint_count += 1
+
+        return False
+
+
+class Bench:
+    ''' Holds the application, the fake manager, the view and the model. '''
+
+    def __init__(self, app, row_count):
+        self.app = app
+        self.row_count = row_count
+
+        self.manager = FakePlayersManager()
+        self.view = BenchView()
+        self.view.resize(1000, 700)
+
+        self.model = PlayersTableModel(BenchConfig(row_count), self.manager, parent=self.view)
+        self.view.setModel(self.model)
+        self.view.show()
+
+        self.process_events()
+
+    def process_events(self):
+        self.app.processEvents()
+
+    def wait_paint(self, timeout=1.0):
+        ''' Processes events until the viewport is repainted. '''
+
+        paint_count = self.view.paint_count
+        deadline = time.perf_counter() + timeout
+
+        while self.view.paint_count == paint_count and time.perf_counter() < deadline:
+            self.process_events()
+
+
+def bench_data_cells(bench, repeat):
+    ''' Cells per second served by PlayersTableModel.data() from the cache. '''
+
+    bench.manager.fill(bench.model.rowCount())
+
+    model = bench.model
+    indexes = [model.index(row, column) for row in range(model.rowCount()) for column in range(model.columnCount())]
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for index in indexes:
+            model.data(index, Qt.DisplayRole)
+    elapsed = time.perf_counter() - start
+
+    return {'data_cells_per_sec': len(indexes) * repeat / elapsed}
+
+
+def bench_render_cells(bench, repeat):
+    ''' Cells per second painted by the view with all the data cached. '''
+
+    bench.manager.fill(bench.model.rowCount())
+
+    view = bench.view
+    visible_rows = view.rowAt(view.viewport().height() - 1) - view.rowAt(0) + 1
+    cells = visible_rows * bench.model.columnCount()
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        view.viewport().repaint()
+    elapsed = time.perf_counter() - start
+
+    return {'render_cells_per_sec': cells * repeat / elapsed}
+
+
+def bench_fetch_more(bench, repeat):
+    ''' Time of one fetchMore() call inserting the readahead rows. '''
+
+    model = bench.model
+    timings = []
+
+    for _ in range(repeat):
+        model.beginResetModel()
+        model.row_count = 150
+        model.last_read_row = -1
+        model.endResetModel()
+
+        start = time.perf_counter()
+        model.fetchMore(model.index(-1, -1))
+        timings.append(time.perf_counter() - start)
+
+    return {'fetch_more_ms': median(timings) * 1e3}
+
+
+def bench_goto_row(bench, repeat):
+    ''' Latency from goto_row() until the view is repainted at the row. '''
+
+    bench.manager.fill(bench.row_count)
+
+    timings = []
+    rows = [(i * 7919) % (bench.row_count - 1) for i in range(1, repeat + 1)]
+
+    for row in rows:
+        start = time.perf_counter()
+        bench.model.goto_row(row)
+        bench.view.scrollTo(bench.model.index(row, 0))
+        bench.wait_paint()
+        timings.append(time.perf_counter() - start)
+
+    return {'goto_row_ms': median(timings) * 1e3, 'goto_row_max_ms': max(timings) * 1e3}
+
+
+def bench_data_ready(bench, repeat):
+    ''' Latency from the page arrival until the view is repainted. '''
+
+    manager = bench.manager
+    timings = []
+
+    for _ in range(repeat):
+        manager.drop_cache()
+        bench.view.scrollToTop()
+        bench.process_events()
+
+        start = time.perf_counter()
+        manager.deliver(1)
+        bench.wait_paint()
+        timings.append(time.perf_counter() - start)
+
+    return {'data_ready_to_paint_ms': median(timings) * 1e3}
+
+
+def bench_scroll_blocking(bench, repeat):
+    ''' Main thread blocking while scrolling over uncached pages.
+    A 1 ms timer measures how late the event loop serves it.
+    '''
+
+    manager = bench.manager
+    manager.drop_cache()
+    bench.view.spinner_toggles = 0
+
+    timer_elapsed = QElapsedTimer()
+    lags = []
+
+    def tick():
+        if timer_elapsed.isValid():
+            lags.append(max(0, timer_elapsed.restart() - 1))
+        else:
+            timer_elapsed.start()
+
+    timer = QTimer()
+    timer.setInterval(1)
+    timer.timeout.connect(tick)
+    timer.start()
+
+    scrollbar = bench.view.verticalScrollBar()
+    steps = repeat
+
+    for step in range(steps):
+        scrollbar.setValue(scrollbar.maximum() * step // steps)
+        for _ in range(5):
+            bench.process_events()
+
+    timer.stop()
+
+    return {
+        'main_thread_blocked_ms': sum(lags),
+        'main_thread_max_stall_ms': max(lags) if lags else 0,
+        'spinner_toggles_per_scroll': bench.view.spinner_toggles / steps,
+    }
+
+
+BENCHMARKS = [
+    (bench_data_cells, 20),
+    (bench_render_cells, 50),
+    (bench_fetch_more, 50),
+    (bench_goto_row, 30),
+    (bench_data_ready, 30),
+    (bench_scroll_blocking, 100),
+]
+
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def run(row_count):
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    results = {}
+
+    for benchmark, repeat in BENCHMARKS:
+        bench = Bench(app, row_count)
+        results.update(benchmark(bench, repeat))
+
+    return results
+
+
+def compare(results, baseline):
+    ''' Prints the relative change of every metric against the baseline. '''
+
+    for name, value in sorted(results.items()):
+        base = baseline.get(name)
+
+        if not base:
+            print('{:32} {:14.3f}'.format(name, value))
+            continue
+
+        print('{:32} {:14.3f} {:14.3f} {:+8.1f}%'.format(name, value, base, (value - base) / base * 100))
+
+
+def main(args):
+    # PlayersTableModel.data_ready prints every page arrival
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = run(args.rows)
+
+    document = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'rows': args.rows,
+        'results': results,
+    }
+
+    if args.compare:
+        with open(args.compare, 'r') as baseline_file:
+            compare(results, json.load(baseline_file)['results'])
+    else:
+        compare(results, {})
+
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(document, output_file, indent=4, sort_keys=True)
+
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='headless benchmarks of the players table model')
+
+    parser.add_argument('--rows', type=int, default=10000, help='number of rows in the model')
+    parser.add_argument('--output', type=str, help='path to store the results in JSON')
+    parser.add_argument('--compare', type=str, help='path to the previous results to compare with')
+
+    args = parser.parse_args()
+
+    sys.exit(main(args))
@@ -0,0 +1,549 @@
+#!/usr/bin/env python3
+
+''' Tuning harness of the fetch and cache parameters.
+
+Replays the workloads against a local stand-in of the site and sweeps
+the fetch concurrency, the page cache size and the readahead step:
+
+    scroll  the scroll trace replayed through PlayersManager, the latency is
+            the time until the rows of every screen are loaded
+    export  the loaded rows exported to CSV with their profiles
+    crawl   the first pages of the ranking crawled by the ScrapeEngine
+
+Every configuration runs in a fresh process with cold caches. By default the
+parameters are swept one by one, each around the best values found so far,
+--full-grid runs every combination. The configuration with the best
+latency/throughput trade-off whose page cache fits the memory budget is
+written as the full config file, the measured curves are saved with --output.
+
+    python benchmarks/tune.py config.json --memory-budget 8 --output curves.json
+    python benchmarks/tune.py config.json --scroll-trace trace.json --output-config tuned.json
+
+The recorded scroll trace is a JSON list of [dwell seconds, first visible row].
+
+The page size (playersOnPage) is set by the site and the stand-in serves
+it as configured. The table growth (initRowCount, rowCountIncStep) does not
+touch the network, maxRowCount only bounds the synthetic scroll trace.
+'''
+
+import gc
+import os
+import re
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import itertools
+import platform
+import resource
+import tempfile
+import threading
+import subprocess
+import tracemalloc
+import http.server
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from app_config import AppConfig
+
+
+class StandInServer(http.server.ThreadingHTTPServer):
+    ''' Local stand-in of the site serving the ranking and the profile pages.
+
+    Requests are served by a limited number of slots after a fixed latency,
+    like a throttled site, so more concurrency does not help past some point.
+    The pages have ETags and the conditional requests are answered with 304.
+    '''
+
+    daemon_threads = True
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        ''' Serves one page. '''
+
+        page_re = re.compile(r'[?&]page=(\d+)')
+        profile_re = re.compile(r'/spieler/(\d+)')
+
+        def do_GET(self):
+            server = self.server
+
+            with server.slots:
+                page_match = self.page_re.search(self.path)
+
+                if page_match is not None:
+                    time.sleep(server.latency)
+                    body = server.ranking_page(int(page_match.group(1)))
+                else:
+                    time.sleep(server.profile_latency)
+                    profile_match = self.profile_re.search(self.path)
+                    body = server.profile_page(int(profile_match.group(1)) if profile_match else 0)
+
+            with server.lock:
+                server.requests += 1
+
+            etag = '"{}"'.format(hashlib.sha1(body).hexdigest())
+
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('ETag', etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    row_markup = ('<tr class="{parity}"><td>{number}</td><td><table class="inline-table"><tr><td>'
+                  '<a class="spielprofil_tooltip" href="/player-{number}/profil/spieler/{number}">Player {number}</a>'
+                  '</td></tr><tr><td>Centre-Forward</td></tr></table></td><td class="zentriert">{number}</td>'
+                  '<td class="zentriert">{age}</td><td class="zentriert"><img title="Country {country}" /></td>'
+                  '<td class="zentriert"><a><img alt="Club {club}" /></a></td>'
+                  '<td class="rechts hauptlink"><b>£{price:.2f}m</b></td></tr>')
+
+    profile_markup = ('<html><body><table class="auflistung"><tr><th>Foot:</th><td>right</td></tr>'
+                      '<tr><th>Height:</th><td>1,80 m</td></tr><tr><th>Contract expires:</th><td>30.06.2027</td></tr>'
+                      "</table><script>var chart = {{'y':{value},'datum_mw':'Jan 1, 2024'}}</script></body></html>")
+
+    def __init__(self, players, players_on_page, slots, latency, profile_latency):
+        ''' Constructs StandInServer instance listening on a free local port.
+
+        Parameters
+        ----------
+            players : int
+                Number of the players in the ranking.
+
+            players_on_page : int
+                Number of the players on the ranking page.
+
+            slots : int
+                Number of the requests served at once.
+
+            latency : float
+                Seconds to serve the ranking page.
+
+            profile_latency : float
+                Seconds to serve the profile page.
+        '''
+
+        super(self.__class__, self).__init__(('127.0.0.1', 0), self.Handler)
+
+        self.players = players
+        self.players_on_page = players_on_page
+        self.latency = latency
+        self.profile_latency = profile_latency
+
+        self.slots = threading.BoundedSemaphore(slots)
+        self.lock = threading.Lock()
+        self.requests = 0
+
+    def url(self):
+        return 'http://127.0.0.1:{}'.format(self.server_port)
+
+    def ranking_page(self, page_number):
+        first = (page_number - 1) * self.players_on_page + 1
+        last = min(first + self.players_on_page - 1, self.players)
+
+        rows = ''.join(self.row_markup.format(parity='odd' if number % 2 else 'even', number=number, age=18 + number % 20,
+                                              country=number % 40, club=number % 300, price=200 - number * 0.01)
+                       for number in range(first, last + 1))
+
+        return '<html><body><table class="items"><tbody>{}</tbody></table></body></html>'.format(rows).encode('utf-8')
+
+    def profile_page(self, player_id):
+        return self.profile_markup.format(value=(200 - player_id * 0.01) * 10 ** 6).encode('utf-8')
+
+
+def synthetic_scroll_trace(steps, max_row, screen_rows, seed):
+    ''' Returns the scroll trace of the user reading down the table with the wheel,
+    going back up now and then and jumping to the random rows.
+    '''
+
+    generator = random.Random(seed)
+    trace = []
+    first_row = 0
+
+    for _ in range(steps):
+        action = generator.random()
+
+        if action < 0.05:
+            first_row = generator.randrange(0, max_row - screen_rows)
+        elif action < 0.15:
+            first_row -= generator.randint(3, 30)
+        else:
+            first_row += generator.randint(3, 10)
+
+        first_row = min(max(first_row, 0), max_row - screen_rows)
+        trace.append([round(generator.uniform(0.02, 0.1), 3), first_row])
+
+    return trace
+
+
+def apply_parameters(app_config, base_url, params):
+    ''' Sets the swept parameters and the stand-in site into the config. '''
+
+    app_config.transfermarkt['baseUrl'] = base_url
+    app_config.transfermarkt['workers'] = params['concurrency']
+
+    app_config.players_manager['fetchWorkers'] = params['concurrency']
+    app_config.players_manager['pageNumber'] = params['cache_pages']
+    app_config.players_manager['prefetchPages'] = params['readahead']
+    app_config.players_manager['warmupPages'] = 0
+
+    app_config.profile_crawler['maxWorkers'] = params['concurrency']
+
+    app_config.cache_daemon['enabled'] = False
+
+
+def replay_scroll(app, manager, trace, screen_rows, step_timeout, max_timeouts=5):
+    ''' Replays the scroll trace. The replay stops after max_timeouts screens
+    did not get their rows in step_timeout, the cache is thrashing then.
+
+    Returns
+    -------
+        (list of the seconds every screen waited for its rows, number of the timed out screens) tuple.
+    '''
+
+    def pump(seconds):
+        end = time.perf_counter() + seconds
+        while time.perf_counter() < end:
+            app.processEvents()
+            time.sleep(0.001)
+
+    def repaint(first, last):
+        # reads the screen the way the table model does: the cached rows
+        # are used, which keeps their pages recent, the missing ones are requested
+        missing = 0
+
+        for player_number in range(first, last + 1):
+            if manager.is_cached(player_number):
+                manager.get_cached(player_number)
+            else:
+                manager.get(player_number)
+                missing += 1
+
+        return missing
+
+    latencies = []
+    timeouts = 0
+
+    for dwell, first_row in trace:
+        first, last = first_row + 1, first_row + screen_rows
+
+        start = time.perf_counter()
+
+        manager.set_viewport(first, last)
+
+        while repaint(first, last):
+            if time.perf_counter() - start > step_timeout:
+                timeouts += 1
+                break
+
+            app.processEvents()
+            time.sleep(0.001)
+
+        latencies.append(time.perf_counter() - start)
+
+        if timeouts >= max_timeouts:
+            break
+
+        pump(dwell)
+
+    return latencies, timeouts
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def run_workloads(args):
+    ''' Runs the workloads with one configuration, this is the child process.
+    Prints the result as the JSON line.
+    '''
+
+    from PyQt5.QtCore import QCoreApplication
+
+    from misc.csv_exporter import CsvExporter
+    from model.players_manager import PlayersManager
+    from model.scrape_engine import ScrapeEngine
+
+    job = json.loads(args.worker)
+
+    app_config = AppConfig(args.config_path)
+    apply_parameters(app_config, job['base_url'], job['params'])
+
+    # the caches and the logs of the run are created in the fresh directory
+    os.chdir(tempfile.mkdtemp())
+
+    app = QCoreApplication([])
+
+    manager = PlayersManager(app_config)
+
+    latencies, timeouts = replay_scroll(app, manager, job['trace'], job['screen_rows'], job['step_timeout'])
+
+    exporter = CsvExporter()
+    exported_rows = sum(len(players) for players in manager.cached_player_batches(exporter.batch_size))
+
+    start = time.perf_counter()
+    exporter.export(manager, 'export.csv')
+    export_seconds = time.perf_counter() - start
+
+    manager.close()
+
+    engine = ScrapeEngine(app_config)
+
+    start = time.perf_counter()
+    crawled = list(engine.crawl([(engine.default_list, {}, 'DESC', range(1, job['crawl_pages'] + 1))]))
+    crawl_seconds = time.perf_counter() - start
+
+    result = {
+        'scroll_mean_ms': 1000 * sum(latencies) / len(latencies),
+        'scroll_p95_ms': 1000 * percentile(latencies, 0.95),
+        'scroll_p99_ms': 1000 * percentile(latencies, 0.99),
+        'scroll_timeouts': timeouts,
+        'export_rows_per_sec': exported_rows / export_seconds if export_seconds else 0,
+        'crawl_pages_per_sec': len(crawled) / crawl_seconds,
+        'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+    print('RESULT ' + json.dumps(result), flush=True)
+
+    # the manager threads are not joined, they would abort the interpreter exit
+    os._exit(0)
+
+
+def measure(args, server, params, trace, screen_rows):
+    ''' Runs the workloads with the parameters in the child process. '''
+
+    job = {
+        'base_url': server.url(),
+        'params': params,
+        'trace': trace,
+        'screen_rows': screen_rows,
+        'step_timeout': args.step_timeout,
+        'crawl_pages': args.crawl_pages,
+    }
+
+    requests_before = server.requests
+
+    completed = subprocess.run([sys.executable, os.path.abspath(__file__), args.config_path, '--worker', json.dumps(job)],
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+
+    result_lines = [line for line in completed.stdout.splitlines() if line.startswith('RESULT ')]
+
+    if not result_lines:
+        raise RuntimeError('workloads with {} failed with exit code {}:\n{}'.format(params, completed.returncode,
+                                                                                 completed.stderr[-2000:]))
+
+    result = json.loads(result_lines[-1][len('RESULT '):])
+    result['requests'] = server.requests - requests_before
+
+    return result
+
+
+def page_cache_bytes(app_config, server):
+    ''' Returns the memory held by one parsed page in the page cache. '''
+
+    from model.scrape_engine import ScrapeEngine
+
+    apply_parameters(app_config, server.url(), {'concurrency': 1, 'cache_pages': 2, 'readahead': 0})
+    engine = ScrapeEngine(app_config)
+
+    # the first download sets the connection and the parser up
+    engine.download(engine.default_list, 1)
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    engine.download(engine.default_list, 2)
+
+    # the parse tree is full of the reference cycles, it is freed by the collector
+    gc.collect()
+    page_bytes = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    return page_bytes
+
+
+def pick_best(results, latency_weight):
+    ''' Returns the result with the lowest cost: the mean scroll latency and the crawl time
+    relative to the best ones measured, the latency weighted by latency_weight.
+    The mean is used as the jumps to the far rows are rare, but they make most of the wait.
+    '''
+
+    best_latency = min(result['scroll_mean_ms'] for result in results) or 1
+    best_throughput = max(result['crawl_pages_per_sec'] for result in results)
+
+    def cost(result):
+        return (latency_weight * result['scroll_mean_ms'] / best_latency
+                + best_throughput / result['crawl_pages_per_sec'])
+
+    return min(results, key=cost)
+
+
+def main(args):
+    if args.worker:
+        return run_workloads(args)
+
+    app_config = AppConfig(args.config_path)
+
+    default_list = app_config.transfermarkt['defaultList']
+    players_on_page = app_config.ranking_lists[default_list]['playersOnPage']
+    max_row = app_config.players_table_model['maxRowCount']
+
+    if args.scroll_trace:
+        with open(args.scroll_trace, 'r') as trace_file:
+            trace = json.load(trace_file)
+    else:
+        trace = synthetic_scroll_trace(args.scroll_steps, max_row, args.screen_rows, args.seed)
+
+    server = StandInServer(args.players, players_on_page, args.server_slots, args.latency, args.profile_latency)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    page_bytes = page_cache_bytes(AppConfig(args.config_path), server)
+    print('One cached page holds {:.1f} KB'.format(page_bytes / 1024))
+
+    sweeps = [
+        ('concurrency', args.concurrency),
+        ('cache_pages', args.cache_pages),
+        ('readahead', args.readahead),
+    ]
+
+    configured = {
+        'concurrency': app_config.players_manager['fetchWorkers'],
+        'cache_pages': app_config.players_manager['pageNumber'],
+        'readahead': app_config.players_manager['prefetchPages'],
+    }
+
+    # the sweeps start from the swept values closest to the configured ones,
+    # so only the requested values are ever measured and picked
+    current = {name: min(values, key=lambda value: abs(value - configured[name])) for name, values in sweeps}
+
+    # the sweeps start from the largest cache fitting the budget
+    if current['cache_pages'] * page_bytes / 2 ** 20 > args.memory_budget:
+        current['cache_pages'] = max([cache_pages for cache_pages in args.cache_pages
+                                      if cache_pages * page_bytes / 2 ** 20 <= args.memory_budget], default=min(args.cache_pages))
+
+    # (concurrency, cache_pages, readahead) -> measured result
+    measured = {}
+
+    def run(params):
+        key = (params['concurrency'], params['cache_pages'], params['readahead'])
+
+        if key not in measured:
+            result = dict(params, cache_mb=params['cache_pages'] * page_bytes / 2 ** 20)
+            result.update(measure(args, server, params, trace, args.screen_rows))
+            measured[key] = result
+
+            print('{:>11} {:>11} {:>9} {:>11.1f} {:>11.1f} {:>8} {:>11.1f} {:>11.0f} {:>9.2f} {:>8}'.format(
+                result['concurrency'], result['cache_pages'], result['readahead'], result['scroll_mean_ms'],
+                result['scroll_p95_ms'], result['scroll_timeouts'], result['crawl_pages_per_sec'],
+                result['export_rows_per_sec'], result['cache_mb'], result['requests']), flush=True)
+
+        return measured[key]
+
+    # the thrashing configurations are never picked
+    def within_budget(results):
+        return [result for result in results if result['cache_mb'] <= args.memory_budget and not result['scroll_timeouts']]
+
+    print('{:>11} {:>11} {:>9} {:>11} {:>11} {:>8} {:>11} {:>11} {:>9} {:>8}'.format(
+        'concurrency', 'cache pages', 'readahead', 'mean ms', 'p95 ms', 'timeouts', 'crawl p/s', 'export r/s',
+        'cache MB', 'requests'))
+
+    curves = {}
+
+    if args.full_grid:
+        for values in itertools.product(*(values for _, values in sweeps)):
+            run(dict(zip((name for name, _ in sweeps), values)))
+    else:
+        for name, values in sweeps:
+            curves[name] = [run(dict(current, **{name: value})) for value in values]
+
+            candidates = within_budget(curves[name])
+            if candidates:
+                current[name] = pick_best(candidates, args.latency_weight)[name]
+
+    candidates = within_budget(measured.values())
+    if not candidates:
+        print('No configuration fits {} MB of the page cache'.format(args.memory_budget))
+        return 1
+
+    best = pick_best(candidates, args.latency_weight)
+
+    print('Best: concurrency {}, cache pages {}, readahead {} ({:.1f} ms mean scroll latency, {:.1f} crawled pages/sec)'.format(
+        best['concurrency'], best['cache_pages'], best['readahead'], best['scroll_mean_ms'], best['crawl_pages_per_sec']))
+
+    with open(args.config_path, 'r') as config_file:
+        config = json.load(config_file)
+
+    config['transfermarkt']['workers'] = best['concurrency']
+    config['players_manager']['fetchWorkers'] = best['concurrency']
+    config['profile_crawler']['maxWorkers'] = best['concurrency']
+    config['players_manager']['pageNumber'] = best['cache_pages']
+    config['players_manager']['prefetchPages'] = best['readahead']
+
+    with open(args.output_config, 'w') as output_file:
+        json.dump(config, output_file, indent='\t', ensure_ascii=False)
+
+    print('Tuned configuration is written to {}'.format(args.output_config))
+
+    if args.output:
+        document = {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'server': {'players': args.players, 'slots': args.server_slots, 'latency': args.latency,
+                       'profile_latency': args.profile_latency},
+            'memory_budget_mb': args.memory_budget,
+            'page_cache_bytes': page_bytes,
+            'best': best,
+            'curves': curves,
+            'results': list(measured.values()),
+        }
+
+        with open(args.output, 'w') as output_file:
+            json.dump(document, output_file, indent=4, sort_keys=True)
+
+    server.shutdown()
+
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='sweeps the fetch and cache parameters against a local stand-in site')
+
+    parser.add_argument('config_path', type=str, help='path to the configuration file')
+    parser.add_argument('--output-config', type=str, default='tuned_config.json', help='path to write the tuned configuration')
+    parser.add_argument('--output', type=str, help='path to store the measured curves in JSON')
+
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8], help='fetch concurrency values')
+    parser.add_argument('--cache-pages', type=int, nargs='+', default=[5, 10, 25, 50], help='page cache sizes')
+    parser.add_argument('--readahead', type=int, nargs='+', default=[0, 1, 2, 4], help='readahead steps in pages')
+    parser.add_argument('--full-grid', action='store_true', help='run every combination instead of one parameter at a time')
+
+    parser.add_argument('--memory-budget', type=float, default=16, help='page cache memory budget in MB')
+    parser.add_argument('--latency-weight', type=float, default=1.0, help='weight of the scroll latency against the crawl throughput')
+
+    parser.add_argument('--scroll-trace', type=str, help='recorded scroll trace in JSON, synthetic if not set')
+    parser.add_argument('--scroll-steps', type=int, default=200, help='number of the synthetic scroll trace steps')
+    parser.add_argument('--screen-rows', type=int, default=30, help='number of the rows on the screen')
+    parser.add_argument('--step-timeout', type=float, default=3, help='seconds to wait for the rows of one screen')
+    parser.add_argument('--crawl-pages', type=int, default=40, help='number of the ranking pages to crawl')
+    parser.add_argument('--seed', type=int, default=1, help='seed of the synthetic scroll trace')
+
+    parser.add_argument('--players', type=int, default=2500, help='number of the players served by the stand-in site')
+    parser.add_argument('--server-slots', type=int, default=4, help='number of the requests the stand-in serves at once')
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds the stand-in takes to serve the ranking page')
+    parser.add_argument('--profile-latency', type=float, default=0.005, help='seconds the stand-in takes to serve the profile page')
+
+    parser.add_argument('--worker', type=str, help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    sys.exit(main(args))
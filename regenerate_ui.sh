@@ -1,2 +1,3 @@
 pyuic5 ui/main_window.ui -o src/ui/main_window_ui.py
 pyuic5 ui/export_dialog.ui -o src/ui/export_dialog_ui.py
+pyuic5 ui/summary_panel.ui -o src/ui/summary_panel_ui.py
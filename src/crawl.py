@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+
+import sys
+import time
+import json
+import argparse
+import dataclasses
+import datetime
+
+from app_config import AppConfig
+from distributed.crawl_worker import CrawlWorker
+from distributed.lease_queue import LeaseQueue
+from distributed.page_cache_daemon import PageCacheDaemon
+from misc.tracer import tracer
+from model.player_index import PlayerIdIndex
+from model.players_page import PlayersPage
+from model.scrape_engine import ScrapeEngine
+from model.snapshot_store import SnapshotStore
+
+
+def snapshot(app_config, store, args):
+    ''' Crawls the ranking and records it into the snapshot store. '''
+
+    # the store takes the days in date order, the earlier day is refused before the crawl
+    days = store.days()
+    if days and args.date < days[-1]:
+        sys.exit('Snapshots are recorded up to {}, {} cannot be recorded'.format(days[-1], args.date))
+
+    players_page = PlayersPage(app_config)
+    players_on_page = players_page.players_on_page()
+
+    # players shifted between pages during the crawl are recorded once
+    player_index = PlayerIdIndex()
+
+    for page_number in range(1, args.pages + 1):
+        player_index.add_page(page_number, players_page.download(page_number, PlayersPage.SortType.DESC))
+
+    ranked_players = []
+
+    for player in player_index.unique_players():
+        page_number, offset = player_index.location(player.player_id)
+        ranked_players.append((players_on_page * (page_number - 1) + offset + 1, player))
+
+    report = player_index.consistency_report()
+    for player_id, pages in report['duplicated'].items():
+        print('Player {} was found on pages {}'.format(player_id, pages))
+
+    with tracer.span('record snapshot', 'store', players=len(ranked_players)):
+        store.record(args.date, ranked_players)
+
+    print('Recorded {} players for {}'.format(len(ranked_players), args.date))
+
+
+def crawl_lists(app_config, store, args):
+    ''' Crawls several ranking lists together and writes the players as JSON lines. '''
+
+    engine = ScrapeEngine.shared(app_config)
+
+    jobs = [(list_name, params, args.sort, range(1, args.pages + 1)) for list_name, params in args.lists]
+
+    output_file = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+
+    try:
+        for list_name, params, sort_name, page_number, players in engine.crawl(jobs):
+            for offset, player in enumerate(players):
+                record = dataclasses.asdict(player)
+                record.update(list=list_name, params=params, sort=sort_name, page=page_number, offset=offset)
+                output_file.write(json.dumps(record, ensure_ascii=False) + '\n')
+    finally:
+        if args.output:
+            output_file.close()
+
+
+def list_spec(spec):
+    ''' Parses 'name:key=value,key=value' list specification. '''
+
+    list_name, _, params = spec.partition(':')
+
+    return list_name, dict(param.split('=', 1) for param in params.split(',') if param)
+
+
+def enqueue(app_config, store, args):
+    ''' Coordinator side: splits the lists into leases of the distributed crawl queue. '''
+
+    queue = LeaseQueue(app_config.distributed['queuePath'], app_config.distributed['maxAttempts'])
+    pages_per_lease = args.pages_per_lease or app_config.distributed['pagesPerLease']
+
+    for list_name, params in args.lists:
+        leases = queue.add_work(list_name, params, args.sort, args.pages, pages_per_lease)
+        print('Queued {} leases for {} {}'.format(leases, list_name, params))
+
+    queue.close()
+
+
+def work(app_config, store, args):
+    ''' Worker side: processes the leases of the distributed crawl queue. '''
+
+    CrawlWorker(app_config, args.worker_id).run(exit_when_finished=not args.keep_running)
+
+
+def status(app_config, store, args):
+    ''' Prints the progress of the distributed crawl per worker. '''
+
+    queue = LeaseQueue(app_config.distributed['queuePath'], app_config.distributed['maxAttempts'])
+
+    while True:
+        print('leases: {}'.format(', '.join('{} {}'.format(count, state) for state, count in sorted(queue.lease_counts().items()))))
+        print('{:24} {:16} {:>7} {:>7} {:>8} {:>7} {:>10} {:>10}'.format(
+            'worker', 'host', 'leases', 'pages', 'players', 'errors', 'pages/min', 'seen ago'))
+
+        for worker_id, host, leases_done, pages_done, players_done, errors, pages_per_minute, seen_ago in queue.worker_stats():
+            print('{:24} {:16} {:7} {:7} {:8} {:7} {:10.1f} {:9.0f}s'.format(
+                worker_id, host, leases_done, pages_done, players_done, errors, pages_per_minute, seen_ago))
+
+        if not args.watch or queue.is_finished():
+            break
+
+        time.sleep(args.watch)
+        print()
+
+    queue.close()
+
+
+def cache_daemon(app_config, store, args):
+    ''' Runs the page cache shared by the application instances on this host. '''
+
+    daemon = PageCacheDaemon(app_config)
+    print('Serving the page cache on {}'.format(daemon.server_address))
+
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.server_close()
+
+
+def history(app_config, store, args):
+    ''' Prints the market value history of the player. '''
+
+    for date, value in store.value_history(args.player_id):
+        print('{}\t{}'.format(date, value))
+
+
+def movers(app_config, store, args):
+    ''' Prints the players whose market value changed the most. '''
+
+    for player_id, name, club, value_from, value_to in store.biggest_movers(args.date_from, args.date_to, args.limit):
+        print('{}\t{}\t{}\t{}\t{}\t{:+}'.format(player_id, name, club, value_from, value_to, value_to - value_from))
+
+
+def main(args):
+    if args.trace:
+        tracer.enable()
+
+    app_config = AppConfig(args.config_path)
+
+    store = SnapshotStore(app_config.snapshot_store['path']) if args.needs_store else None
+
+    try:
+        args.command(app_config, store, args)
+    finally:
+        if store:
+            store.close()
+
+        if args.trace:
+            tracer.save(args.trace)
+
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='headless crawler and snapshot history queries')
+
+    parser.add_argument('config_path', type=str, help='path to the configuration file')
+    parser.add_argument('--trace', type=str, metavar='FILE', help='record the run timeline into the Chrome trace JSON file')
+
+    subparsers = parser.add_subparsers(dest='command_name', required=True)
+    parser.set_defaults(needs_store=False)
+
+    snapshot_parser = subparsers.add_parser('snapshot', help='crawl the ranking and record a snapshot')
+    snapshot_parser.add_argument('--pages', type=int, default=40, help='number of ranking pages to crawl')
+    snapshot_parser.add_argument('--date', type=datetime.date.fromisoformat, default=datetime.date.today(), help='snapshot date (YYYY-MM-DD)')
+    snapshot_parser.set_defaults(command=snapshot, needs_store=True)
+
+    lists_parser = subparsers.add_parser('lists', help='crawl several ranking lists concurrently')
+    lists_parser.add_argument('lists', type=list_spec, nargs='+', metavar='LIST', help='list spec name[:key=value,...], e.g. league:league_slug=premier-league,league_id=GB1')
+    lists_parser.add_argument('--pages', type=int, default=4, help='number of pages to crawl from every list')
+    lists_parser.add_argument('--sort', choices=['ASC', 'DESC', 'NONE'], default='DESC', help='sort order')
+    lists_parser.add_argument('--output', type=str, help='path to the JSON lines output, stdout by default')
+    lists_parser.set_defaults(command=crawl_lists)
+
+    enqueue_parser = subparsers.add_parser('enqueue', help='split the lists into leases of the distributed crawl')
+    enqueue_parser.add_argument('lists', type=list_spec, nargs='+', metavar='LIST', help='list spec name[:key=value,...]')
+    enqueue_parser.add_argument('--pages', type=int, default=40, help='number of pages to crawl from every list')
+    enqueue_parser.add_argument('--sort', choices=['ASC', 'DESC', 'NONE'], default='DESC', help='sort order')
+    enqueue_parser.add_argument('--pages-per-lease', type=int, help='lease size, taken from the config by default')
+    enqueue_parser.set_defaults(command=enqueue)
+
+    work_parser = subparsers.add_parser('work', help='run the distributed crawl worker')
+    work_parser.add_argument('--worker-id', type=str, help='worker name, host and PID by default')
+    work_parser.add_argument('--keep-running', action='store_true', help='wait for new leases when the queue is finished')
+    work_parser.set_defaults(command=work)
+
+    status_parser = subparsers.add_parser('status', help='print the distributed crawl progress per worker')
+    status_parser.add_argument('--watch', type=float, metavar='SECONDS', help='repeat until the crawl is finished')
+    status_parser.set_defaults(command=status)
+
+    cache_daemon_parser = subparsers.add_parser('cache-daemon', help='serve the page cache shared by the application instances on this host')
+    cache_daemon_parser.set_defaults(command=cache_daemon)
+
+    history_parser = subparsers.add_parser('history', help='print market value history of the player')
+    history_parser.add_argument('player_id', type=int, help='transfermarkt player ID')
+    history_parser.set_defaults(command=history, needs_store=True)
+
+    movers_parser = subparsers.add_parser('movers', help='print the biggest market value movers between two dates')
+    movers_parser.add_argument('date_from', type=datetime.date.fromisoformat, help='first date (YYYY-MM-DD)')
+    movers_parser.add_argument('date_to', type=datetime.date.fromisoformat, help='second date (YYYY-MM-DD)')
+    movers_parser.add_argument('--limit', type=int, default=10, help='number of players to print')
+    movers_parser.set_defaults(command=movers, needs_store=True)
+
+    args = parser.parse_args()
+
+    sys.exit(main(args))
@@ -0,0 +1,103 @@
+import dataclasses
+import os
+import socket
+import time
+
+from distributed.lease_queue import LeaseQueue
+from model.players_page import PlayersPage
+
+
+class CrawlWorker:
+    ''' Worker process of the distributed crawl.
+    Claims leases from the shared queue, downloads their pages with
+    PlayersPage and writes the parsed players back into the queue.
+    '''
+
+    sort_types = {
+        'NONE': PlayersPage.SortType.NONE,
+        'ASC': PlayersPage.SortType.ASC,
+        'DESC': PlayersPage.SortType.DESC,
+    }
+
+    def __init__(self, app_config, worker_id=None):
+        ''' Constructs CrawlWorker instance.
+
+        Parameters
+        ----------
+            app_config : AppConfig
+                Instance of application configuration file.
+
+            worker_id : str
+                Unique worker name, host and PID based by default.
+        '''
+
+        config = app_config.distributed
+
+        self.app_config = app_config
+        self.host = socket.gethostname()
+        self.worker_id = worker_id or '{}-{}'.format(self.host, os.getpid())
+
+        self._lease_seconds = config['leaseSeconds']
+        self._request_delay = config['requestDelay']
+        self._poll_interval = config['pollInterval']
+
+        self._queue = LeaseQueue(config['queuePath'], config['maxAttempts'])
+
+    def run(self, exit_when_finished=True):
+        ''' Processes the leases until the queue is finished. '''
+
+        self._queue.register_worker(self.worker_id, self.host)
+
+        try:
+            while True:
+                lease = self._queue.claim(self.worker_id, self._lease_seconds)
+
+                if lease is None:
+                    if exit_when_finished and self._queue.is_finished():
+                        return
+
+                    time.sleep(self._poll_interval)
+                    continue
+
+                self._process(*lease)
+
+        finally:
+            self._queue.close()
+
+    def _process(self, lease_id, list_name, params, sort_name, page_from, page_to):
+        ''' [Private] Downloads all the pages of the lease. '''
+
+        players_page = PlayersPage(self.app_config, list_name, params)
+        sort_type = self.sort_types[sort_name]
+
+        pages = {}
+        lease_renewed_at = time.time()
+
+        for page_number in range(page_from, page_to + 1):
+            # renew the lease once half of it is spent
+            if time.time() - lease_renewed_at > self._lease_seconds / 2:
+                if not self._queue.extend(lease_id, self.worker_id, self._lease_seconds):
+                    print('[{}] lease {} was reassigned, dropping it'.format(self.worker_id, lease_id))
+                    return
+
+                lease_renewed_at = time.time()
+
+            try:
+                players = players_page.download(page_number, sort_type)
+            except Exception as e:
+                # the error pages raise, the lease is retried instead of completed with them
+                failed = self._queue.release(lease_id, self.worker_id)
+
+                print('[{}] {} page {} failed: {}, lease {} {}'.format(self.worker_id, list_name, page_number, e, lease_id,
+                                                                    'failed' if failed else 'released for the retry'))
+                return
+
+            pages[page_number] = [dataclasses.asdict(player) for player in players]
+
+            # keep the per IP request rate under the limit
+            time.sleep(self._request_delay)
+
+        accepted = self._queue.complete(lease_id, self.worker_id, pages)
+
+        print('[{}] {} {} pages {}-{} {}'.format(self.worker_id, list_name, params, page_from, page_to,
+                                                 'done' if accepted else 'discarded, lease was reassigned'))
@@ -0,0 +1,303 @@
+import json
+import sqlite3
+import time
+
+
+class LeaseQueue:
+    ''' Work queue of the distributed crawl stored in SQLite.
+
+    The coordinator splits (list, params, sort, page range) work into leases.
+    A worker claims a lease for a limited time and has to complete or extend it
+    before it expires, otherwise the lease is handed to another worker.
+    The worker failing to download a page releases the lease for the retry.
+    The lease claimed max_attempts times without being completed is failed,
+    so one broken page range does not keep the crawl from finishing.
+    The database file can live on a volume shared between the hosts.
+    '''
+
+    def __init__(self, path, max_attempts=3):
+        ''' Constructs new LeaseQueue instance.
+
+        Parameters
+        ----------
+            path : str
+                Path to the SQLite database file.
+
+            max_attempts : int
+                How many times the lease is claimed before it is failed.
+        '''
+
+        self._max_attempts = max_attempts
+
+        # autocommit mode, transactions are started explicitly with BEGIN IMMEDIATE
+        self._db = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self._db.executescript('''
+            CREATE TABLE IF NOT EXISTS leases (
+                lease_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                list_name TEXT,
+                params TEXT,
+                sort TEXT,
+                page_from INTEGER,
+                page_to INTEGER,
+                state TEXT DEFAULT 'pending',
+                worker_id TEXT,
+                expires_at REAL,
+                attempts INTEGER DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS leases_by_state ON leases (state, expires_at);
+            CREATE TABLE IF NOT EXISTS results (
+                list_name TEXT,
+                params TEXT,
+                sort TEXT,
+                page_number INTEGER,
+                worker_id TEXT,
+                fetched_at REAL,
+                players TEXT,
+                PRIMARY KEY (list_name, params, sort, page_number)
+            );
+            CREATE TABLE IF NOT EXISTS workers (
+                worker_id TEXT PRIMARY KEY,
+                host TEXT,
+                started_at REAL,
+                last_seen REAL,
+                leases_done INTEGER DEFAULT 0,
+                pages_done INTEGER DEFAULT 0,
+                players_done INTEGER DEFAULT 0,
+                errors INTEGER DEFAULT 0
+            );
+        ''')
+
+    def close(self):
+        ''' Closes the underlying database. '''
+
+        self._db.close()
+
+    def add_work(self, list_name, params, sort_name, pages, pages_per_lease):
+        ''' Splits the pages of the list into leases.
+
+        Parameters
+        ----------
+            list_name : str
+                Name of the list from the 'ranking_lists' config.
+
+            params : dict
+                Values of the list URL placeholders.
+
+            sort_name : str
+                'ASC', 'DESC' or 'NONE'.
+
+            pages : int
+                Number of the pages to crawl.
+
+            pages_per_lease : int
+                Size of one lease in pages.
+
+        Returns
+        -------
+            Number of the created leases.
+        '''
+
+        encoded_params = json.dumps(params, sort_keys=True)
+        leases = [(list_name, encoded_params, sort_name, page_from, min(page_from + pages_per_lease - 1, pages))
+                  for page_from in range(1, pages + 1, pages_per_lease)]
+
+        self._db.execute('BEGIN IMMEDIATE')
+        self._db.executemany('INSERT INTO leases (list_name, params, sort, page_from, page_to) VALUES (?, ?, ?, ?, ?)', leases)
+        self._db.execute('COMMIT')
+
+        return len(leases)
+
+    def register_worker(self, worker_id, host):
+        ''' Registers the worker or updates its start time. '''
+
+        now = time.time()
+        self._db.execute('INSERT OR REPLACE INTO workers (worker_id, host, started_at, last_seen) VALUES (?, ?, ?, ?)',
+                         (worker_id, host, now, now))
+
+    def claim(self, worker_id, lease_seconds):
+        ''' Claims the next pending or expired lease.
+
+        Returns
+        -------
+            (lease_id, list_name, params, sort_name, page_from, page_to) tuple
+            or None if there is nothing to claim.
+        '''
+
+        now = time.time()
+
+        self._db.execute('BEGIN IMMEDIATE')
+
+        try:
+            # the workers holding these leases died or hung on every attempt
+            self._db.execute('''
+                UPDATE leases SET state = 'failed' WHERE state = 'leased' AND expires_at < ? AND attempts >= ?
+            ''', (now, self._max_attempts))
+
+            row = self._db.execute('''
+                SELECT lease_id, list_name, params, sort, page_from, page_to FROM leases
+                WHERE state = 'pending' OR (state = 'leased' AND expires_at < ?)
+                ORDER BY lease_id LIMIT 1
+            ''', (now,)).fetchone()
+
+            if row is not None:
+                self._db.execute('''
+                    UPDATE leases SET state = 'leased', worker_id = ?, expires_at = ?, attempts = attempts + 1
+                    WHERE lease_id = ?
+                ''', (worker_id, now + lease_seconds, row[0]))
+
+            self._db.execute('UPDATE workers SET last_seen = ? WHERE worker_id = ?', (now, worker_id))
+            self._db.execute('COMMIT')
+
+        except Exception:
+            self._db.execute('ROLLBACK')
+            raise
+
+        if row is None:
+            return None
+
+        lease_id, list_name, params, sort_name, page_from, page_to = row
+
+        return lease_id, list_name, json.loads(params), sort_name, page_from, page_to
+
+    def extend(self, lease_id, worker_id, lease_seconds):
+        ''' Extends the lease still owned by the worker.
+
+        Returns
+        -------
+            False if the lease was reassigned to another worker.
+        '''
+
+        now = time.time()
+        cursor = self._db.execute('''
+            UPDATE leases SET expires_at = ? WHERE lease_id = ? AND worker_id = ? AND state = 'leased'
+        ''', (now + lease_seconds, lease_id, worker_id))
+        self._db.execute('UPDATE workers SET last_seen = ? WHERE worker_id = ?', (now, worker_id))
+
+        return cursor.rowcount == 1
+
+    def complete(self, lease_id, worker_id, pages):
+        ''' Stores the crawled pages and marks the lease done.
+        The results are discarded if the lease was reassigned meanwhile.
+
+        Parameters
+        ----------
+            lease_id : int
+                ID of the completed lease.
+
+            worker_id : str
+                ID of the worker.
+
+            pages : dict
+                page number -> list of player dicts
+
+        Returns
+        -------
+            True if the results were accepted.
+        '''
+
+        now = time.time()
+
+        self._db.execute('BEGIN IMMEDIATE')
+
+        try:
+            lease = self._db.execute('''
+                SELECT list_name, params, sort FROM leases WHERE lease_id = ? AND worker_id = ? AND state = 'leased'
+            ''', (lease_id, worker_id)).fetchone()
+
+            if lease is None:
+                self._db.execute('ROLLBACK')
+                return False
+
+            self._db.executemany('INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)',
+                                 [lease + (page_number, worker_id, now, json.dumps(players, ensure_ascii=False))
+                                  for page_number, players in pages.items()])
+
+            self._db.execute("UPDATE leases SET state = 'done' WHERE lease_id = ?", (lease_id,))
+            self._db.execute('''
+                UPDATE workers SET last_seen = ?, leases_done = leases_done + 1,
+                    pages_done = pages_done + ?, players_done = players_done + ?
+                WHERE worker_id = ?
+            ''', (now, len(pages), sum(len(players) for players in pages.values()), worker_id))
+
+            self._db.execute('COMMIT')
+
+        except Exception:
+            self._db.execute('ROLLBACK')
+            raise
+
+        return True
+
+    def release(self, lease_id, worker_id):
+        ''' Gives up the lease after the failed page download and counts the error of the worker.
+        The lease is pending again, or failed once it was claimed max_attempts times.
+
+        Returns
+        -------
+            True if the lease is failed.
+        '''
+
+        now = time.time()
+
+        self._db.execute('BEGIN IMMEDIATE')
+
+        try:
+            self._db.execute('''
+                UPDATE leases SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                    worker_id = NULL, expires_at = NULL
+                WHERE lease_id = ? AND worker_id = ? AND state = 'leased'
+            ''', (self._max_attempts, lease_id, worker_id))
+
+            self._db.execute('UPDATE workers SET errors = errors + 1, last_seen = ? WHERE worker_id = ?', (now, worker_id))
+
+            state, = self._db.execute('SELECT state FROM leases WHERE lease_id = ?', (lease_id,)).fetchone()
+
+            self._db.execute('COMMIT')
+
+        except Exception:
+            self._db.execute('ROLLBACK')
+            raise
+
+        return state == 'failed'
+
+    def is_finished(self):
+        ''' Check if all the leases are done or failed. '''
+
+        return self._db.execute("SELECT COUNT(*) FROM leases WHERE state NOT IN ('done', 'failed')").fetchone()[0] == 0
+
+    def lease_counts(self):
+        ''' Returns dict state -> number of the leases. '''
+
+        return dict(self._db.execute('SELECT state, COUNT(*) FROM leases GROUP BY state'))
+
+    def worker_stats(self):
+        ''' Returns the per worker progress.
+
+        Returns
+        -------
+            List of (worker_id, host, leases_done, pages_done, players_done, errors,
+            pages per minute, seconds since last seen) tuples.
+        '''
+
+        now = time.time()
+        stats = []
+
+        for worker_id, host, started_at, last_seen, leases_done, pages_done, players_done, errors in self._db.execute(
+                'SELECT worker_id, host, started_at, last_seen, leases_done, pages_done, players_done, errors FROM workers ORDER BY worker_id'):
+            elapsed = max(last_seen - started_at, 1e-6)
+            stats.append((worker_id, host, leases_done, pages_done, players_done, errors,
+                          pages_done * 60 / elapsed, now - last_seen))
+
+        return stats
+
+    def results(self, list_name=None):
+        ''' Returns (list_name, params, sort_name, page_number, players) tuples of the stored pages. '''
+
+        query = 'SELECT list_name, params, sort, page_number, players FROM results'
+        args = ()
+
+        if list_name is not None:
+            query += ' WHERE list_name = ?'
+            args = (list_name,)
+
+        return [(name, json.loads(params), sort_name, page_number, json.loads(players))
+                for name, params, sort_name, page_number, players in self._db.execute(query + ' ORDER BY 1, 2, 3, 4', args)]
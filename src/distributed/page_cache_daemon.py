@@ -0,0 +1,271 @@
+import collections
+import dataclasses
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+
+from model.player import Player
+
+
+class PageCacheDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    ''' Page cache shared by the application instances running on one host.
+
+    Clients ask the daemon for a page before downloading it. The first client
+    asking for a missing page is told to fetch it, the others asking meanwhile
+    wait until it publishes the page, so every page is downloaded once no
+    matter how many instances need it. A client which did not publish the page
+    in fetchTimeout seconds is considered dead and the page is handed to the
+    next waiting client.
+
+    A client refreshing its pages asks only for the pages published after
+    its refresh, the older copies stay for the other clients.
+
+    Every request is one JSON line, the response is one JSON line as well.
+    '''
+
+    daemon_threads = True
+
+    class Handler(socketserver.StreamRequestHandler):
+        ''' Serves one client request. '''
+
+        def handle(self):
+            line = self.rfile.readline()
+            if not line:
+                return
+
+            response = self.server._dispatch(json.loads(line))
+            self.wfile.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b'\n')
+
+    def __init__(self, app_config):
+        ''' Constructs PageCacheDaemon instance and binds its socket.
+
+        Parameters
+        ----------
+            app_config : AppConfig
+                Instance of application configuration file.
+        '''
+
+        config = app_config.cache_daemon
+
+        self._capacity = config['capacity']
+        self._max_age = config['maxAgeSeconds']
+        self._fetch_timeout = config['fetchTimeout']
+
+        # key -> (stored at, players, ETag, Last-Modified), the least recently used first
+        self._pages = collections.OrderedDict()
+
+        # key -> deadline of the client fetching the page
+        self._fetching = {}
+
+        self._lock = threading.Lock()
+        self._page_published = threading.Condition(self._lock)
+
+        self._stats = collections.Counter()
+
+        socket_path = config['socketPath']
+
+        # the socket file of the daemon which is not running anymore
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+        super(self.__class__, self).__init__(socket_path, self.Handler)
+
+    def server_close(self):
+        super(self.__class__, self).server_close()
+
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+    def _dispatch(self, request):
+        ''' [Private] Runs the request operation. '''
+
+        operation = request['op']
+
+        if operation == 'get':
+            return self._get(request['key'], request.get('since', 0))
+
+        if operation == 'put':
+            return self._put(request['key'], request['players'], request.get('etag'), request.get('last_modified'))
+
+        if operation == 'abandon':
+            return self._abandon(request['key'])
+
+        if operation == 'stats':
+            with self._lock:
+                return dict(self._stats, pages=len(self._pages), fetching=len(self._fetching))
+
+        return {'status': 'error', 'message': 'unknown operation {}'.format(operation)}
+
+    def _get(self, key, since):
+        ''' [Private] Returns the page published after the since time or makes the client fetch it. '''
+
+        with self._lock:
+            waited = False
+
+            while True:
+                now = time.time()
+
+                entry = self._pages.get(key)
+                if entry is not None and now - entry[0] <= self._max_age and entry[0] >= since:
+                    self._pages.move_to_end(key)
+                    self._stats['coalesced' if waited else 'hits'] += 1
+
+                    return {'status': 'hit', 'players': entry[1], 'etag': entry[2], 'last_modified': entry[3]}
+
+                deadline = self._fetching.get(key)
+                if deadline is None or deadline < now:
+                    self._fetching[key] = now + self._fetch_timeout
+                    self._stats['misses'] += 1
+
+                    return {'status': 'fetch'}
+
+                # another client is fetching the page right now
+                waited = True
+                self._page_published.wait(deadline - now)
+
+    def _put(self, key, players, etag, last_modified):
+        ''' [Private] Stores the page with its validators and wakes up the clients waiting for it. '''
+
+        with self._lock:
+            self._pages[key] = (time.time(), players, etag, last_modified)
+            self._pages.move_to_end(key)
+
+            while len(self._pages) > self._capacity:
+                self._pages.popitem(last=False)
+
+            self._fetching.pop(key, None)
+            self._page_published.notify_all()
+
+        return {'status': 'ok'}
+
+    def _abandon(self, key):
+        ''' [Private] Hands the page failed to download to the next waiting client. '''
+
+        with self._lock:
+            self._fetching.pop(key, None)
+            self._page_published.notify_all()
+
+        return {'status': 'ok'}
+
+
+class SharedPlayersPage:
+    ''' PlayersPage which downloads the pages through the PageCacheDaemon.
+    If the daemon is not running, the pages are downloaded directly.
+    '''
+
+    def __init__(self, app_config, players_page):
+        ''' Constructs SharedPlayersPage instance.
+
+        Parameters
+        ----------
+            app_config : AppConfig
+                Instance of application configuration file.
+
+            players_page : PlayersPage
+                Used to download the pages the daemon asks to fetch.
+        '''
+
+        config = app_config.cache_daemon
+
+        self.players_page = players_page
+
+        self._socket_path = config['socketPath']
+        self._timeout = config['fetchTimeout'] * 2
+
+        # the daemon pages published before the last refresh are not used
+        self._refreshed_at = 0
+
+    def players_on_page(self):
+        ''' Returns number of players on the page. '''
+
+        return self.players_page.players_on_page()
+
+    def download(self, page_number, sort_type, on_rows=None):
+        ''' Returns the page from the daemon or downloads and publishes it.
+        The page taken from the daemon is cached locally as if it was downloaded.
+        The arguments are the same as for PlayersPage.download.
+        '''
+
+        key = '{}|{}|{}|{}'.format(self.players_page.list_name, json.dumps(self.players_page.params, sort_keys=True),
+                                   self.players_page.sort_names[sort_type], page_number)
+
+        try:
+            response = self._request({'op': 'get', 'key': key, 'since': self._refreshed_at})
+        except OSError:
+            return self.players_page.download(page_number, sort_type, on_rows)
+
+        if response['status'] == 'hit':
+            players = [Player(**player) for player in response['players']]
+            self.players_page.store(page_number, sort_type, players, response.get('etag'), response.get('last_modified'))
+
+            return players
+
+        try:
+            players = self.players_page.download(page_number, sort_type, on_rows)
+        except Exception:
+            self._request_quietly({'op': 'abandon', 'key': key})
+            raise
+
+        etag, last_modified = self.players_page.validators(page_number, sort_type)
+
+        self._request_quietly({'op': 'put', 'key': key, 'players': [dataclasses.asdict(player) for player in players],
+                               'etag': etag, 'last_modified': last_modified})
+
+        return players
+
+    def requests_sent(self):
+        ''' Returns the number of the requests the calling thread sent to the site,
+        the pages taken from the daemon do not count.
+        '''
+
+        return self.players_page.requests_sent()
+
+    def total(self):
+        ''' Returns the number of the players in the list, see PlayersPage.total. '''
+
+        return self.players_page.total()
+
+    def cached_page(self, page_number, sort_type):
+        ''' Returns the page cached locally, see PlayersPage.cached_page. '''
+
+        return self.players_page.cached_page(page_number, sort_type)
+
+    def drop_cache(self):
+        ''' Drops the pages of the list cached locally. The daemon keeps its pages
+        for the other instances, this one takes only the pages published from now on.
+        '''
+
+        self.players_page.drop_cache()
+        self._refreshed_at = time.time()
+
+    def stats(self):
+        ''' Returns the daemon counters. '''
+
+        return self._request({'op': 'stats'})
+
+    def _request(self, request):
+        ''' [Private] Sends the request to the daemon and returns the response. '''
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            connection.settimeout(self._timeout)
+            connection.connect(self._socket_path)
+            connection.sendall(json.dumps(request, ensure_ascii=False).encode('utf-8') + b'\n')
+
+            with connection.makefile('rb') as response:
+                line = response.readline()
+
+        if not line:
+            raise ConnectionError('the cache daemon closed the connection')
+
+        return json.loads(line)
+
+    def _request_quietly(self, request):
+        ''' [Private] Sends the request ignoring the daemon failures. '''
+
+        try:
+            self._request(request)
+        except OSError as e:
+            print('Cache daemon request {} failed: {}'.format(request['op'], e))
@@ -6,24 +6,43 @@ import argparse
 from PyQt5 import QtWidgets
 
 from app_config import AppConfig
+from misc.memory_monitor import memory_monitor
+from misc.tracer import tracer
 from ui.main_window import MainWindow
 
 
 def main(args):
+    if args.trace:
+        tracer.enable()
+
     app = QtWidgets.QApplication(sys.argv)
 
     app_config = AppConfig(args.config_path)
 
+    if args.memory:
+        memory_monitor.enable(app_config.memory_monitor['frames'], app_config.memory_monitor['topCount'])
+
     window = MainWindow(app_config)
     window.show()
 
-    return app.exec_()
+    exit_code = app.exec_()
+
+    if args.trace:
+        tracer.save(args.trace)
+
+    if args.memory:
+        memory_monitor.sample()
+        memory_monitor.save(args.memory)
+
+    return exit_code
 
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
 
     parser.add_argument('config_path', type=str, help='path to the configuration file')
+    parser.add_argument('--trace', type=str, metavar='FILE', help='record the session timeline into the Chrome trace JSON file')
+    parser.add_argument('--memory', type=str, metavar='FILE', help='sample the memory of the subsystems and save the samples into the JSON file')
 
     args = parser.parse_args()
 
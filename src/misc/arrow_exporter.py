@@ -0,0 +1,65 @@
+from misc.exporter import Exporter
+
+# pyarrow is optional, the formats are hidden from the export dialog without it
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+class ArrowExporter(Exporter):
+    ''' Exports football players information in the Arrow IPC file format.
+    Every batch is written as one record batch with the typed columns.
+    '''
+
+    format_name = 'arrow'
+    extension = 'arrow'
+
+    @classmethod
+    def is_available(cls):
+        return pyarrow is not None
+
+    @classmethod
+    def schema(cls):
+        ''' Returns the pyarrow.Schema of the typed columns. '''
+
+        arrow_types = {
+            'str': pyarrow.string(),
+            'int': pyarrow.int64(),
+            'float': pyarrow.float64(),
+        }
+
+        return pyarrow.schema([(name, arrow_types[column_type]) for name, column_type, _ in cls.columns])
+
+    @classmethod
+    def record_batch(cls, batch, schema):
+        ''' Converts the batch of players into the pyarrow.RecordBatch. '''
+
+        return pyarrow.RecordBatch.from_arrays(
+            [pyarrow.array(values, type=field.type) for values, field in zip(cls.typed_columns(batch), schema)],
+            schema=schema)
+
+    def write_batches(self, batches, output_filename):
+        schema = self.schema()
+
+        with pyarrow.ipc.new_file(output_filename, schema) as writer:
+            for batch in batches:
+                writer.write_batch(self.record_batch(batch, schema))
+
+
+class ParquetExporter(ArrowExporter):
+    ''' Exports football players information in the Parquet format.
+    Every batch is written as one row group.
+    '''
+
+    format_name = 'parquet'
+    extension = 'parquet'
+
+    def write_batches(self, batches, output_filename):
+        schema = self.schema()
+
+        with pyarrow.parquet.ParquetWriter(output_filename, schema) as writer:
+            for batch in batches:
+                writer.write_table(pyarrow.Table.from_batches([self.record_batch(batch, schema)]))
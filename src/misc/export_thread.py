@@ -0,0 +1,48 @@
+from PyQt5.QtCore import pyqtSignal, QThread
+
+from misc.tracer import tracer
+
+
+class ExportThread(QThread):
+    ''' Runs the export off the GUI thread, the missing player profiles
+    are downloaded meanwhile. The outcome is reported by the signals.
+    '''
+
+    # output file name
+    exported_signal = pyqtSignal(str, name='exported')
+
+    # output file name, error message
+    export_failed_signal = pyqtSignal(str, str, name='export_failed')
+
+    def __init__(self, exporter, players_manager, output_filename):
+        ''' Constructs ExportThread instance.
+
+        Parameters
+        ----------
+            exporter : Exporter
+                Exporter of the chosen format.
+
+            players_manager : PlayersManager
+                Source of the exported players.
+
+            output_filename : str
+                Path to the output file.
+        '''
+
+        super(self.__class__, self).__init__()
+
+        self.exporter = exporter
+        self.players_manager = players_manager
+        self.output_filename = output_filename
+
+    def run(self):
+        ''' This code runs in the separate thread. '''
+
+        try:
+            with tracer.span('export', 'export', format=self.exporter.format_name):
+                self.exporter.export(self.players_manager, self.output_filename)
+        except Exception as e:
+            self.export_failed_signal.emit(self.output_filename, str(e))
+            return
+
+        self.exported_signal.emit(self.output_filename)
@@ -0,0 +1,96 @@
+import abc
+
+from model.players_table_model import PlayersTableModel
+
+
+class Exporter(abc.ABC):
+    ''' Base class of the table exporters.
+
+    An exporter declares its format name and file extension and implements
+    write_batches. The players are streamed from the players manager in
+    batches, the missing profiles are downloaded per batch, so every batch
+    is written before the next one is read. The formats with row groups
+    write every batch as is. New exporters are plugged in by adding them
+    to misc.exporters.
+    '''
+
+    format_name = None
+    extension = None
+
+    # Rows per batch, a row group of the columnar formats.
+    batch_size = 10000
+
+    # Typed columns of the machine readable formats: (name, type, value getter).
+    # Types are 'str', 'int' and 'float', all the columns are nullable.
+    columns = [
+        ('player_id', 'int', lambda player, profile: player.player_id),
+        ('name', 'str', lambda player, profile: player.name),
+        ('role', 'str', lambda player, profile: player.role),
+        ('age', 'int', lambda player, profile: player.age),
+        ('nationality', 'str', lambda player, profile: player.nationality),
+        ('club', 'str', lambda player, profile: player.club),
+        ('price', 'str', lambda player, profile: player.price),
+        ('market_value', 'int', lambda player, profile: player.market_value()),
+        ('foot', 'str', lambda player, profile: profile.foot if profile else None),
+        ('height', 'str', lambda player, profile: profile.height if profile else None),
+        ('contract_expiry', 'str', lambda player, profile: profile.contract_expiry if profile else None),
+        ('peak_market_value', 'int', lambda player, profile: profile.peak_market_value() if profile else None),
+    ]
+
+    @classmethod
+    def is_available(cls):
+        ''' Check if the optional dependencies of the format are installed. '''
+
+        return True
+
+    def export(self, players_manager, output_filename):
+        ''' Exports cached data from players_manager into a output_filename file.
+
+        Parameters
+        ----------
+        players_manager : PlayersManager
+            Class that stores players information. Only cached players will be dumped
+            to the disk, each player once even if it was loaded from several pages.
+            Missing player profiles are downloaded batch by batch.
+
+        output_filename : str
+            Path to the file where to store players information.
+        '''
+
+        self.write_batches(self.batches(players_manager), output_filename)
+
+    @abc.abstractmethod
+    def write_batches(self, batches, output_filename):
+        ''' Writes the batches into the file.
+
+        Parameters
+        ----------
+        batches : iterable
+            Lists of (Player, PlayerProfile or None) tuples.
+
+        output_filename : str
+            Path to the output file.
+        '''
+
+    def batches(self, players_manager):
+        ''' Yields the batches of (Player, PlayerProfile or None) tuples, the profiles are downloaded per batch. '''
+
+        for players in players_manager.cached_player_batches(self.batch_size):
+            profiles = players_manager.get_profiles_blocking(players)
+
+            yield [(player, profiles.get(player.player_id)) for player in players]
+
+    @classmethod
+    def typed_columns(cls, batch):
+        ''' Returns the batch as a list of the typed column value lists. '''
+
+        return [[getter(player, profile) for player, profile in batch] for _, _, getter in cls.columns]
+
+    @staticmethod
+    def table_row(player, profile):
+        ''' Returns the row as it is shown in the table, used by the spreadsheet formats. '''
+
+        return [PlayersTableModel.get_player_field_by_idx(player, column)
+                for column in range(PlayersTableModel.TableHeader.PROFILE_COLUMN_START)] + \
+               [PlayersTableModel.get_profile_field_by_idx(profile, column)
+                for column in range(PlayersTableModel.TableHeader.PROFILE_COLUMN_START, PlayersTableModel.TableHeader.COLUMN_COUNT)]
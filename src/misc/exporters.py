@@ -0,0 +1,30 @@
+from misc.arrow_exporter import ArrowExporter, ParquetExporter
+from misc.csv_exporter import CsvExporter
+from misc.jsonl_exporter import JsonLinesExporter
+from misc.xlsx_exporter import XlsxExporter
+
+# All the known exporters by the format name.
+exporters = {exporter.format_name: exporter for exporter in [
+    CsvExporter,
+    XlsxExporter,
+    JsonLinesExporter,
+    ArrowExporter,
+    ParquetExporter,
+]}
+
+
+def available_formats():
+    ''' Returns the names of the formats whose dependencies are installed. '''
+
+    return [format_name for format_name, exporter in exporters.items() if exporter.is_available()]
+
+
+def get_exporter(format_name):
+    ''' Returns the exporter instance for the format or None if the format is unknown or unavailable. '''
+
+    exporter = exporters.get(format_name)
+
+    if exporter is None or not exporter.is_available():
+        return None
+
+    return exporter()
@@ -0,0 +1,26 @@
+import json
+
+from misc.exporter import Exporter
+
+
+class JsonLinesExporter(Exporter):
+    ''' Exports football players information in the JSON Lines format,
+    one object with the typed columns per line.
+    '''
+
+    format_name = 'jsonl'
+    extension = 'jsonl'
+
+    def write_batches(self, batches, output_filename):
+        ''' Writes every batch with one write call. '''
+
+        names = [name for name, _, _ in self.columns]
+        getters = [getter for _, _, getter in self.columns]
+
+        encoder = json.JSONEncoder(ensure_ascii=False)
+
+        with open(output_filename, 'w', encoding='utf-8') as jsonl_file:
+            for batch in batches:
+                jsonl_file.write(''.join(
+                    encoder.encode(dict(zip(names, [getter(player, profile) for getter in getters]))) + '\n'
+                    for player, profile in batch))
@@ -0,0 +1,191 @@
+import collections
+import gc
+import json
+import os
+import time
+import tracemalloc
+
+
+class MemoryMonitor:
+    ''' Attributes the live allocations to the application subsystems.
+
+    Every sample takes the tracemalloc snapshot and charges each block to
+    the subsystem of the most recent frame of its traceback which comes from
+    the subsystem sources, the live objects are counted by type as well. The
+    sample is compared with the previous and the first one, so the growth
+    of every subsystem and object type is seen from sample to sample.
+
+    The blocks are charged where they were allocated: the players parsed by
+    the scrape engine stay in the 'parser' even while the page cache holds
+    them, the object counts show who keeps them alive.
+    '''
+
+    # subsystem -> fragments of the source paths, the subsystems are matched in this order
+    subsystems = collections.OrderedDict([
+        ('cache', ('model/lru_page_cache.py', 'model/binary_snapshot.py', 'model/access_log.py', 'distributed/')),
+        ('export', ('misc/exporter', '_exporter.py', 'xlsxwriter/', 'pyarrow/', '/csv.py')),
+        ('parser', ('model/scrape_engine.py', 'model/row_splitter.py', 'model/players_page.py',
+                    'model/player_profile_page.py', 'bs4/', 'lxml/', 'html/parser.py')),
+        ('fetch', ('requests/', 'urllib3/', 'http/client.py', '/ssl.py', '/socket.py')),
+        ('model', ('model/',)),
+        ('ui', ('ui/', 'PyQt5/', 'pyqtspinner/')),
+    ])
+
+    other = 'other'
+
+    def __init__(self):
+        ''' Constructs new disabled MemoryMonitor instance. '''
+
+        self.enabled = False
+
+        self._top_count = 10
+        self._started_at = 0
+
+        # source file -> subsystem, the lookups repeat for every traceback.
+        # The blocks allocated by tracemalloc itself are not counted.
+        self._file_subsystems = {tracemalloc.__file__: None}
+
+        self._first_sizes = None
+        self._previous_sizes = None
+        self._previous_objects = None
+        self._previous_snapshot = None
+
+        self._reports = []
+
+    def enable(self, frames, top_count):
+        ''' Starts tracing the allocations and takes the first sample.
+
+        Parameters
+        ----------
+            frames : int
+                Number of the frames stored for every allocation,
+                the deeper tracebacks are attributed better but cost more.
+
+            top_count : int
+                Number of the object types and allocation sites in the report.
+        '''
+
+        self._top_count = top_count
+        self._started_at = time.monotonic()
+
+        tracemalloc.start(frames)
+        self.enabled = True
+
+        self.sample()
+
+    def sample(self):
+        ''' Takes the sample, prints its difference from the previous one and returns the report.
+
+        Returns
+        -------
+            Dictionary with the 'subsystems' sizes, the 'objects' counts
+            and the 'allocations' grown the most since the previous sample.
+        '''
+
+        if not self.enabled:
+            return None
+
+        snapshot = tracemalloc.take_snapshot()
+
+        sizes = collections.Counter({subsystem: 0 for subsystem in self.subsystems})
+        sizes[self.other] = 0
+
+        for statistic in snapshot.statistics('traceback'):
+            subsystem = self._subsystem(statistic.traceback)
+
+            if subsystem is not None:
+                sizes[subsystem] += statistic.size
+
+        objects = collections.Counter(type(instance).__qualname__ for instance in gc.get_objects())
+
+        if self._first_sizes is None:
+            self._first_sizes = sizes
+            self._previous_sizes = sizes
+            self._previous_objects = objects
+            self._previous_snapshot = snapshot
+
+        traced, peak = tracemalloc.get_traced_memory()
+
+        report = {
+            'seconds': round(time.monotonic() - self._started_at, 1),
+            'traced': traced,
+            'peak': peak,
+            'subsystems': [(subsystem, size, size - self._previous_sizes[subsystem], size - self._first_sizes[subsystem])
+                           for subsystem, size in sizes.items()],
+            'objects': self._objects_diff(objects),
+            'allocations': [(str(statistic.traceback[0]), statistic.size, statistic.size_diff)
+                            for statistic in snapshot.compare_to(self._previous_snapshot, 'lineno')[:self._top_count]],
+        }
+
+        self._previous_sizes = sizes
+        self._previous_objects = objects
+        self._previous_snapshot = snapshot
+
+        self._reports.append(report)
+
+        self._print(report)
+
+        return report
+
+    def last_report(self):
+        ''' Returns the report of the last sample or None. '''
+
+        return self._reports[-1] if self._reports else None
+
+    def save(self, output_filename):
+        ''' Writes the reports of all the samples into the JSON file.
+
+        Parameters
+        ----------
+            output_filename : str
+                Path to the output file.
+        '''
+
+        with open(output_filename, 'w', encoding='utf-8') as report_file:
+            json.dump({'samples': self._reports}, report_file, indent=4)
+
+    def _subsystem(self, traceback):
+        ''' [Private] Returns the subsystem of the most recent frame coming from its sources,
+        None for the blocks of the monitor itself.
+        '''
+
+        for frame in reversed(traceback):
+            if frame.filename not in self._file_subsystems:
+                path = frame.filename.replace(os.sep, '/')
+                self._file_subsystems[frame.filename] = next((subsystem for subsystem, fragments in self.subsystems.items()
+                                                              if any(fragment in path for fragment in fragments)), '')
+
+            subsystem = self._file_subsystems[frame.filename]
+
+            if subsystem != '':
+                return subsystem
+
+        return self.other
+
+    def _objects_diff(self, objects):
+        ''' [Private] Returns (type, count, change) of the types changed the most, then the most numerous. '''
+
+        changes = [(type_name, count, count - self._previous_objects[type_name]) for type_name, count in objects.items()]
+        changes.extend((type_name, 0, -count) for type_name, count in self._previous_objects.items() if type_name not in objects)
+
+        changes.sort(key=lambda change: (abs(change[2]), change[1]), reverse=True)
+
+        return changes[:self._top_count]
+
+    @staticmethod
+    def _print(report):
+        ''' [Private] Prints the sizes of the subsystems and the top growing objects. '''
+
+        print('Memory at {}s: {:.1f} MB traced, {:.1f} MB peak'.format(report['seconds'], report['traced'] / 2 ** 20,
+                                                                      report['peak'] / 2 ** 20))
+
+        for subsystem, size, change, growth in report['subsystems']:
+            print('    {:8} {:9.2f} MB {:+9.2f} MB {:+9.2f} MB since start'.format(subsystem, size / 2 ** 20,
+                                                                                change / 2 ** 20, growth / 2 ** 20))
+
+        print('    objects: {}'.format(', '.join('{} {} ({:+})'.format(type_name, count, change)
+                                                 for type_name, count, change in report['objects'] if change)))
+
+
+# Application wide memory monitor, enabled by the --memory command line option.
+memory_monitor = MemoryMonitor()
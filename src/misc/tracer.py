@@ -0,0 +1,133 @@
+import functools
+import json
+import os
+import threading
+import time
+
+
+class _NullSpan:
+    ''' Span returned while the tracing is disabled. Does nothing. '''
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class _Span:
+    ''' Span recording its duration into the tracer on exit. '''
+
+    __slots__ = ('tracer', 'name', 'category', 'args', 'start')
+
+    def __init__(self, tracer, name, category, args):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.tracer._record(self.name, self.category, self.start, time.perf_counter(), self.args)
+        return False
+
+
+class Tracer:
+    ''' Records timeline spans and saves them in the Chrome trace-event format.
+    The result can be opened in chrome://tracing or Perfetto.
+    While the tracer is disabled, span() returns a shared no-op object.
+    '''
+
+    _null_span = _NullSpan()
+
+    def __init__(self):
+        ''' Constructs new disabled Tracer instance. '''
+
+        self.enabled = False
+
+        self._events = []
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+
+    def enable(self):
+        ''' Starts recording the spans. '''
+
+        self._origin = time.perf_counter()
+        self.enabled = True
+
+    def span(self, name, category='app', **args):
+        ''' Returns the context manager measuring the enclosed code.
+
+        Parameters
+        ----------
+            name : str
+                Span name shown on the timeline.
+
+            category : str
+                Span category (fetch, parse, cache, model, export...).
+
+            args
+                Extra values shown in the span details.
+        '''
+
+        if not self.enabled:
+            return self._null_span
+
+        return _Span(self, name, category, args)
+
+    def traced(self, category):
+        ''' Decorator wrapping every call of the function into the span. '''
+
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+
+                with _Span(self, function.__qualname__, category, {}):
+                    return function(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def save(self, output_filename):
+        ''' Writes the recorded spans into the Chrome trace JSON file.
+
+        Parameters
+        ----------
+            output_filename : str
+                Path to the output file.
+        '''
+
+        with self._lock:
+            events = list(self._events)
+
+        with open(output_filename, 'w', encoding='utf-8') as trace_file:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, trace_file)
+
+    def _record(self, name, category, start, end, args):
+        ''' [Private] Stores the complete ('X') event. '''
+
+        event = {
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': (start - self._origin) * 1e6,
+            'dur': (end - start) * 1e6,
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+        }
+
+        if args:
+            event['args'] = args
+
+        with self._lock:
+            self._events.append(event)
+
+
+# Application wide tracer, enabled by the --trace command line option.
+tracer = Tracer()
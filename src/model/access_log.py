@@ -0,0 +1,91 @@
+import collections
+import sqlite3
+import threading
+import time
+
+
+class AccessLog:
+    ''' Log of the pages the user looked at, one row per page and session.
+
+    The pages are counted in memory and written once when the session ends.
+    The hot pages are ranked by the number of accesses weighted by the session
+    age, so both the frequently and the recently used pages come first.
+    '''
+
+    # Weight of the accesses of the previous session relative to the next one.
+    session_decay = 0.5
+
+    def __init__(self, path, keep_sessions):
+        ''' Constructs new AccessLog instance and starts the new session.
+
+        Parameters
+        ----------
+            path : str
+                Path to the SQLite database file.
+
+            keep_sessions : int
+                Number of the last sessions to keep in the log.
+        '''
+
+        self._keep_sessions = keep_sessions
+        self._lock = threading.Lock()
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript('''
+            CREATE TABLE IF NOT EXISTS sessions (session INTEGER PRIMARY KEY AUTOINCREMENT, started_at REAL);
+            CREATE TABLE IF NOT EXISTS accesses (
+                session INTEGER,
+                list_name TEXT,
+                sort TEXT,
+                page_number INTEGER,
+                count INTEGER,
+                PRIMARY KEY (session, list_name, sort, page_number)
+            ) WITHOUT ROWID;
+        ''')
+
+        self._session = self._db.execute('INSERT INTO sessions (started_at) VALUES (?)', (time.time(),)).lastrowid
+        self._db.commit()
+
+        # (list_name, sort, page_number) -> accesses in the current session
+        self._accesses = collections.Counter()
+
+    def record(self, list_name, sort_name, page_number):
+        ''' Counts the access to the page in the current session. '''
+
+        with self._lock:
+            self._accesses[(list_name, sort_name, page_number)] += 1
+
+    def touch(self, list_name, sort_name, page_number):
+        ''' Marks the page accessed in the current session without counting it again. '''
+
+        with self._lock:
+            key = (list_name, sort_name, page_number)
+            self._accesses[key] = max(self._accesses[key], 1)
+
+    def hot_pages(self, list_name, sort_name, limit):
+        ''' Returns up to limit page numbers of the list used by the previous sessions, the hottest first. '''
+
+        scores = collections.Counter()
+
+        with self._lock:
+            for session, page_number, count in self._db.execute('''
+                    SELECT session, page_number, count FROM accesses
+                    WHERE list_name = ? AND sort = ? AND session < ?
+                    ''', (list_name, sort_name, self._session)):
+                scores[page_number] += count * self.session_decay ** (self._session - session - 1)
+
+        return [page_number for page_number, _ in scores.most_common(limit)]
+
+    def close(self):
+        ''' Writes the current session and drops the sessions which are too old. '''
+
+        with self._lock:
+            self._db.executemany('INSERT OR REPLACE INTO accesses VALUES (?, ?, ?, ?, ?)',
+                                 [(self._session,) + page + (count,) for page, count in self._accesses.items()])
+
+            oldest_session = self._session - self._keep_sessions + 1
+            self._db.execute('DELETE FROM accesses WHERE session < ?', (oldest_session,))
+            self._db.execute('DELETE FROM sessions WHERE session < ?', (oldest_session,))
+
+            self._db.commit()
+            self._db.close()
@@ -0,0 +1,224 @@
+import mmap
+import os
+import struct
+
+from model.player import Player
+
+
+class BinarySnapshot:
+    ''' Fixed layout binary snapshot of the players table.
+
+    The file consists of the header, the string table and one fixed-width
+    column per player field. The string table is an array of offsets into a
+    block of UTF-8 strings, so repeated clubs and nationalities are stored once.
+    The file is opened with mmap and the columns are read in place through
+    memoryview casts, nothing is deserialized up front.
+
+    Layout (little endian)::
+
+        header   magic, sort type of the rows, row count, string count, string data size
+        offsets  (string count + 1) x u32
+        strings  UTF-8 data, zero padded to 4 bytes
+        columns  one array of row count items per column, see COLUMNS
+    '''
+
+    MAGIC = b'TMSNAP02'
+
+    _header = struct.Struct('<8sIIII')
+
+    # Player field and memoryview format of every column, in the file order.
+    # String fields ('I') hold the index in the string table, EMPTY_STRING
+    # for None. Integer fields ('i') hold -1 for None.
+    COLUMNS = [
+        ('name', 'I'),
+        ('role', 'I'),
+        ('age', 'i'),
+        ('nationality', 'I'),
+        ('club', 'I'),
+        ('price', 'I'),
+        ('player_id', 'i'),
+    ]
+
+    EMPTY_STRING = 0xFFFFFFFF
+
+    _string_fields = {'name', 'role', 'nationality', 'club', 'price'}
+
+    # Table model column -> snapshot column
+    _table_columns = [0, 1, 2, 3, 4, 5]
+
+    def __init__(self, path):
+        ''' Opens the snapshot file.
+
+        Parameters
+        ----------
+            path : str
+                Path to the snapshot file.
+
+        The file which is not a snapshot, truncated or corrupt raises ValueError.
+        '''
+
+        with open(path, 'rb') as snapshot_file:
+            self._mmap = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            self._validate(path)
+        except ValueError:
+            self._mmap.close()
+            raise
+
+        _, self.sort_type, self.row_count, string_count, strings_size = self._header.unpack_from(self._mmap, 0)
+
+        view = memoryview(self._mmap)
+        offset = self._header.size
+
+        self._string_offsets = view[offset:offset + (string_count + 1) * 4].cast('I')
+        offset += (string_count + 1) * 4
+
+        self._strings = view[offset:offset + strings_size]
+        offset += self._aligned(strings_size)
+
+        self._columns = []
+        for _, column_format in self.COLUMNS:
+            self._columns.append(view[offset:offset + self.row_count * 4].cast(column_format))
+            offset += self.row_count * 4
+
+        view.release()
+
+    def _validate(self, path):
+        ''' [Private] Checks the header and the sizes of the tables against the file size. '''
+
+        if len(self._mmap) < self._header.size:
+            raise ValueError('{} is truncated'.format(path))
+
+        magic, _, row_count, string_count, strings_size = self._header.unpack_from(self._mmap, 0)
+
+        if magic != self.MAGIC:
+            raise ValueError('{} is not a players snapshot'.format(path))
+
+        expected_size = (self._header.size + (string_count + 1) * 4 + self._aligned(strings_size) +
+                         row_count * 4 * len(self.COLUMNS))
+
+        if len(self._mmap) != expected_size:
+            raise ValueError('{} is {} bytes long, its header tells {}'.format(path, len(self._mmap), expected_size))
+
+        offsets = struct.unpack_from('<{}I'.format(string_count + 1), self._mmap, self._header.size)
+
+        if offsets[0] != 0 or offsets[-1] != strings_size or any(a > b for a, b in zip(offsets, offsets[1:])):
+            raise ValueError('{} has corrupt string table'.format(path))
+
+    def close(self):
+        ''' Releases the mapping. '''
+
+        for column in self._columns:
+            column.release()
+
+        self._string_offsets.release()
+        self._strings.release()
+        self._mmap.close()
+
+    def __len__(self):
+        return self.row_count
+
+    def has_row(self, row):
+        ''' Check if the row holds a player, the rows not loaded when the snapshot was written are empty. '''
+
+        return row < self.row_count and self._columns[0][row] != self.EMPTY_STRING
+
+    def field(self, row, column):
+        ''' Returns the value of the table model column for the row. '''
+
+        snapshot_column = self._table_columns[column]
+        value = self._columns[snapshot_column][row]
+
+        if self.COLUMNS[snapshot_column][0] in self._string_fields:
+            return self._string(value)
+
+        return value if value >= 0 else None
+
+    def player(self, row):
+        ''' Returns the Player instance stored in the row or None for the empty row. '''
+
+        if not self.has_row(row):
+            return None
+
+        values = {}
+
+        for (field_name, _), column in zip(self.COLUMNS, self._columns):
+            value = column[row]
+
+            if field_name in self._string_fields:
+                values[field_name] = self._string(value)
+            else:
+                values[field_name] = value if value >= 0 else None
+
+        return Player(**values)
+
+    def _string(self, index):
+        ''' [Private] Decodes the string from the string table. '''
+
+        if index == self.EMPTY_STRING:
+            return None
+
+        # the corrupt index is shown as the empty cell
+        if index >= len(self._string_offsets) - 1:
+            return None
+
+        return str(self._strings[self._string_offsets[index]:self._string_offsets[index + 1]], 'utf-8', 'replace')
+
+    @staticmethod
+    def _aligned(size):
+        ''' [Private] Rounds the size up so the columns are 4 bytes aligned. '''
+
+        return (size + 3) & ~3
+
+    @classmethod
+    def write(cls, path, players, sort_type):
+        ''' Writes the players into the snapshot file.
+        The file is replaced atomically, so the old snapshot may stay mapped.
+
+        Parameters
+        ----------
+            path : str
+                Path to the snapshot file.
+
+            players : list
+                Player instances ordered by the table rows, None for the empty rows.
+
+            sort_type : PlayersPage.SortType
+                Ranking order of the rows.
+        '''
+
+        strings = {}
+
+        def string_index(value):
+            return cls.EMPTY_STRING if value is None else strings.setdefault(str(value), len(strings))
+
+        columns = [[] for _ in cls.COLUMNS]
+
+        for player in players:
+            for (field_name, _), column in zip(cls.COLUMNS, columns):
+                value = getattr(player, field_name) if player is not None else None
+
+                if field_name in cls._string_fields:
+                    column.append(string_index(value))
+                else:
+                    column.append(-1 if value is None else value)
+
+        encoded = [string.encode('utf-8') for string in strings]
+
+        offsets = [0]
+        for string in encoded:
+            offsets.append(offsets[-1] + len(string))
+
+        temp_path = path + '.tmp'
+
+        with open(temp_path, 'wb') as snapshot_file:
+            snapshot_file.write(cls._header.pack(cls.MAGIC, sort_type, len(players), len(encoded), offsets[-1]))
+            snapshot_file.write(struct.pack('<{}I'.format(len(offsets)), *offsets))
+            snapshot_file.write(b''.join(encoded))
+            snapshot_file.write(b'\0' * (cls._aligned(offsets[-1]) - offsets[-1]))
+
+            for (_, column_format), column in zip(cls.COLUMNS, columns):
+                snapshot_file.write(struct.pack('<{}{}'.format(len(column), column_format), *column))
+
+        os.replace(temp_path, path)
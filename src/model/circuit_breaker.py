@@ -0,0 +1,124 @@
+import threading
+import time
+
+
+class CircuitOpenError(Exception):
+    ''' Raised instead of the download while the circuit breaker is open. '''
+
+
+class CircuitBreaker:
+    ''' Stops the downloads while the site is down or throttling us.
+
+    After failure_threshold failures in a row the breaker opens and every
+    download fails at once. When the retry timeout passes, one probe download
+    is let through (half-open): its success closes the breaker, its failure
+    opens it again with the doubled timeout. The probe served without the
+    request to the site proves nothing, it is released and the next download
+    probes again.
+    '''
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, failure_threshold, retry_timeout, max_retry_timeout):
+        ''' Constructs new CircuitBreaker instance.
+
+        Parameters
+        ----------
+            failure_threshold : int
+                Number of the failures in a row opening the breaker.
+
+            retry_timeout : float
+                Seconds before the first probe.
+
+            max_retry_timeout : float
+                Limit of the doubled timeout.
+        '''
+
+        self._failure_threshold = failure_threshold
+        self._initial_retry_timeout = retry_timeout
+        self._max_retry_timeout = max_retry_timeout
+
+        self._lock = threading.Lock()
+
+        self._state = self.CLOSED
+        self._failures = 0
+        self._retry_timeout = retry_timeout
+        self._opened_at = 0
+
+        # the half-open breaker has let the probe through
+        self._probing = False
+
+    def state(self):
+        ''' Returns CLOSED, OPEN or HALF_OPEN. '''
+
+        return self._state
+
+    def allow_request(self):
+        ''' Check if the download may be started. Turns the open breaker
+        into half-open and lets the probe through once the timeout passes.
+        '''
+
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self._retry_timeout:
+                self._state = self.HALF_OPEN
+
+            if self._state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+
+            return False
+
+    def retry_in(self):
+        ''' Returns seconds left before the next probe, 0 if the downloads are allowed. '''
+
+        with self._lock:
+            if self._state == self.CLOSED:
+                return 0
+
+            if self._state == self.HALF_OPEN:
+                return self._initial_retry_timeout
+
+            return max(0, self._retry_timeout - (time.monotonic() - self._opened_at))
+
+    def record_success(self):
+        ''' Closes the breaker. '''
+
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._retry_timeout = self._initial_retry_timeout
+            self._probing = False
+
+    def release_probe(self):
+        ''' Lets the next probe through, the download did not reach the site.
+        The breaker state does not change.
+        '''
+
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self):
+        ''' Counts the failure, opens the breaker if there are too many of them. '''
+
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._probing = False
+                self._retry_timeout = min(self._retry_timeout * 2, self._max_retry_timeout)
+                self._open()
+                return
+
+            self._failures += 1
+
+            if self._state == self.CLOSED and self._failures >= self._failure_threshold:
+                self._open()
+
+    def _open(self):
+        ''' [Private] Opens the breaker. Must be called under the lock. '''
+
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
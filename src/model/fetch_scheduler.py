@@ -0,0 +1,331 @@
+import heapq
+import itertools
+
+from PyQt5.QtCore import QThread, QMutex, QWaitCondition
+
+from model.circuit_breaker import CircuitOpenError
+
+
+class FetchScheduler:
+    ''' Schedules page downloads between several worker threads.
+
+    Every queued page has a priority class. Pages the user looks at are
+    downloaded first, pages near the viewport next and background work last.
+    When the viewport moves, queued pages that are not near it anymore are
+    cancelled. Every download is tagged with the cache generation, so results
+    of the downloads started before the cache was dropped are discarded.
+    '''
+
+    class Priority:
+        VISIBLE = 0
+        PREFETCH = 1
+        BACKGROUND = 2
+
+    class Worker(QThread):
+        ''' Worker thread downloading the pages picked from the scheduler queue. '''
+
+        def __init__(self, scheduler):
+            ''' Constructs Worker instance.
+
+            Parameters
+            ----------
+                scheduler : FetchScheduler
+                    the scheduler to take the pages from.
+            '''
+
+            super(self.__class__, self).__init__()
+
+            self.scheduler = scheduler
+
+        def run(self):
+            ''' This code runs in the separate thread. '''
+            while True:
+                request = self.scheduler._take()
+                if request is None:
+                    return
+
+                page_number, generation, sort_type = request
+
+                try:
+                    page = self.download(page_number, generation, sort_type)
+                except Exception as e:
+                    self.scheduler._finish(page_number, generation, None, e)
+                    continue
+
+                self.scheduler._finish(page_number, generation, page)
+
+        def download(self, page_number, generation, sort_type):
+            ''' Downloads the page unless the circuit breaker is open. Only the downloads
+            which sent the request to the site tell the breaker if the site is up.
+            '''
+
+            circuit_breaker = self.scheduler.circuit_breaker
+            players_page_mgr = self.scheduler.players_page_mgr
+
+            if circuit_breaker is not None and not circuit_breaker.allow_request():
+                raise CircuitOpenError('downloads are paused after the repeated failures')
+
+            requests_sent = players_page_mgr.requests_sent()
+
+            try:
+                if self.scheduler.on_partial_data is None:
+                    page = players_page_mgr.download(page_number, sort_type)
+                else:
+                    page = players_page_mgr.download(
+                        page_number, sort_type,
+                        on_rows=lambda players: self.scheduler.on_partial_data(page_number, players, generation))
+
+            except Exception:
+                if circuit_breaker is not None:
+                    if players_page_mgr.requests_sent() > requests_sent:
+                        circuit_breaker.record_failure()
+                    else:
+                        circuit_breaker.release_probe()
+                raise
+
+            if circuit_breaker is not None:
+                if players_page_mgr.requests_sent() > requests_sent:
+                    circuit_breaker.record_success()
+                else:
+                    circuit_breaker.release_probe()
+
+            return page
+
+    def __init__(self, players_page_mgr, sort_type, workers_count, on_data_ready, on_partial_data=None, background_workers=None,
+                 on_download_failed=None, circuit_breaker=None):
+        ''' Constructs FetchScheduler instance.
+
+        Parameters
+        ----------
+            players_page_mgr : PlayersPage
+                players_page_mgr is used to download page with
+                particular number
+
+            sort_type : PlayersPage.SortType
+                How to sort the data.
+
+            workers_count : int
+                Number of the pages downloaded in parallel.
+
+            on_data_ready : callable
+                will be called in the worker thread with (page number, page, generation)
+                when download finished
+
+            on_partial_data : callable
+                if set, the pages are streamed and it is called in the worker thread
+                with (page number, players parsed so far, generation) while the page
+                is being downloaded
+
+            background_workers : int
+                how many workers may download background pages at once,
+                the others are kept for the visible and prefetch pages.
+                All the workers by default.
+
+            on_download_failed : callable
+                will be called in the worker thread with (page number, exception, generation)
+                when download failed
+
+            circuit_breaker : CircuitBreaker
+                if set, the downloads fail with CircuitOpenError at once while it is open
+        '''
+
+        self.players_page_mgr = players_page_mgr
+        self.sort_type = sort_type
+        self.on_data_ready = on_data_ready
+        self.on_partial_data = on_partial_data
+        self.on_download_failed = on_download_failed
+        self.circuit_breaker = circuit_breaker
+
+        self._lock = QMutex()
+        self._queue_not_empty = QWaitCondition()
+
+        # Heap of (priority, sequence number, page number). Entries whose priority
+        # does not match the _queued dict are stale and skipped when popped.
+        self._heap = []
+        self._sequence = itertools.count()
+
+        # page number -> priority of the queued pages
+        self._queued = {}
+
+        # page number -> generation of the pages being downloaded
+        self._in_flight = {}
+
+        # (page number, generation) of the background pages being downloaded
+        self._background_slots = background_workers or workers_count
+        self._background_in_flight = set()
+
+        self._generation = 0
+        self._stopped = False
+
+        self._workers = [self.Worker(self) for _ in range(workers_count)]
+        for worker in self._workers:
+            worker.start()
+
+    def stop(self):
+        ''' Stops the worker threads after their current downloads and waits for them. '''
+
+        self._lock.lock()
+        self._stopped = True
+        self._queue_not_empty.wakeAll()
+        self._lock.unlock()
+
+        for worker in self._workers:
+            worker.wait()
+
+    def schedule(self, page_number, priority):
+        ''' Schedules page download or raises the priority of the queued one.
+
+        Parameters
+        ----------
+            page_number : int
+                the page to download
+
+            priority : FetchScheduler.Priority
+                priority class of the download
+        '''
+
+        self._lock.lock()
+
+        downloading = self._in_flight.get(page_number) == self._generation
+
+        if not downloading and self._queued.get(page_number, priority + 1) > priority:
+            self._push(page_number, priority)
+            self._queue_not_empty.wakeOne()
+
+        self._lock.unlock()
+
+    def update_viewport(self, first_page, last_page, prefetch_pages):
+        ''' Reprioritizes the queued pages according to the new viewport.
+        Visible and prefetch downloads which are far from the viewport are cancelled,
+        background downloads are kept.
+
+        Parameters
+        ----------
+            first_page : int
+                first page shown in the view
+
+            last_page : int
+                last page shown in the view
+
+            prefetch_pages : int
+                how many pages around the viewport are considered near
+        '''
+
+        self._lock.lock()
+
+        for page_number, priority in list(self._queued.items()):
+            if first_page <= page_number <= last_page:
+                new_priority = self.Priority.VISIBLE
+            elif first_page - prefetch_pages <= page_number <= last_page + prefetch_pages:
+                new_priority = min(priority, self.Priority.PREFETCH)
+            elif priority == self.Priority.BACKGROUND:
+                continue
+            else:
+                del self._queued[page_number]
+                continue
+
+            if new_priority != priority:
+                self._push(page_number, new_priority)
+
+        self._lock.unlock()
+
+    def generation(self):
+        ''' Returns the current cache generation. '''
+
+        return self._generation
+
+    def invalidate(self):
+        ''' Cancels all the queued downloads and makes the in-flight ones stale. '''
+
+        self._lock.lock()
+
+        self._generation += 1
+        self._queued.clear()
+        self._heap = []
+
+        self._lock.unlock()
+
+    def set_sort_type(self, sort_type):
+        ''' Switches the sort order of the downloaded pages and invalidates the cache generation. '''
+
+        self._lock.lock()
+
+        self.sort_type = sort_type
+        self._generation += 1
+        self._queued.clear()
+        self._heap = []
+
+        self._lock.unlock()
+
+    def _push(self, page_number, priority):
+        ''' [Private] Queues the page. Must be called under the lock. '''
+
+        self._queued[page_number] = priority
+        heapq.heappush(self._heap, (priority, next(self._sequence), page_number))
+
+    def _take(self):
+        ''' [Private] Blocks until there is a page to download.
+
+        Returns
+        -------
+            (page number, generation, sort type) tuple or None if the scheduler is stopped.
+        '''
+
+        self._lock.lock()
+
+        try:
+            while not self._stopped:
+                while self._heap:
+                    priority, _, page_number = self._heap[0]
+
+                    if self._queued.get(page_number) != priority:
+                        heapq.heappop(self._heap)
+                        continue
+
+                    # only background pages are left, and their workers are all busy
+                    if priority == self.Priority.BACKGROUND and len(self._background_in_flight) >= self._background_slots:
+                        break
+
+                    heapq.heappop(self._heap)
+
+                    del self._queued[page_number]
+                    self._in_flight[page_number] = self._generation
+
+                    if priority == self.Priority.BACKGROUND:
+                        self._background_in_flight.add((page_number, self._generation))
+
+                    return page_number, self._generation, self.sort_type
+
+                self._queue_not_empty.wait(self._lock)
+
+            return None
+
+        finally:
+            self._lock.unlock()
+
+    def _finish(self, page_number, generation, page, error=None):
+        ''' [Private] Delivers the downloaded page or the download error unless it is stale. '''
+
+        self._lock.lock()
+        if self._in_flight.get(page_number) == generation:
+            del self._in_flight[page_number]
+        stale = generation != self._generation
+
+        # the freed background slot can be taken by the waiting worker
+        if (page_number, generation) in self._background_in_flight:
+            self._background_in_flight.discard((page_number, generation))
+            self._queue_not_empty.wakeOne()
+
+        self._lock.unlock()
+
+        if stale:
+            return
+
+        if error is None:
+            self.on_data_ready(page_number, page, generation)
+
+        elif self.on_download_failed is not None:
+            self.on_download_failed(page_number, error, generation)
+
+        else:
+            print('Page {} download failed: {}'.format(page_number, error))
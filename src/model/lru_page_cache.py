@@ -1,21 +1,28 @@
 import collections
 
+from misc.tracer import tracer
+
 
 class LRUPageCache:
     ''' LRU (least recently used) cache for storing transfermarkt parsed pages.'''
 
-    def __init__(self, capacity):
+    def __init__(self, capacity, on_evict=None):
         ''' Constructs new LRUPageCache isntance.
 
         Parameters
         ----------
             capacity : int
                 Cache capacity.
+
+            on_evict : callable
+                Called with (key, value) when the least recently used page is evicted.
         '''
 
         self._capacity = capacity
+        self._on_evict = on_evict
         self._cache = collections.OrderedDict()
 
+    @tracer.traced('cache')
     def get(self, key):
         ''' Returns value from cache by the key
 
@@ -36,6 +43,7 @@ class LRUPageCache:
         except KeyError:
             return -1
 
+    @tracer.traced('cache')
     def append(self, key, value):
         ''' Insert value by key into the cache.
 
@@ -52,7 +60,9 @@ class LRUPageCache:
             self._cache.pop(key)
         except KeyError:
             if len(self._cache) >= self._capacity:
-                self._cache.popitem(last=False)
+                evicted_key, evicted_value = self._cache.popitem(last=False)
+                if self._on_evict:
+                    self._on_evict(evicted_key, evicted_value)
         self._cache[key] = value
 
     def is_cached(self, key):
@@ -1,3 +1,4 @@
+import re
 from dataclasses import dataclass
 
 
@@ -13,3 +14,21 @@ class Player:
     nationality: str
     club: str
     price: int
+    player_id: int = None
+    profile_url: str = None
+
+    # Transfermarkt prints values like '£180.00m' or '£900Th.'
+    _price_re = re.compile(r'([\d.,]+)\s*(bn|m|th\.?|k)?', re.IGNORECASE)
+    _price_multipliers = {'bn': 10 ** 9, 'm': 10 ** 6, 'th.': 10 ** 3, 'th': 10 ** 3, 'k': 10 ** 3}
+
+    def market_value(self):
+        ''' Returns the market value as integer amount of currency or None if unknown. '''
+
+        match = self._price_re.search(str(self.price))
+        if match is None:
+            return None
+
+        number, suffix = match.groups()
+        multiplier = self._price_multipliers.get((suffix or '').lower(), 1)
+
+        return int(round(float(number.replace(',', '')) * multiplier))
@@ -0,0 +1,165 @@
+import collections
+
+
+class PlayerIdIndex:
+    ''' Index of the loaded players by their transfermarkt ID.
+
+    Pages are addressed by number, but players move between pages when values
+    change during the crawl. The index keeps every page position of the player ID
+    and serves the latest loaded one, so the same player loaded from two pages is
+    exported once, and one player can be updated without replacing its page.
+    When the latest page is dropped, the player falls back to the remaining one.
+    It also tracks which IDs were seen in the current crawl to build the
+    consistency report.
+    '''
+
+    def __init__(self):
+        ''' Constructs new PlayerIdIndex instance. '''
+
+        # player_id -> {page number: (page list, offset)}, the latest loaded page last
+        self._locations = {}
+
+        # page number -> IDs of the page players
+        self._page_ids = {}
+
+        # player_id -> set of page numbers it was seen on in the current crawl
+        self._crawl_pages = collections.defaultdict(set)
+
+        # IDs seen by the previous crawl
+        self._previous_ids = set()
+
+    def __len__(self):
+        return len(self._locations)
+
+    def add_page(self, page_number, page):
+        ''' Indexes the players of the page.
+
+        Parameters
+        ----------
+            page_number : int
+                Number of the page.
+
+            page : list
+                Player instances of the page.
+
+        Returns
+        -------
+            List of the player IDs already indexed from the other pages.
+        '''
+
+        self.remove_page(page_number)
+
+        duplicates = []
+        page_ids = []
+
+        for offset, player in enumerate(page):
+            if player.player_id is None:
+                continue
+
+            locations = self._locations.setdefault(player.player_id, {})
+            if locations:
+                duplicates.append(player.player_id)
+
+            locations[page_number] = (page, offset)
+            self._crawl_pages[player.player_id].add(page_number)
+            page_ids.append(player.player_id)
+
+        self._page_ids[page_number] = page_ids
+
+        return duplicates
+
+    def remove_page(self, page_number):
+        ''' Drops the page positions of the players, the players left without positions are dropped. '''
+
+        for player_id in self._page_ids.pop(page_number, ()):
+            locations = self._locations.get(player_id)
+
+            if locations is None:
+                continue
+
+            locations.pop(page_number, None)
+
+            if not locations:
+                del self._locations[player_id]
+
+    def get(self, player_id):
+        ''' Returns the Player by ID or None. '''
+
+        record = self._record(player_id)
+
+        return record[0][record[2]] if record is not None else None
+
+    def location(self, player_id):
+        ''' Returns (page number, offset) of the player or None. '''
+
+        record = self._record(player_id)
+
+        return record[1:] if record is not None else None
+
+    def update(self, player_id, player):
+        ''' Replaces the player in place on its page.
+
+        Returns
+        -------
+            False if the player is not indexed.
+        '''
+
+        locations = self._locations.get(player_id)
+        if not locations:
+            return False
+
+        # the older positions are served once the latest page is dropped
+        for page, offset in locations.values():
+            page[offset] = player
+
+        return True
+
+    def unique_player_ids(self):
+        ''' Returns the IDs of the indexed players ordered by page position. '''
+
+        return [player_id for player_id, _ in sorted(((player_id, self._record(player_id)[1:]) for player_id in self._locations),
+                                                     key=lambda item: item[1])]
+
+    def unique_players(self):
+        ''' Returns the indexed players without duplicates ordered by page position. '''
+
+        records = sorted((self._record(player_id) for player_id in self._locations), key=lambda record: record[1:])
+
+        return [page[offset] for page, _, offset in records]
+
+    def start_crawl(self):
+        ''' Starts the new crawl. The IDs of the current one are kept to find the missing players. '''
+
+        if self._crawl_pages:
+            self._previous_ids = set(self._crawl_pages)
+
+        self._locations.clear()
+        self._page_ids.clear()
+        self._crawl_pages.clear()
+
+    def _record(self, player_id):
+        ''' [Private] Returns (page list, page number, offset) of the latest loaded position or None. '''
+
+        locations = self._locations.get(player_id)
+        if not locations:
+            return None
+
+        page_number, (page, offset) = next(reversed(locations.items()))
+
+        return page, page_number, offset
+
+    def consistency_report(self):
+        ''' Returns the consistency report of the current crawl.
+
+        Returns
+        -------
+            dict with 'players' (unique IDs seen), 'duplicated' (player_id -> page numbers
+            of the IDs seen on several pages) and 'missing' (IDs of the previous crawl
+            not seen in this one) entries.
+        '''
+
+        return {
+            'players': len(self._crawl_pages),
+            'duplicated': {player_id: sorted(pages) for player_id, pages in self._crawl_pages.items() if len(pages) > 1},
+            'missing': sorted(self._previous_ids.difference(self._crawl_pages)),
+        }
@@ -0,0 +1,22 @@
+from dataclasses import dataclass, field
+
+
+@dataclass
+class PlayerProfile:
+    '''
+    Class that describes the extra information from the player profile page.
+    '''
+
+    player_id: int
+    foot: str = None
+    height: str = None
+    contract_expiry: str = None
+    market_value_history: list = field(default_factory=list)
+
+    def peak_market_value(self):
+        ''' Returns the highest market value from the history or None. '''
+
+        if not self.market_value_history:
+            return None
+
+        return max(value for _, value in self.market_value_history)
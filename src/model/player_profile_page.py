@@ -0,0 +1,138 @@
+import re
+
+from bs4 import BeautifulSoup
+import requests
+
+from model.player_profile import PlayerProfile
+
+
+class PlayerProfilePage:
+    ''' This class manages one player profile page from transfermarkt.com '''
+
+    headers = {'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/47.0.2526.106 Safari/537.36'}
+
+    # Maps the labels of the profile info table into PlayerProfile fields.
+    info_labels = {
+        'Foot:': 'foot',
+        'Height:': 'height',
+        'Contract expires:': 'contract_expiry',
+    }
+
+    # Market value chart data is embedded into the page as a highcharts script.
+    market_value_re = re.compile(r"'y':(\d+).*?'datum_mw':'([^']*)'")
+
+    def __init__(self, app_config):
+        ''' Constructs PlayerProfilePage instance.
+
+        Parameters
+        ----------
+            app_config : AppConfig
+                Instance of application configuration file.
+        '''
+
+        self._timeout = app_config.transfermarkt['requestTimeout']
+
+    def download(self, player_id, profile_url):
+        ''' Downloads and parses the player profile page.
+
+        Parameters
+        ----------
+            player_id : int
+                Transfermarkt ID of the player.
+
+            profile_url : str
+                Absolute URL of the player profile page.
+
+        Returns
+        -------
+            PlayerProfile instance parsed from downloaded page. The error
+            responses and the timeouts raise requests.RequestException.
+        '''
+
+        response = requests.get(profile_url, headers=self.headers, timeout=self._timeout)
+
+        # the error pages (throttling, maintenance) would parse into the empty profile
+        response.raise_for_status()
+
+        return self.parse(player_id, response.text)
+
+    def revalidate(self, player_id, profile_url, etag=None, last_modified=None):
+        ''' Downloads the player profile page conditionally.
+
+        Parameters
+        ----------
+            player_id : int
+                Transfermarkt ID of the player.
+
+            profile_url : str
+                Absolute URL of the player profile page.
+
+            etag : str
+                ETag of the previous download.
+
+            last_modified : str
+                Last-Modified of the previous download.
+
+        Returns
+        -------
+            (profile, etag, last_modified) tuple, the profile is None
+            if the page did not change since the previous download.
+        '''
+
+        request_headers = dict(self.headers)
+        if etag:
+            request_headers['If-None-Match'] = etag
+        if last_modified:
+            request_headers['If-Modified-Since'] = last_modified
+
+        response = requests.get(profile_url, headers=request_headers, timeout=self._timeout)
+
+        # 304 may omit the validators, the old ones are still valid then
+        if response.status_code == 304:
+            return None, response.headers.get('ETag', etag), response.headers.get('Last-Modified', last_modified)
+
+        response.raise_for_status()
+
+        return self.parse(player_id, response.text), response.headers.get('ETag'), response.headers.get('Last-Modified')
+
+    @classmethod
+    def parse(cls, player_id, html):
+        ''' Parses the player profile page markup.
+
+        Parameters
+        ----------
+            player_id : int
+                Transfermarkt ID of the player.
+
+            html : str
+                Profile page markup.
+
+        Returns
+        -------
+            PlayerProfile instance.
+        '''
+
+        soup = BeautifulSoup(html, 'html.parser')
+
+        profile = PlayerProfile(player_id)
+
+        info_table = soup.find('table', {'class': 'auflistung'})
+        if info_table is not None:
+            for row in info_table.findAll('tr'):
+                label, value = row.find('th'), row.find('td')
+                if label is None or value is None:
+                    continue
+
+                field_name = cls.info_labels.get(label.get_text(strip=True))
+                if field_name is not None:
+                    setattr(profile, field_name, value.get_text(' ', strip=True).replace('\xa0', ' '))
+
+        for script in soup.findAll('script'):
+            text = script.string
+            if not text or 'datum_mw' not in text:
+                continue
+
+            profile.market_value_history = [[date, int(value)] for value, date in cls.market_value_re.findall(text)]
+            break
+
+        return profile
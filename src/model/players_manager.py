@@ -1,7 +1,20 @@
-from PyQt5.QtCore import pyqtSignal, QObject, QThread, QMutex, QWaitCondition
+import os
 
+from PyQt5.QtCore import pyqtSignal, QObject, QMutex, QMutexLocker, QTimer
+
+from distributed.page_cache_daemon import SharedPlayersPage
+from misc.tracer import tracer
+from model.access_log import AccessLog
+from model.circuit_breaker import CircuitBreaker
+from model.fetch_scheduler import FetchScheduler
 from model.lru_page_cache import LRUPageCache
+from model.player_index import PlayerIdIndex
 from model.players_page import PlayersPage
+from model.profile_crawler import ProfileCrawler
+from model.snapshot_store import SnapshotStore
+from model.summary_stats import SummaryStats
+from model.trigram_index import TrigramIndex
+from model.watchlist import Watchlist
 
 
 class PlayersManager(QObject):
@@ -11,92 +24,15 @@ class PlayersManager(QObject):
     '''
 
     download_finished_signal = pyqtSignal(int, int, name='page_download_finished')
+    profiles_ready_signal = pyqtSignal(int, int, name='profiles_ready')
+    page_evicted_signal = pyqtSignal(int, int, name='page_evicted')
+    download_progress_signal = pyqtSignal(int, int, name='page_download_progress')
+    page_failed_signal = pyqtSignal(int, int, str, bool, name='page_download_failed')
+    watched_player_changed_signal = pyqtSignal(int, str, str, str, str, name='watched_player_changed')
+    watchlist_polled_signal = pyqtSignal(int, int, name='watchlist_polled')
 
-    class PlayersDownloadManager(QThread):
-        ''' Helper class to defer HTTP workload.
-        At this point it downloads only one page in parallel.
-        Need to migrate to QRunnable and ThreadPool instead.
-        '''
-
-        def __init__(self, players_page_mgr, sort_type):
-            ''' Constructs PlayersDownloadManager instance.
-
-            Parameters
-            ----------
-                players_page_mgr : PlayersPage
-                    players_page_mgr is used to download page with
-                    particular number
-            '''
-
-            super(self.__class__, self).__init__()
-
-            self.players_page_mgr = players_page_mgr
-            self.sort_type = sort_type
-
-            self.download_requested_lock = QMutex()
-            self.download_requested_cv = QWaitCondition()
-
-            self.stopped = False
-
-            self.download_pending = False
-            self.page_to_download = -1
-
-            self.on_data_ready = None
-            self.on_error = None
-
-        def __del__(self):
-            ''' Override in order to stop internal thread. '''
-            self.stopped = True
-            self.download_requested_cv.wakeOne()
-
-        def run(self):
-            ''' This code runs in the separate thread. '''
-            while not self.stopped:
-
-                # wait until somebody requsted page download
-                self.download_requested_lock.lock()
-                if not self.download_pending or not self.stopped:
-                    self.download_requested_cv.wait(self.download_requested_lock)
-
-                self.download_requested_lock.unlock()
-
-                page_number = self.page_to_download
-                page = self.players_page_mgr.download(page_number, self.sort_type)
-
-                self.download_pending = False
-
-                if self.on_data_ready:
-                    self.on_data_ready(page_number, page)
-
-        def schedule_download(self, page_number, on_data_ready=None, on_error=None):
-            ''' Schedule page download into the deferred context.
-
-            Parameters
-            ----------
-                page_number : int
-                    the page to download
-
-                on_data_ready : callable
-                    will be called when download finished
-
-                on_error : callable, unused
-            '''
-
-            if self.download_pending:
-                return
-
-            # store the data in locked context and notify download thread
-            self.download_requested_lock.lock()
-
-            self.page_to_download = page_number
-            self.on_data_ready = on_data_ready
-            self.on_error = on_error
-
-            self.download_pending = True
-
-            self.download_requested_lock.unlock()
-
-            self.download_requested_cv.wakeOne()
+    # Starts the retry timer from the worker threads, the argument is the delay in ms.
+    _retry_signal = pyqtSignal(int)
 
     def __init__(self, app_config):
         ''' Constructs PlayersManage instance
@@ -112,6 +48,7 @@ class PlayersManager(QObject):
         config = app_config.players_manager
 
         self._cached_page_number = config['pageNumber']
+        self._prefetch_pages = config['prefetchPages']
 
         # Choose default data sorting method.
         # It will be used to generate URL when downloading
@@ -125,13 +62,88 @@ class PlayersManager(QObject):
         else:
             raise Exception('Unknown sorting method {}'.format(config['sortMethod']))
 
-        players_page = PlayersPage(app_config)
-        self._players_on_page = players_page.players_on_page()
+        self._players_page = PlayersPage(app_config)
+
+        # Instances running on the same host share the pages through the cache daemon.
+        if app_config.cache_daemon['enabled']:
+            self._players_page = SharedPlayersPage(app_config, self._players_page)
+
+        self._players_on_page = self._players_page.players_on_page()
+
+        # Pages are put into the cache by the scheduler worker threads.
+        self._page_cache_lock = QMutex()
+        self._page_cache = LRUPageCache(capacity=self._cached_page_number, on_evict=self._page_evicted_cb)
+
+        # page number -> players parsed so far of the pages being streamed,
+        # guarded by the page cache lock
+        self._partial_pages = {}
+
+        # page number -> error message of the pages failed to download,
+        # guarded by the page cache lock. They are retried by the timer.
+        self._failed_pages = {}
+
+        breaker_config = app_config.circuit_breaker
+        self._retry_timeout = breaker_config['retryTimeout']
+        self._circuit_breaker = CircuitBreaker(breaker_config['failureThreshold'], breaker_config['retryTimeout'],
+                                               breaker_config['maxRetryTimeout'])
+
+        self._retry_timer = QTimer()
+        self._retry_timer.setSingleShot(True)
+        self._retry_timer.timeout.connect(self._retry_failed)
+        self._retry_signal.connect(self._retry_timer.start)
 
-        self._page_cache = LRUPageCache(capacity=self._cached_page_number)
+        self._fetch_scheduler = FetchScheduler(self._players_page, self._players_sort_method, config['fetchWorkers'],
+                                               on_data_ready=self._download_finished_cb,
+                                               on_partial_data=self._download_progress_cb if config['streamRows'] else None,
+                                               background_workers=config['backgroundWorkers'],
+                                               on_download_failed=self._download_failed_cb,
+                                               circuit_breaker=self._circuit_breaker)
 
-        self._players_download_manager = self.PlayersDownloadManager(players_page, self._players_sort_method)
-        self._players_download_manager.start()
+        # Pages the user looked at are logged to warm the cache up on the next launch.
+        self._list_name = app_config.transfermarkt['defaultList']
+        self._access_log = AccessLog(app_config.access_log['path'], app_config.access_log['keepSessions'])
+
+        # started from the event loop, when the listeners are connected
+        QTimer.singleShot(0, lambda: self._warmup(config['warmupPages']))
+
+        # player_id -> player_number of the profiles requested by the view
+        self._profile_requests = {}
+
+        self._profile_crawler = ProfileCrawler(app_config)
+        self._profile_crawler.profiles_ready_signal.connect(self._profiles_ready_cb)
+        self._profile_crawler.start()
+
+        # Watched players are polled by their own thread, the signals are forwarded.
+        self._watchlist = Watchlist(app_config)
+        self._watchlist.player_changed_signal.connect(self.watched_player_changed_signal)
+        self._watchlist.polled_signal.connect(self.watchlist_polled_signal)
+        self._watchlist.start()
+
+        # (player_id, text, DESC rank) of the players persisted by the previous crawls
+        self._stored_players = []
+
+        # Values of the last snapshot are used to find the top movers.
+        previous_values = {}
+
+        snapshot_path = app_config.snapshot_store['path']
+        if os.path.exists(snapshot_path):
+            store = SnapshotStore(snapshot_path)
+            self._stored_players = [(player_id, '{} ({})'.format(name, club), rank)
+                                    for player_id, name, club, rank in store.players()]
+
+            days = store.days()
+            if days:
+                previous_values = store.values_at(days[-1])
+            store.close()
+
+        # Aggregates over the cached players and the ID index,
+        # both are guarded by the page cache lock.
+        self._summary = SummaryStats(previous_values)
+        self._player_index = PlayerIdIndex()
+
+        # Search index over the cached players and the players persisted by the previous crawls.
+        # Its payloads are the player numbers of the current sort order, so it is rebuilt by the sort change.
+        self._search_index = self._build_search_index()
 
     def is_cached(self, player_number):
         ''' Checks if the player is stored in the cache.
@@ -148,23 +160,59 @@ class PlayersManager(QObject):
 
         page_number = self._get_page_number(player_number, self._players_on_page)
 
-        return self._page_cache.is_cached(page_number)
+        with QMutexLocker(self._page_cache_lock):
+            return self._page_cache.is_cached(page_number)
 
-    def get(self, player_number):
+    def get(self, player_number, priority=FetchScheduler.Priority.VISIBLE):
         ''' Schedules page with the player_number download.
 
         Parameters
         ----------
             player_number : int
                 number of the player to download.
+
+            priority : FetchScheduler.Priority
+                priority class of the download.
         '''
 
         page_number = self._get_page_number(player_number, self._players_on_page)
 
-        if self.is_cached(player_number):
+        if priority == FetchScheduler.Priority.VISIBLE:
+            self._access_log.touch(self._list_name, PlayersPage.sort_names[self._players_sort_method], page_number)
+
+        # the failed pages wait for the retry timer
+        if self.is_cached(player_number) or self.page_error(player_number) is not None:
             return
 
-        self._players_download_manager.schedule_download(page_number, on_data_ready=self._download_finished_cb)
+        self._fetch_scheduler.schedule(page_number, priority)
+
+    def set_viewport(self, first_player_number, last_player_number):
+        ''' Tells the manager which players are shown by the view.
+        Queued downloads far from them are cancelled and the pages
+        around them are prefetched.
+
+        Parameters
+        ----------
+            first_player_number : int
+                number of the first visible player.
+
+            last_player_number : int
+                number of the last visible player.
+        '''
+
+        first_page = self._get_page_number(first_player_number, self._players_on_page)
+        last_page = self._get_page_number(last_player_number, self._players_on_page)
+
+        self._fetch_scheduler.update_viewport(first_page, last_page, self._prefetch_pages)
+
+        for page_number in range(first_page, last_page + 1):
+            self._access_log.record(self._list_name, PlayersPage.sort_names[self._players_sort_method], page_number)
+
+        for page_number in range(max(1, first_page - self._prefetch_pages), last_page + self._prefetch_pages + 1):
+            if first_page <= page_number <= last_page:
+                continue
+
+            self.get(self._players_on_page * (page_number - 1) + 1, FetchScheduler.Priority.PREFETCH)
 
     def get_cached(self, player_number):
         ''' Return the player info from the cache.
@@ -180,28 +228,337 @@ class PlayersManager(QObject):
         '''
 
         page_number = self._get_page_number(player_number, self._players_on_page)
-        player_on_page_offset = player_number % self._players_on_page
+        player_on_page_offset = (player_number - 1) % self._players_on_page
 
-        if not self.is_cached(player_number):
-            return None
+        with QMutexLocker(self._page_cache_lock):
+            if not self._page_cache.is_cached(page_number):
+                return None
 
-        page = self._page_cache[page_number]
+            page = self._page_cache[page_number]
+
+        # the last page of the list is shorter
+        if player_on_page_offset >= len(page):
+            return None
 
         return page[player_on_page_offset]
 
-    def get_all_cached_pages(self):
-        ''' Return all the cached pages from the internal LRU.
+    def page_error(self, player_number):
+        ''' Return the error message if the page with the player failed
+        to download and waits for the retry, None otherwise.
+        '''
+
+        page_number = self._get_page_number(player_number, self._players_on_page)
+
+        with QMutexLocker(self._page_cache_lock):
+            return self._failed_pages.get(page_number)
+
+    def circuit_state(self):
+        ''' Return the state of the downloads CircuitBreaker. '''
+
+        return self._circuit_breaker.state()
+
+    def get_partial(self, player_number):
+        ''' Return the player from the page which is still being downloaded.
+
+        Parameters
+        ----------
+            player_number : int
+                number of the player to return.
 
         Returns
         -------
-            OrderedDict with all the cached pages.
+            Player class instance or None if the player row is not received yet.
         '''
 
-        return self._page_cache.get_all()
+        page_number = self._get_page_number(player_number, self._players_on_page)
+        player_on_page_offset = (player_number - 1) % self._players_on_page
+
+        with QMutexLocker(self._page_cache_lock):
+            players = self._partial_pages.get(page_number)
+
+        if players is None or player_on_page_offset >= len(players):
+            return None
+
+        return players[player_on_page_offset]
+
+    def get_profile(self, player_number, player):
+        ''' Return the player profile from the cache.
+        If the profile is not cached, schedules its download.
+
+        Parameters
+        ----------
+            player_number : int
+                number of the player.
+
+            player : Player
+                the player itself.
+
+        Returns
+        -------
+            PlayerProfile instance or None if it is not downloaded yet.
+        '''
+
+        if player.player_id is None:
+            return None
+
+        profile = self._profile_crawler.get(player.player_id)
+
+        if profile is None:
+            self._profile_requests[player.player_id] = player_number
+            self._profile_crawler.schedule(player.player_id, player.profile_url)
+
+        return profile
+
+    def get_profiles_blocking(self, players):
+        ''' Return the profiles of the players, downloading the missing ones
+        in the caller thread.
+
+        Parameters
+        ----------
+            players : list
+                List of Player instances.
+
+        Returns
+        -------
+            dict player_id -> PlayerProfile
+        '''
+
+        return self._profile_crawler.get_blocking(players)
+
+    def search(self, query, limit=10):
+        ''' Fuzzy search of the players by name and club.
+
+        Parameters
+        ----------
+            query : str
+                Search string, can contain typos.
+
+            limit : int
+                Maximum number of results.
+
+        Returns
+        -------
+            List of (text, player_number) tuples, the best match first.
+        '''
+
+        return [(text, player_number) for _, text, player_number in self._search_index.search(query, limit)]
+
+    def get_summary(self, limit=10):
+        ''' Return the aggregates over the cached players.
+
+        Parameters
+        ----------
+            limit : int
+                Maximum number of the top movers.
+
+        Returns
+        -------
+            dict with 'players', 'most_expensive', 'less_expensive', 'clubs',
+            'nationalities', 'roles', 'ages' and 'top_movers' entries.
+        '''
+
+        with QMutexLocker(self._page_cache_lock):
+            return {
+                'players': len(self._summary),
+                'most_expensive': self._summary.most_expensive(),
+                'less_expensive': self._summary.less_expensive(),
+                'clubs': self._summary.clubs(),
+                'nationalities': self._summary.nationalities(),
+                'roles': self._summary.roles(),
+                'ages': self._summary.ages(),
+                'top_movers': self._summary.top_movers(limit),
+            }
+
+    def get_by_id(self, player_id):
+        ''' Return the cached player by its transfermarkt ID or None. '''
+
+        with QMutexLocker(self._page_cache_lock):
+            return self._player_index.get(player_id)
+
+    def update_player(self, player_id, player):
+        ''' Replaces the cached player with the same ID in place.
+
+        Returns
+        -------
+            Number of the updated player or None if it is not cached.
+        '''
+
+        with QMutexLocker(self._page_cache_lock):
+            location = self._player_index.location(player_id)
+            if location is None:
+                return None
+
+            page_number, offset = location
+            player_number = self._players_on_page * (page_number - 1) + offset + 1
+
+            self._player_index.update(player_id, player)
+            self._summary.add(player_number, player)
+
+        self.download_finished_signal.emit(player_number, player_number)
+
+        return player_number
+
+    def cached_player_batches(self, batch_size):
+        ''' Yields the cached players in batches, without the ones loaded twice
+        from the different pages, ordered by the ranking. Every batch is read
+        from the player index when it is requested, the players evicted
+        meanwhile are skipped.
+
+        Parameters
+        ----------
+            batch_size : int
+                Maximum number of the players in the batch.
+        '''
 
-    def drop_cache(self):
-        ''' Drops the LRU cache. '''
-        self._page_cache = LRUPageCache(capacity=self._cached_page_number)
+        with QMutexLocker(self._page_cache_lock):
+            player_ids = self._player_index.unique_player_ids()
+
+        for batch_start in range(0, len(player_ids), batch_size):
+            with QMutexLocker(self._page_cache_lock):
+                players = [self._player_index.get(player_id) for player_id in player_ids[batch_start:batch_start + batch_size]]
+
+            yield [player for player in players if player is not None]
+
+    def consistency_report(self):
+        ''' Return the consistency report of the current crawl,
+        see PlayerIdIndex.consistency_report.
+        '''
+
+        with QMutexLocker(self._page_cache_lock):
+            return self._player_index.consistency_report()
+
+    def refresh(self):
+        ''' Revalidates the cached pages in the background.
+        The pages stay cached meanwhile, only the changed ones are replaced.
+        '''
+
+        with QMutexLocker(self._page_cache_lock):
+            self._players_page.drop_cache()
+            page_numbers = list(self._page_cache.get_all())
+
+        for page_number in sorted(page_numbers):
+            self._fetch_scheduler.schedule(page_number, FetchScheduler.Priority.BACKGROUND)
+
+    def watch(self, player_number):
+        ''' Adds the cached player to the watchlist.
+
+        Returns
+        -------
+            False if the player is not loaded or has no ID.
+        '''
+
+        player = self.get_cached(player_number)
+
+        if player is None or player.player_id is None:
+            return False
+
+        # The watchlist polls the DESC ranking. The ASC rank is turned into the DESC one
+        # once the list size is known, otherwise the poll finds the page by the player value.
+        page_number = None
+        total = self._players_page.total()
+
+        if self._players_sort_method == PlayersPage.SortType.DESC:
+            page_number = self._get_page_number(player_number, self._players_on_page)
+        elif self._players_sort_method == PlayersPage.SortType.ASC and total is not None:
+            page_number = self._get_page_number(total - player_number + 1, self._players_on_page)
+
+        self._watchlist.add(player, page_number)
+
+        return True
+
+    def unwatch(self, player_number):
+        ''' Removes the cached player from the watchlist.
+
+        Returns
+        -------
+            False if the player is not loaded or has no ID.
+        '''
+
+        player = self.get_cached(player_number)
+
+        if player is None or player.player_id is None:
+            return False
+
+        self._watchlist.remove(player.player_id)
+
+        return True
+
+    def watched_players(self):
+        ''' Return the WatchedPlayer instances ordered by name. '''
+
+        return self._watchlist.players()
+
+    def poll_watchlist(self):
+        ''' Polls the watched players now. The changes are reported by the 'watched_player_changed_signal'. '''
+
+        self._watchlist.poll_now()
+
+    def close(self):
+        ''' Saves the pages accessed in this session for the next launch warmup,
+        stops the page downloads and the watchlist polling.
+        '''
+
+        self._access_log.close()
+        self._retry_timer.stop()
+        self._fetch_scheduler.stop()
+        self._watchlist.stop()
+
+    def sort_method(self):
+        ''' Returns the PlayersPage.SortType of the downloaded pages. '''
+
+        return self._players_sort_method
+
+    def set_sort_method(self, sort_type):
+        ''' Switches the sort order of the players.
+        The pages of the new order are built from the cached pages of the
+        reversed order when the whole list is cached, so no page is downloaded.
+
+        Parameters
+        ----------
+            sort_type : PlayersPage.SortType
+                How to sort the data.
+        '''
+
+        with QMutexLocker(self._page_cache_lock):
+            self._players_sort_method = sort_type
+            self._fetch_scheduler.set_sort_type(sort_type)
+            self._summary.clear()
+            self._player_index.start_crawl()
+            self._page_cache = LRUPageCache(capacity=self._cached_page_number, on_evict=self._page_evicted_cb)
+            self._partial_pages.clear()
+            self._failed_pages.clear()
+            self._search_index = self._build_search_index()
+
+    def _build_search_index(self):
+        ''' [Private] Returns the search index of the stored players. Their ranks are
+        of the DESC order, so in the other orders they are found once their pages load.
+        '''
+
+        search_index = TrigramIndex()
+
+        if self._players_sort_method == PlayersPage.SortType.DESC:
+            for player_id, text, rank in self._stored_players:
+                search_index.add(player_id, text, rank)
+
+        return search_index
+
+    def _warmup(self, budget):
+        ''' [Private] Schedules the background download of the pages
+        used the most by the previous sessions.
+
+        Parameters
+        ----------
+            budget : int
+                Maximum number of the pages to download.
+        '''
+
+        hot_pages = self._access_log.hot_pages(self._list_name, PlayersPage.sort_names[self._players_sort_method], budget)
+
+        for page_number in hot_pages:
+            self._fetch_scheduler.schedule(page_number, FetchScheduler.Priority.BACKGROUND)
+
+        if hot_pages:
+            print('Warming up pages {}'.format(hot_pages))
 
     @staticmethod
     def _get_page_number(player_number, players_on_page):
@@ -220,14 +577,11 @@ class PlayersManager(QObject):
             Page number with the player player_number.
         '''
 
-        page_number = player_number // players_on_page
-        if page_number == 0:
-            page_number = 1
-
-        return page_number
+        return (player_number - 1) // players_on_page + 1
 
-    def _download_finished_cb(self, page_number, page):
-        ''' Is called by the PlayersDownloadManager when the data is ready.
+    @tracer.traced('manager')
+    def _download_finished_cb(self, page_number, page, generation):
+        ''' Is called by the FetchScheduler when the data is ready.
         Used to notify the listeners of the 'download_finished_signal'.
 
         Parameters
@@ -237,11 +591,183 @@ class PlayersManager(QObject):
 
             page : PlayersPage
                 the page itself
+
+            generation : int
+                cache generation the download was started in
         '''
 
-        self._page_cache.append(page_number, page)
+        with QMutexLocker(self._page_cache_lock):
+            self._failed_pages.pop(page_number, None)
+            retry_failed = bool(self._failed_pages)
+
+        self._store_page(page_number, page, generation)
+
+        # the site is back, the other failed pages are retried at once
+        if retry_failed:
+            self._retry_signal.emit(0)
+
+    def _download_failed_cb(self, page_number, error, generation):
+        ''' Is called by the FetchScheduler when the download failed.
+        The stale copy of the page is shown if the engine still has one.
+        Used to notify the listeners of the 'page_failed_signal'.
+
+        Parameters
+        ----------
+            page_number : int
+                number of the page
+
+            error : Exception
+                the download error
+
+            generation : int
+                cache generation the download was started in
+        '''
+
+        with QMutexLocker(self._page_cache_lock):
+            if generation != self._fetch_scheduler.generation():
+                return
+
+            self._partial_pages.pop(page_number, None)
+            self._failed_pages[page_number] = str(error) or error.__class__.__name__
+
+        stale_page = self._players_page.cached_page(page_number, self._players_sort_method)
+        if stale_page is not None:
+            self._store_page(page_number, stale_page, generation)
+
+        player_num_start = self._players_on_page * (page_number - 1) + 1
+        player_num_end = self._players_on_page * page_number
+
+        self.page_failed_signal.emit(player_num_start, player_num_end, str(error), stale_page is not None)
+
+        retry_in = max(self._circuit_breaker.retry_in(), self._retry_timeout)
+        self._retry_signal.emit(int(retry_in * 1000))
+
+    def _retry_failed(self):
+        ''' [Private] Schedules the failed pages again. While the circuit
+        breaker is open, the first of them is the probe and the others fail at once.
+        '''
+
+        with QMutexLocker(self._page_cache_lock):
+            page_numbers = sorted(self._failed_pages)
+            self._failed_pages.clear()
+
+        for page_number in page_numbers:
+            self._fetch_scheduler.schedule(page_number, FetchScheduler.Priority.PREFETCH)
+
+    def _store_page(self, page_number, page, generation):
+        ''' [Private] Puts the page into the cache and notifies the listeners.
+
+        Parameters
+        ----------
+            page_number : int
+                number of the page
+
+            page : list
+                Player instances of the page
+
+            generation : int
+                cache generation the page was downloaded in
+        '''
+
+        with QMutexLocker(self._page_cache_lock):
+            # the cache was dropped while the page was downloading
+            if generation != self._fetch_scheduler.generation():
+                return
+
+            self._partial_pages.pop(page_number, None)
+
+            # The revalidated page did not change, nothing to update. The pages of
+            # the cache daemon are new objects every time, so the content is compared.
+            previous = self._page_cache.get_all().get(page_number)
+            unchanged = previous is not None and previous == page
+
+            self._page_cache.append(page_number, previous if unchanged else page)
+
+            if unchanged:
+                return
+
+            for player_number, player in enumerate(page, self._players_on_page * (page_number - 1) + 1):
+                self._summary.add(player_number, player)
+
+            duplicates = self._player_index.add_page(page_number, page)
+
+            # the pages of the previous sort order go to the replaced index
+            search_index = self._search_index
+
+        if duplicates:
+            print('Page {}: players {} were already loaded from the other pages'.format(page_number, duplicates))
 
         player_num_start = self._players_on_page * (page_number - 1) + 1
         player_num_end = self._players_on_page * page_number
 
+        for player_number, player in enumerate(page, player_num_start):
+            if player.player_id is not None:
+                search_index.add(player.player_id, '{} ({})'.format(player.name, player.club), player_number)
+
         self.download_finished_signal.emit(player_num_start, player_num_end)
+
+    def _download_progress_cb(self, page_number, players, generation):
+        ''' Is called by the FetchScheduler when new rows of the streamed page are parsed.
+        Used to notify the listeners of the 'download_progress_signal'.
+
+        Parameters
+        ----------
+            page_number : int
+                number of the page being downloaded
+
+            players : list
+                players parsed so far
+
+            generation : int
+                cache generation the download was started in
+        '''
+
+        with QMutexLocker(self._page_cache_lock):
+            if generation != self._fetch_scheduler.generation():
+                return
+
+            self._partial_pages[page_number] = players
+
+        player_num_start = self._players_on_page * (page_number - 1) + 1
+
+        self.download_progress_signal.emit(player_num_start, player_num_start + len(players) - 1)
+
+    def _page_evicted_cb(self, page_number, page):
+        ''' Is called by the LRUPageCache when the page is evicted.
+        Used to notify the listeners of the 'page_evicted_signal'.
+
+        Parameters
+        ----------
+            page_number : int
+                number of the evicted page
+
+            page : PlayersPage
+                the page itself
+        '''
+
+        player_num_start = self._players_on_page * (page_number - 1) + 1
+        player_num_end = self._players_on_page * page_number
+
+        # called from LRUPageCache.append under the page cache lock
+        for player_number in range(player_num_start, player_num_end + 1):
+            self._summary.remove(player_number)
+
+        self._player_index.remove_page(page_number)
+
+        self.page_evicted_signal.emit(player_num_start, player_num_end)
+
+    def _profiles_ready_cb(self, player_ids):
+        ''' Is called by the ProfileCrawler when the batch of profiles is ready.
+        Used to notify the listeners of the 'profiles_ready_signal'.
+
+        Parameters
+        ----------
+            player_ids : list
+                IDs of the players whose profiles are downloaded.
+        '''
+
+        player_numbers = [self._profile_requests.pop(player_id) for player_id in player_ids
+                          if player_id in self._profile_requests]
+
+        if player_numbers:
+            self.profiles_ready_signal.emit(min(player_numbers), max(player_numbers))
@@ -1,38 +1,50 @@
-from bs4 import BeautifulSoup
-import requests
-
-from model.player import Player
+from model.scrape_engine import ScrapeEngine
 
 
 class PlayersPage:
-    ''' This class manages one page with footbal players from transfermarkt.com '''
-
-    headers = {'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/47.0.2526.106 Safari/537.36'}
+    ''' This class manages one page with footbal players from transfermarkt.com
+    Pages are downloaded from the default ranking list of the shared ScrapeEngine.
+    '''
 
     class SortType:
         NONE = 0
         ASC = 1
         DESC = 2
 
-    def __init__(self, app_config):
+    sort_names = {
+        SortType.NONE: 'NONE',
+        SortType.ASC: 'ASC',
+        SortType.DESC: 'DESC',
+    }
+
+    def __init__(self, app_config, list_name=None, params=None):
         ''' Constructs PlayersPage instance
 
         Parameters
         ----------
             app_config : AppConfig
                 Instance of application configuration file.
+
+            list_name : str
+                Name of the list from the 'ranking_lists' config,
+                the default list is used if not set.
+
+            params : dict
+                Values of the list URL placeholders.
         '''
 
-        self.config = app_config.transfermarkt
-        self.url = self.config['baseUrl'] + self.config['playersPageUrl']
-        self._players_on_page = self.config['playersOnPage']
+        self.engine = ScrapeEngine.shared(app_config)
+        self.list_name = list_name or self.engine.default_list
+        self.params = params or {}
+
+        self._players_on_page = self.engine.lists[self.list_name].players_on_page
 
     def players_on_page(self):
         ''' Returns number of players on the page. '''
 
         return self._players_on_page
 
-    def download(self, page_number=1, sort_type=SortType.DESC):
+    def download(self, page_number=1, sort_type=SortType.DESC, on_rows=None):
         ''' Downloads and parses all the footbal players from the given page.
 
         Parameters
@@ -43,69 +55,51 @@ class PlayersPage:
             sorted : SortType
                 How to sort the data.
 
+            on_rows : callable
+                Called with the players parsed so far while the page is received,
+                see ScrapeEngine.download.
+
         Returns
         -------
             List of the Player instances parsed from downloaded page.
 
         '''
 
-        # Generate URL accordgin to the input arguments
-        url = self.url + '?' + self.config['ajaxArg']
-
-        url += '&' + 'page={}'.format(page_number)
+        return self.engine.download(self.list_name, page_number, self.sort_names[sort_type], self.params, on_rows=on_rows)
 
-        # Append sort type
-        if sort_type == PlayersPage.SortType.DESC:
-            url += '&' + self.config['sortDescArg']
-        elif sort_type == PlayersPage.SortType.ASC:
-            url += '&' + self.config['sortAscArg']
-
-        # Perform request and parse the response
-        soup = self.__download_page(url)
-        player_items = soup.findAll('tr', {'class': ['even', 'odd']})
+    def revalidate(self, page_number, sort_type=SortType.DESC):
+        ''' Downloads the page even if it is cached. The cached page is
+        requested conditionally and returned as is if it did not change.
+        '''
 
-        player_list = []
+        return self.engine.download(self.list_name, page_number, self.sort_names[sort_type], self.params, use_cache=False)
 
-        for item in player_items:
-            name = str(self.__parse_player_name(item))
-            role = str(self.__parse_player_role(item))
-            age = int(self.__parse_player_age(item))
-            nationality = str(self.__parse_player_nationality(item))
-            club = str(self.__parse_player_club(item))
-            price = str(self.__parse_player_price(item))
+    def requests_sent(self):
+        ''' Returns the number of the requests the calling thread sent to the site, see ScrapeEngine.requests_sent. '''
 
-            player_list.append(Player(name, role, age, nationality, club, price))
+        return self.engine.requests_sent()
 
-        return player_list
+    def total(self):
+        ''' Returns the number of the players in the list or None if it is not known yet. '''
 
-    def __download_page(self, url):
-        ''' [Private] Internal helper for serialize page using bs. '''
+        return self.engine.total(self.list_name, self.params)
 
-        tree = requests.get(url, headers=self.headers)
-        soup = BeautifulSoup(tree.content, 'html.parser')
+    def cached_page(self, page_number, sort_type):
+        ''' Returns the page cached by the engine, even the stale one, or None. '''
 
-        return soup
+        return self.engine.cached(self.list_name, page_number, self.sort_names[sort_type], self.params)
 
-    @staticmethod
-    def __parse_player_name(soup):
-        return soup.find('a', {'class': 'spielprofil_tooltip'}).string
+    def validators(self, page_number, sort_type):
+        ''' Returns (ETag, Last-Modified) of the page cached by the engine, see ScrapeEngine.validators. '''
 
-    @staticmethod
-    def __parse_player_role(soup):
-        return soup.find('table', {'class': 'inline-table'}).findAll('tr')[1].string
+        return self.engine.validators(self.list_name, page_number, self.sort_names[sort_type], self.params)
 
-    @staticmethod
-    def __parse_player_age(soup):
-        return soup.findAll('td', {'class': 'zentriert'})[1].string
+    def store(self, page_number, sort_type, players, etag=None, last_modified=None):
+        ''' Caches the page downloaded elsewhere in the engine, see ScrapeEngine.store. '''
 
-    @staticmethod
-    def __parse_player_nationality(soup):
-        return soup.findAll('td', {'class': 'zentriert'})[2].find('img')['title']
+        self.engine.store(self.list_name, page_number, self.sort_names[sort_type], self.params, players, etag, last_modified)
 
-    @staticmethod
-    def __parse_player_club(soup):
-        return soup.findAll('td', {'class': 'zentriert'})[3].find('img')['alt']
+    def drop_cache(self):
+        ''' Drops the pages of the list cached by the engine. '''
 
-    @staticmethod
-    def __parse_player_price(soup):
-        return soup.find('td', {'class': 'rechts hauptlink'}).find('b').string
+        self.engine.drop_cache(self.list_name)
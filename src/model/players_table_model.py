@@ -1,4 +1,11 @@
-from PyQt5.QtCore import Qt, QAbstractTableModel
+import os
+
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt5.QtWidgets import QApplication
+
+from misc.tracer import tracer
+from model.binary_snapshot import BinarySnapshot
+from model.sort_index import SortIndex
 
 
 class PlayersTableModel(QAbstractTableModel):
@@ -16,10 +23,17 @@ class PlayersTableModel(QAbstractTableModel):
             "национальность",
             "клуб",
             "доход",
+            "нога",
+            "рост",
+            "контракт до",
+            "пиковая стоимость",
         ]
 
         COLUMN_COUNT = len(headers)
 
+        # Columns starting from this one are filled from the player profile page.
+        PROFILE_COLUMN_START = 6
+
         @staticmethod
         def get(index):
             return PlayersTableModel.TableHeader.headers[index]
@@ -49,17 +63,59 @@ class PlayersTableModel(QAbstractTableModel):
         self.readahead_row_step = config['rowCountIncStep']
         self.last_read_row = -1
 
+        # The table of the previous session is shown from the mapped snapshot
+        # until the fresh pages replace it.
+        self.snapshot_path = app_config.binary_snapshot['path']
+        self.warm_snapshot = None
+
+        if os.path.exists(self.snapshot_path):
+            try:
+                self.warm_snapshot = BinarySnapshot(self.snapshot_path)
+            except (OSError, ValueError) as e:
+                print('Failed to open the snapshot {}: {}'.format(self.snapshot_path, e))
+
+        # the snapshot rows follow the ranking of the sort order it was written in
+        if self.warm_snapshot is not None and self.warm_snapshot.sort_type != players_list.sort_method():
+            self.warm_snapshot.close()
+            self.warm_snapshot = None
+
+        if self.warm_snapshot is not None:
+            self.row_count = max(self.row_count, min(len(self.warm_snapshot), self.max_row_count))
+
+        # Loaded players kept sorted for the client side sorting.
+        # While sorted_rows is None the rows follow the server ranking.
+        self.sort_index = SortIndex(self.sort_key_functions)
+        self.sort_columns = []
+        self.sorted_rows = None
+
+        # player_number -> row of the sorted rows, built on demand
+        self.player_rows = None
+
         self.players_list = players_list
         self.players_list.download_finished_signal.connect(self.data_ready)
+        self.players_list.profiles_ready_signal.connect(self.profiles_ready)
+        self.players_list.page_evicted_signal.connect(self.data_evicted)
+        self.players_list.download_progress_signal.connect(self.data_partial)
+        self.players_list.page_failed_signal.connect(self.data_failed)
 
     def rowCount(self, parent=None, *args, **kwargs):
         ''' QAbstractTableModel interface. Returns current row count.'''
 
+        # the rows have no children
+        if parent is not None and parent.isValid():
+            return 0
+
+        if self.sorted_rows is not None:
+            return len(self.sorted_rows)
+
         return self.row_count
 
     def columnCount(self, parent=None, *args, **kwargs):
         ''' QAbstractTableModel interface. Returns current column count.'''
 
+        if parent is not None and parent.isValid():
+            return 0
+
         return PlayersTableModel.TableHeader.COLUMN_COUNT
 
     def headerData(self, index, Qt_Orientation, role=None):
@@ -72,6 +128,9 @@ class PlayersTableModel(QAbstractTableModel):
             return PlayersTableModel.TableHeader.get(index)
 
         if Qt_Orientation == Qt.Vertical:
+            if self.sorted_rows is not None:
+                return self.sorted_rows[index]
+
             return index + 1
 
         return None
@@ -81,6 +140,9 @@ class PlayersTableModel(QAbstractTableModel):
         it is possible to read more data from model.
         '''
 
+        if self.sorted_rows is not None:
+            return False
+
         if self.last_read_row >= self.max_row_count:
             return False
 
@@ -94,7 +156,11 @@ class PlayersTableModel(QAbstractTableModel):
         model.
         '''
 
-        self.beginInsertRows(parent, self.row_count, self.row_count + self.readahead_row_step)
+        # the sorted rows show all the loaded players, nothing to fetch
+        if self.sorted_rows is not None:
+            return
+
+        self.beginInsertRows(QModelIndex(), self.row_count, self.row_count + self.readahead_row_step - 1)
         self.row_count = self.row_count + self.readahead_row_step
         self.endInsertRows()
 
@@ -112,21 +178,57 @@ class PlayersTableModel(QAbstractTableModel):
         if role != Qt.DisplayRole:
             return None
 
-        if index.row() > self.max_row_count:
-            return None
+        if self.sorted_rows is not None:
+            player_number = self.sorted_rows[index.row()]
+            player = self.sort_index.get(player_number)
 
-        self.last_read_row = index.row() + 1
-        player_number = index.row() + 1
+            # the ranking row of the player not loaded, removed by the first sort
+            if player is None:
+                return None
 
-        if not self.players_list.is_cached(player_number):
-            self.data_not_ready()
-            self.players_list.get(player_number)
+        else:
+            if index.row() > self.max_row_count:
+                return None
 
-            return None
+            self.last_read_row = index.row() + 1
+            player_number = index.row() + 1
+
+            if not self.players_list.is_cached(player_number):
+                self.players_list.get(player_number)
+
+                # the rows of the page being downloaded are shown as they arrive
+                player = self.players_list.get_partial(player_number)
+
+                if player is not None and index.column() < self.TableHeader.PROFILE_COLUMN_START:
+                    return self.get_player_field_by_idx(player, index.column())
 
-        player = self.players_list.get_cached(player_number)
+                if self.is_warm(index.row()) and index.column() < self.TableHeader.PROFILE_COLUMN_START:
+                    return self.warm_snapshot.field(index.row(), index.column())
 
-        return self.get_player_field_by_idx(player, index.column())
+                # the page waits for the retry, the spinner is not shown meanwhile
+                if self.players_list.page_error(player_number) is not None:
+                    return 'ошибка загрузки' if index.column() == 0 else None
+
+                self.data_not_ready()
+
+                return None
+
+            player = self.players_list.get_cached(player_number)
+
+            # past the end of the list
+            if player is None:
+                return None
+
+        if index.column() < self.TableHeader.PROFILE_COLUMN_START:
+            return self.get_player_field_by_idx(player, index.column())
+
+        # Profiles are requested only for the rows the view asks for.
+        profile = self.players_list.get_profile(player_number, player)
+
+        if profile is None:
+            return None
+
+        return self.get_profile_field_by_idx(profile, index.column())
 
     def goto_row(self, row):
         ''' Insert rows up to row.
@@ -137,13 +239,14 @@ class PlayersTableModel(QAbstractTableModel):
                 Row up to each insert rows.
         '''
 
-        if row < self.row_count:
+        if self.sorted_rows is not None or row < self.row_count:
             return
 
-        self.beginInsertRows(self.index(self.row_count, 0), self.row_count, self.row_count + row)
+        self.beginInsertRows(QModelIndex(), self.row_count, self.row_count + row - 1)
         self.row_count = self.row_count + row
         self.endInsertRows()
 
+    @tracer.traced('model')
     def data_ready(self, player_num_start, player_num_end):
         ''' Callback called when new data is downloaded.
         It emits the parent view signal that data updated and
@@ -163,12 +266,295 @@ class PlayersTableModel(QAbstractTableModel):
 
         print("Players from {} to {} are ready".format(player_num_start, player_num_end))
 
-        updated_index_begin = self.index(player_num_start, self.TableHeader.COLUMN_COUNT)
-        updated_index_end = self.index(player_num_end, self.TableHeader.COLUMN_COUNT)
+        for player_number in range(player_num_start, player_num_end + 1):
+            player = self.players_list.get_cached(player_number)
+            if player is not None:
+                self.sort_index.add(player_number, player)
+
+        if self.sorted_rows is not None:
+            self._resort()
+
+            # the reloaded players keep their rows, their values are updated
+            rows = [self.row_of_player(player_number) for player_number in range(player_num_start, player_num_end + 1)]
+            rows = [row for row in rows if row is not None]
+
+            if rows:
+                self._rows_changed(min(rows), max(rows), 0, self.TableHeader.COLUMN_COUNT - 1)
+
+            self.main_window_ref.set_table_active()
+            return
+
+        self._rows_changed(player_num_start - 1, player_num_end - 1, 0, self.TableHeader.COLUMN_COUNT - 1)
+        self.main_window_ref.set_table_active()
+
+    def data_partial(self, player_num_start, player_num_end):
+        ''' Callback called when new rows of the page being downloaded are parsed.
+        Updates the rows received so far, the page is not sortable until it is complete.
+
+        Called on main thread.
+
+        Parameters
+        ----------
+            player_num_start
+                First player number of the page.
+
+            player_num_end
+                Last player number received so far.
+        '''
+
+        if self.sorted_rows is not None:
+            return
+
+        self._rows_changed(player_num_start - 1, player_num_end - 1, 0, self.TableHeader.PROFILE_COLUMN_START - 1)
+        self.main_window_ref.set_table_active()
+
+    def data_failed(self, player_num_start, player_num_end, message, stale):
+        ''' Callback called when the page failed to download.
+        Stops the spinner and updates the rows of the page.
+
+        Called on main thread.
+
+        Parameters
+        ----------
+            player_num_start
+                First player number of the page.
+
+            player_num_end
+                Last player number of the page.
+
+            message
+                The download error.
+
+            stale
+                True if the saved copy of the page is shown instead.
+        '''
+
+        if self.sorted_rows is None:
+            self._rows_changed(player_num_start - 1, player_num_end - 1, 0, self.TableHeader.COLUMN_COUNT - 1)
 
-        self.dataChanged.emit(updated_index_begin, updated_index_end)
         self.main_window_ref.set_table_active()
 
+    def profiles_ready(self, player_num_start, player_num_end):
+        ''' Callback called when new player profiles are downloaded.
+        Emits the parent view signal that profile columns are updated.
+
+        Called on main thread.
+
+        Parameters
+        ----------
+            player_num_start
+                First player number with the new profile.
+
+            player_num_end
+                Last player number with the new profile.
+        '''
+
+        if self.sorted_rows is not None:
+            player_num_start, player_num_end = 1, len(self.sorted_rows)
+
+        self._rows_changed(player_num_start - 1, player_num_end - 1,
+                           self.TableHeader.PROFILE_COLUMN_START, self.TableHeader.COLUMN_COUNT - 1)
+
+    def data_evicted(self, player_num_start, player_num_end):
+        ''' Callback called when the page is evicted from the cache.
+        Removes the evicted players from the sorted view.
+
+        Called on main thread.
+
+        Parameters
+        ----------
+            player_num_start
+                First evicted player number.
+
+            player_num_end
+                Last evicted player number.
+        '''
+
+        for player_number in range(player_num_start, player_num_end + 1):
+            self.sort_index.remove(player_number)
+
+        if self.sorted_rows is not None:
+            self._resort()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        ''' QAbstractTableModel interface. Called when the view header is clicked.
+        Sorts the loaded players by the column. With Shift held the column is
+        added as the next sort key instead of replacing the current ones.
+        Column -1 restores the server ranking order.
+        '''
+
+        if column < 0:
+            self.beginResetModel()
+            self.sort_columns = []
+            self.sorted_rows = None
+            self.player_rows = None
+            self.endResetModel()
+            return
+
+        if not self.sort_index.is_sortable(column):
+            return
+
+        sort_column = (column, order == Qt.DescendingOrder)
+
+        if QApplication.keyboardModifiers() & Qt.ShiftModifier:
+            self.sort_columns = [c for c in self.sort_columns if c[0] != column] + [sort_column]
+        else:
+            self.sort_columns = [sort_column]
+
+        # The ranking rows turn into the sorted ones: the rows of the players
+        # not loaded are removed and the selected players keep their selection.
+        if self.sorted_rows is None:
+            self.sorted_rows = list(range(1, self.row_count + 1))
+
+        self._resort()
+
+    def sort_indicator(self):
+        ''' Returns (column, order) of the last applied sort key for the view header,
+        (-1, Qt.AscendingOrder) in the ranking order.
+        '''
+
+        if not self.sort_columns:
+            return -1, Qt.AscendingOrder
+
+        column, descending = self.sort_columns[-1]
+
+        return column, Qt.DescendingOrder if descending else Qt.AscendingOrder
+
+    def is_sortable(self, column):
+        ''' Check if the table can be sorted by the column. '''
+
+        return self.sort_index.is_sortable(column)
+
+    def row_of_player(self, player_number):
+        ''' Returns the row where the player is shown or None. '''
+
+        if self.sorted_rows is None:
+            return player_number - 1
+
+        if self.player_rows is None:
+            self.player_rows = {player_number: row for row, player_number in enumerate(self.sorted_rows)}
+
+        return self.player_rows.get(player_number)
+
+    def player_of_row(self, row):
+        ''' Returns the number of the player shown in the row. '''
+
+        if self.sorted_rows is None:
+            return row + 1
+
+        return self.sorted_rows[row]
+
+    def _resort(self):
+        ''' [Private] Brings the sorted rows to the order of the sort index.
+        The rows of the players gone are removed and the new players are
+        inserted where they belong, so the view keeps its selection and scroll
+        position. Only the sort order change moves the rows, the persistent
+        indexes follow their players then.
+        '''
+
+        new_rows = self.sort_index.permutation(self.sort_columns)
+        new_players = set(new_rows)
+
+        self.player_rows = None
+
+        # the lower runs first, the rows above them keep their numbers
+        gone = [row for row, player_number in enumerate(self.sorted_rows) if player_number not in new_players]
+
+        for first, last in reversed(self._runs(gone)):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self.sorted_rows[first:last + 1]
+            self.endRemoveRows()
+
+        shown = set(self.sorted_rows)
+
+        if [player_number for player_number in new_rows if player_number in shown] == self.sorted_rows:
+            # the upper runs first, the rows above the next run are in place then
+            added = [row for row, player_number in enumerate(new_rows) if player_number not in shown]
+
+            for first, last in self._runs(added):
+                self.beginInsertRows(QModelIndex(), first, last)
+                self.sorted_rows[first:first] = new_rows[first:last + 1]
+                self.endInsertRows()
+
+            return
+
+        added = [player_number for player_number in new_rows if player_number not in shown]
+
+        if added:
+            self.beginInsertRows(QModelIndex(), len(self.sorted_rows), len(self.sorted_rows) + len(added) - 1)
+            self.sorted_rows.extend(added)
+            self.endInsertRows()
+
+        self.layoutAboutToBeChanged.emit()
+
+        new_row_of = {player_number: row for row, player_number in enumerate(new_rows)}
+        persistent_indexes = self.persistentIndexList()
+
+        self.changePersistentIndexList(persistent_indexes, [
+            self.createIndex(new_row_of[self.sorted_rows[index.row()]], index.column()) for index in persistent_indexes])
+
+        self.sorted_rows = new_rows
+        self.player_rows = new_row_of
+
+        self.layoutChanged.emit()
+
+    def _rows_changed(self, first_row, last_row, first_column, last_column):
+        ''' [Private] Emits dataChanged for the rows which exist in the model. '''
+
+        last_row = min(last_row, self.rowCount() - 1)
+
+        if first_row > last_row:
+            return
+
+        self.dataChanged.emit(self.index(first_row, first_column), self.index(last_row, last_column))
+
+    @staticmethod
+    def _runs(rows):
+        ''' [Private] Splits the ascending row numbers into (first, last) runs of the adjacent rows. '''
+
+        runs = []
+
+        for row in rows:
+            if runs and runs[-1][1] == row - 1:
+                runs[-1][1] = row
+            else:
+                runs.append([row, row])
+
+        return runs
+
+    def is_warm(self, row):
+        ''' Check if the row can be served from the previous session snapshot. '''
+
+        return self.warm_snapshot is not None and self.warm_snapshot.has_row(row)
+
+    def save_snapshot(self):
+        ''' Writes the table rows into the snapshot for the next launch.
+        The fresh players are saved over the snapshot rows, the rows never
+        loaded in this session are kept from the previous snapshot.
+        The snapshot is dropped by the sort order change, so its rows are
+        always in the current order.
+        '''
+
+        players = []
+
+        for player_number in range(1, self.max_row_count + 1):
+            player = self.players_list.get_cached(player_number)
+
+            if player is None and self.is_warm(player_number - 1):
+                player = self.warm_snapshot.player(player_number - 1)
+
+            # rows are stored by the ranking, the rows never loaded are left empty
+            players.append(player)
+
+        while players and players[-1] is None:
+            players.pop()
+
+        if not players:
+            return
+
+        # the old file stays mapped, it is replaced by the new one atomically
+        BinarySnapshot.write(self.snapshot_path, players, self.players_list.sort_method())
+
     def data_not_ready(self):
         ''' Callback called if data is requested by the view, but
         not preserved in the cache.
@@ -178,10 +564,47 @@ class PlayersTableModel(QAbstractTableModel):
 
         self.main_window_ref.set_table_inactive()
 
-    def drop_data(self):
-        ''' Clears the model by dropping internal cache data. '''
+    def refresh_data(self):
+        ''' Revalidates the loaded data, the rows are updated as the changed pages arrive. '''
+
+        self.players_list.refresh()
+
+    def set_sort_method(self, sort_type):
+        ''' Switches the server side ranking order of the rows.
+
+        Parameters
+        ----------
+            sort_type : PlayersPage.SortType
+                How to sort the data.
+        '''
+
+        if sort_type == self.players_list.sort_method():
+            return
+
+        self.beginResetModel()
 
-        self.players_list.drop_cache()
+        # the previous session rows are in the other order now
+        if self.warm_snapshot is not None:
+            self.warm_snapshot.close()
+            self.warm_snapshot = None
+
+        self.players_list.set_sort_method(sort_type)
+        self.sort_index.clear()
+        self.sort_columns = []
+        self.sorted_rows = None
+        self.player_rows = None
+
+        self.endResetModel()
+
+    # Sort keys of the player columns, prices are compared as numbers.
+    sort_key_functions = {
+        0: lambda player: player.name.casefold(),
+        1: lambda player: player.role.casefold(),
+        2: lambda player: player.age,
+        3: lambda player: player.nationality.casefold(),
+        4: lambda player: player.club.casefold(),
+        5: lambda player: player.market_value() or 0,
+    }
 
     @staticmethod
     def get_player_field_by_idx(player, idx):
@@ -202,3 +625,20 @@ class PlayersTableModel(QAbstractTableModel):
 
         elif idx == 5:
             return player.price
+
+    @staticmethod
+    def get_profile_field_by_idx(profile, idx):
+        if profile is None:
+            return None
+
+        elif idx == 6:
+            return profile.foot
+
+        elif idx == 7:
+            return profile.height
+
+        elif idx == 8:
+            return profile.contract_expiry
+
+        elif idx == 9:
+            return profile.peak_market_value()
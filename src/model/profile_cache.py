@@ -0,0 +1,67 @@
+import dataclasses
+import json
+import sqlite3
+import threading
+import time
+
+from model.player_profile import PlayerProfile
+
+
+class ProfileCache:
+    ''' Persistent cache for player profiles backed by SQLite.
+    All the stored profiles are also kept in memory, so lookups never touch the disk.
+    '''
+
+    def __init__(self, path, max_age_days):
+        ''' Constructs new ProfileCache instance.
+
+        Parameters
+        ----------
+            path : str
+                Path to the SQLite database file.
+
+            max_age_days : int
+                Profiles older than this are treated as missing.
+        '''
+
+        self._max_age = max_age_days * 24 * 60 * 60
+        self._lock = threading.Lock()
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('CREATE TABLE IF NOT EXISTS profiles (player_id INTEGER PRIMARY KEY, fetched_at REAL, payload TEXT)')
+        self._db.commit()
+
+        self._profiles = {}
+
+        min_fetched_at = time.time() - self._max_age
+        for player_id, payload in self._db.execute('SELECT player_id, payload FROM profiles WHERE fetched_at >= ?', (min_fetched_at,)):
+            self._profiles[player_id] = PlayerProfile(**json.loads(payload))
+
+    def get(self, player_id):
+        ''' Returns the profile by the player ID or None if not cached. '''
+
+        return self._profiles.get(player_id)
+
+    def is_cached(self, player_id):
+        ''' Check if the profile of the player is cached. '''
+
+        return player_id in self._profiles
+
+    def append_many(self, profiles):
+        ''' Stores the profiles both in memory and on disk.
+
+        Parameters
+        ----------
+            profiles : list
+                List of PlayerProfile instances.
+        '''
+
+        now = time.time()
+
+        with self._lock:
+            for profile in profiles:
+                self._profiles[profile.player_id] = profile
+
+            self._db.executemany('INSERT OR REPLACE INTO profiles VALUES (?, ?, ?)',
+                                 [(p.player_id, now, json.dumps(dataclasses.asdict(p))) for p in profiles])
+            self._db.commit()
@@ -0,0 +1,160 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import pyqtSignal, QThread, QMutex, QWaitCondition
+
+from model.player_profile_page import PlayerProfilePage
+from model.profile_cache import ProfileCache
+
+
+class ProfileCrawler(QThread):
+    ''' Downloads player profile pages in the background.
+    Requested profiles are collected into the queue and crawled concurrently
+    in batches of bounded size. Crawled profiles are stored in the persistent
+    ProfileCache, the failed ones are not cached and are crawled again
+    when requested next time.
+    '''
+
+    profiles_ready_signal = pyqtSignal(list, name='profiles_ready')
+
+    def __init__(self, app_config):
+        ''' Constructs ProfileCrawler instance.
+
+        Parameters
+        ----------
+            app_config : AppConfig
+                Instance of application configuration file.
+        '''
+
+        super(self.__class__, self).__init__()
+
+        config = app_config.profile_crawler
+
+        self._batch_size = config['batchSize']
+        self._max_workers = config['maxWorkers']
+
+        self._cache = ProfileCache(config['cachePath'], config['maxAgeDays'])
+        self._profile_page = PlayerProfilePage(app_config)
+
+        self._lock = QMutex()
+        self._queue_not_empty = QWaitCondition()
+
+        # player_id -> profile_url, insertion ordered
+        self._queue = {}
+        self._in_progress = set()
+
+        self.stopped = False
+
+    def __del__(self):
+        ''' Override in order to stop internal thread. '''
+        self.stopped = True
+        self._queue_not_empty.wakeOne()
+
+    def get(self, player_id):
+        ''' Returns the cached profile or None. '''
+
+        return self._cache.get(player_id)
+
+    def schedule(self, player_id, profile_url):
+        ''' Schedules the profile download if it is not cached yet.
+
+        Parameters
+        ----------
+            player_id : int
+                Transfermarkt ID of the player.
+
+            profile_url : str
+                Absolute URL of the player profile page.
+        '''
+
+        if self._cache.is_cached(player_id):
+            return
+
+        self._lock.lock()
+
+        if player_id not in self._queue and player_id not in self._in_progress:
+            self._queue[player_id] = profile_url
+            self._queue_not_empty.wakeOne()
+
+        self._lock.unlock()
+
+    def get_blocking(self, players):
+        ''' Crawls all the missing profiles of the players in the caller thread.
+
+        Parameters
+        ----------
+            players : list
+                List of Player instances.
+
+        Returns
+        -------
+            dict player_id -> PlayerProfile, None for the profiles failed to download
+        '''
+
+        missing = [(p.player_id, p.profile_url) for p in players
+                   if p.player_id is not None and not self._cache.is_cached(p.player_id)]
+
+        for batch_start in range(0, len(missing), self._batch_size):
+            self._crawl_batch(missing[batch_start:batch_start + self._batch_size])
+
+        return {p.player_id: self._cache.get(p.player_id) for p in players if p.player_id is not None}
+
+    def run(self):
+        ''' This code runs in the separate thread. '''
+        while not self.stopped:
+
+            # wait until somebody requested profiles
+            self._lock.lock()
+            while not self._queue and not self.stopped:
+                self._queue_not_empty.wait(self._lock)
+
+            batch = []
+            while self._queue and len(batch) < self._batch_size:
+                player_id = next(iter(self._queue))
+                batch.append((player_id, self._queue.pop(player_id)))
+                self._in_progress.add(player_id)
+
+            self._lock.unlock()
+
+            if not batch:
+                continue
+
+            try:
+                profiles = self._crawl_batch(batch)
+            except Exception as e:
+                print('Profile batch failed: {}'.format(e))
+                profiles = []
+            finally:
+                self._lock.lock()
+                self._in_progress.difference_update(player_id for player_id, _ in batch)
+                self._lock.unlock()
+
+            # the failed profiles are requested again when the view asks for them
+            if profiles:
+                self.profiles_ready_signal.emit([profile.player_id for profile in profiles])
+
+    def _crawl_batch(self, batch):
+        ''' [Private] Downloads the batch of profiles concurrently and caches them.
+
+        Parameters
+        ----------
+            batch : list
+                List of (player_id, profile_url) tuples.
+
+        Returns
+        -------
+            List of the PlayerProfile instances downloaded successfully.
+        '''
+
+        def download(item):
+            try:
+                return self._profile_page.download(*item)
+            except Exception as e:
+                print('Profile {} download failed: {}'.format(item[0], e))
+                return None
+
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            profiles = [profile for profile in executor.map(download, batch) if profile is not None]
+
+        self._cache.append_many(profiles)
+
+        return profiles
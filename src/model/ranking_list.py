@@ -0,0 +1,137 @@
+from dataclasses import dataclass, field
+
+from model.player import Player
+
+
+def _link_text(row, css_class):
+    return row.find('a', {'class': css_class}).string
+
+
+def _link_href(row, css_class):
+    return row.find('a', {'class': css_class})['href']
+
+
+def _inline_table_row(row, index):
+    return row.find('table', {'class': 'inline-table'}).findAll('tr')[index].string
+
+
+def _cell_text(row, css_class, index):
+    return row.findAll('td', {'class': css_class})[index].string
+
+
+def _cell_img_attr(row, css_class, index, attr):
+    return row.findAll('td', {'class': css_class})[index].find('img')[attr]
+
+
+def _bold_text(row, css_class):
+    return row.find('td', {'class': css_class}).find('b').string
+
+
+# Row field extractors referenced by name from the list definitions.
+FIELD_EXTRACTORS = {
+    'link_text': _link_text,
+    'link_href': _link_href,
+    'inline_table_row': _inline_table_row,
+    'cell_text': _cell_text,
+    'cell_img_attr': _cell_img_attr,
+    'bold_text': _bold_text,
+}
+
+
+@dataclass
+class RankingList:
+    '''
+    Declarative definition of one transfermarkt ranking list.
+    '''
+
+    name: str
+
+    # Path relative to the base URL, may contain {placeholders} filled from the crawl params.
+    url: str
+
+    players_on_page: int
+
+    # Query arguments, may contain {placeholders} as well.
+    args: list = field(default_factory=list)
+
+    page_arg: str = 'page={}'
+
+    # 'ASC'/'DESC' -> query argument
+    sort_args: dict = field(default_factory=dict)
+
+    row_tag: str = 'tr'
+    row_classes: list = field(default_factory=lambda: ['even', 'odd'])
+
+    # Player field -> [extractor name, extractor args...]
+    fields: dict = field(default_factory=dict)
+
+    @staticmethod
+    def from_config(name, config):
+        ''' Constructs RankingList from the 'ranking_lists' config entry. '''
+
+        return RankingList(
+            name=name,
+            url=config['url'],
+            players_on_page=config['playersOnPage'],
+            args=config.get('args', []),
+            page_arg=config.get('pageArg', 'page={}'),
+            sort_args=config.get('sortArgs', {}),
+            row_tag=config.get('rowTag', 'tr'),
+            row_classes=config.get('rowClasses', ['even', 'odd']),
+            fields=config['fields'],
+        )
+
+    def page_url(self, base_url, page_number, sort_name, params):
+        ''' Builds the URL of the list page.
+
+        Parameters
+        ----------
+            base_url : str
+                Site base URL.
+
+            page_number : int
+                Number of the page.
+
+            sort_name : str
+                'ASC', 'DESC' or 'NONE'.
+
+            params : dict
+                Values of the URL placeholders.
+        '''
+
+        args = [arg.format(**params) for arg in self.args]
+        args.append(self.page_arg.format(page_number))
+
+        if sort_name in self.sort_args:
+            args.append(self.sort_args[sort_name])
+
+        return base_url + self.url.format(**params) + '?' + '&'.join(args)
+
+    def parse_row(self, row, base_url):
+        ''' Extracts the Player from the row markup. '''
+
+        values = {}
+
+        for field_name, (extractor, *extractor_args) in self.fields.items():
+            value = FIELD_EXTRACTORS[extractor](row, *extractor_args)
+            values[field_name] = str(value) if value is not None else None
+
+        profile_href = values.pop('profile_href', None)
+        if profile_href is not None:
+            # profile links look like /kylian-mbappe/profil/spieler/342229
+            values['player_id'] = int(profile_href.rstrip('/').rsplit('/', 1)[-1])
+            values['profile_url'] = base_url + profile_href
+
+        if values.get('age') is not None:
+            values['age'] = int(values['age']) if values['age'].isdigit() else None
+
+        return Player(
+            name=values.get('name'),
+            role=values.get('role'),
+            age=values.get('age'),
+            nationality=values.get('nationality'),
+            club=values.get('club'),
+            price=values.get('price'),
+            player_id=values.get('player_id'),
+            profile_url=values.get('profile_url'),
+        )
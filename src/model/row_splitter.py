@@ -0,0 +1,90 @@
+import re
+
+
+class RowSplitter:
+    ''' Cuts the complete list rows out of the markup fed by chunks.
+
+    Only the row tags are tracked: a row starts with the opening tag
+    of one of the row classes and ends with the matching closing tag,
+    the nested rows of the inline tables are counted by depth. Everything
+    outside the rows is dropped as soon as it is scanned.
+    '''
+
+    _class_attr = re.compile(rb'''class\s*=\s*["']([^"']*)["']''', re.IGNORECASE)
+
+    def __init__(self, row_tag, row_classes):
+        ''' Constructs RowSplitter instance.
+
+        Parameters
+        ----------
+            row_tag : str
+                Tag of the list rows.
+
+            row_classes : list
+                Classes of the list rows, any of them matches.
+        '''
+
+        self._tag = re.compile(rb'<(/?)' + re.escape(row_tag.encode('ascii')) + rb'\b[^>]*>', re.IGNORECASE)
+        self._row_classes = {row_class.encode('ascii') for row_class in row_classes}
+
+        self._buffer = b''
+
+        # position in the buffer to continue the tag search from
+        self._scanned = 0
+
+        # start of the current row in the buffer or None outside the rows
+        self._row_start = None
+        self._depth = 0
+
+    def feed(self, chunk):
+        ''' Adds the chunk of markup.
+
+        Returns
+        -------
+            List of the row markups completed by the chunk.
+        '''
+
+        self._buffer += chunk
+        rows = []
+
+        while True:
+            match = self._tag.search(self._buffer, self._scanned)
+
+            # the tag may be cut by the chunk end, it is scanned again with the next chunk
+            if match is None:
+                last_tag_start = self._buffer.rfind(b'<', self._scanned)
+                self._scanned = last_tag_start if last_tag_start >= 0 else len(self._buffer)
+                break
+
+            self._scanned = match.end()
+            closing = bool(match.group(1))
+
+            if self._row_start is None:
+                if not closing and self._is_row(match.group(0)):
+                    self._row_start = match.start()
+                    self._depth = 1
+
+                continue
+
+            self._depth += -1 if closing else 1
+
+            if self._depth == 0:
+                rows.append(self._buffer[self._row_start:match.end()])
+                self._row_start = None
+
+        # drop the markup which can not be a part of the next rows
+        keep_from = self._row_start if self._row_start is not None else self._scanned
+        self._buffer = self._buffer[keep_from:]
+        self._scanned -= keep_from
+
+        if self._row_start is not None:
+            self._row_start = 0
+
+        return rows
+
+    def _is_row(self, start_tag):
+        ''' [Private] Check if the opening tag has one of the row classes. '''
+
+        class_attr = self._class_attr.search(start_tag)
+
+        return class_attr is not None and not self._row_classes.isdisjoint(class_attr.group(1).split())
@@ -0,0 +1,426 @@
+import collections
+import dataclasses
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from bs4 import BeautifulSoup, SoupStrainer
+import requests
+
+from misc.tracer import tracer
+from model.lru_page_cache import LRUPageCache
+from model.ranking_list import RankingList
+from model.row_splitter import RowSplitter
+
+
+@dataclasses.dataclass
+class CachedPage:
+    ''' Parsed page with the validators used to revalidate it. '''
+
+    players: list
+    etag: str = None
+    last_modified: str = None
+
+    # hash of the raw body for the servers without validators
+    digest: bytes = None
+
+    # stale pages are revalidated by the next download
+    stale: bool = False
+
+    # built from the mirror sort pages, relies on the learned list size
+    derived: bool = False
+
+
+class ScrapeEngine:
+    ''' Generic scraper of the transfermarkt ranking lists.
+    All the lists share one HTTP session and thread pool, one page cache
+    and one parser backend. The lists themselves are declared in the config.
+    '''
+
+    # The ASC ranking is the DESC one reversed and vice versa.
+    mirror_sorts = {'ASC': 'DESC', 'DESC': 'ASC'}
+
+    headers = {'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/47.0.2526.106 Safari/537.36'}
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, app_config):
+        ''' Constructs ScrapeEngine instance.
+
+        Parameters
+        ----------
+            app_config : AppConfig
+                Instance of application configuration file.
+        '''
+
+        config = app_config.transfermarkt
+
+        self.base_url = config['baseUrl']
+        self.default_list = config['defaultList']
+
+        self._parser = config['parser']
+        self._stream_chunk_size = config['streamChunkSize']
+
+        # seconds to wait for the connection and for every chunk of the response
+        self._timeout = config['requestTimeout']
+
+        self.lists = {name: RankingList.from_config(name, list_config)
+                      for name, list_config in app_config.ranking_lists.items()}
+
+        workers = config['workers']
+
+        self._session = requests.Session()
+        self._session.headers.update(self.headers)
+        adapter = requests.adapters.HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+
+        self._cache_lock = threading.Lock()
+        self._cache = LRUPageCache(capacity=config['cacheCapacity'])
+
+        # (list_name, params) -> number of the players in the list,
+        # known once the last page of the list is downloaded
+        self._totals = {}
+
+        # 'parsed', 'not_modified' (304), 'unchanged' (same body hash)
+        # and 'derived' (built from the mirror sort pages) downloads
+        self.stats = collections.Counter()
+
+        # number of the requests sent to the site by every thread
+        self._requests = threading.local()
+
+    @classmethod
+    def shared(cls, app_config):
+        ''' Returns the engine shared by the whole process. '''
+
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(app_config)
+
+            return cls._shared
+
+    def download(self, list_name, page_number, sort_name='DESC', params=None, use_cache=True, on_rows=None):
+        ''' Downloads and parses one page of the list in the caller thread.
+
+        Parameters
+        ----------
+            list_name : str
+                Name of the list from the 'ranking_lists' config.
+
+            page_number : int
+                Number of the page.
+
+            sort_name : str
+                'ASC', 'DESC' or 'NONE'.
+
+            params : dict
+                Values of the list URL placeholders.
+
+            use_cache : bool
+                Return the cached page if there is one and it is not stale.
+
+            on_rows : callable
+                If set, the page downloaded for the first time is parsed while
+                it is received and on_rows is called with the list of all the
+                players parsed so far every time new rows are complete.
+
+        Returns
+        -------
+            List of the Player instances. If the cached page is revalidated
+            and did not change, the very same list is returned.
+            The error responses (4xx, 5xx) and the timeouts raise
+            requests.RequestException, they are never cached.
+        '''
+
+        params = params or {}
+        key = (list_name, tuple(sorted(params.items())), sort_name, page_number)
+
+        with self._cache_lock:
+            cached = self._cache.get(key) if self._cache.is_cached(key) else None
+
+            if use_cache and cached is not None and not cached.stale:
+                return cached.players
+
+            if use_cache and cached is None:
+                players = self._derive(key)
+
+                if players is not None:
+                    self.stats['derived'] += 1
+                    self._cache.append(key, CachedPage(players, derived=True))
+
+                    return players
+
+        ranking_list = self.lists[list_name]
+        url = ranking_list.page_url(self.base_url, page_number, sort_name, params)
+
+        # The page downloaded before is requested conditionally
+        request_headers = {}
+        if cached is not None:
+            if cached.etag:
+                request_headers['If-None-Match'] = cached.etag
+            if cached.last_modified:
+                request_headers['If-Modified-Since'] = cached.last_modified
+
+        self._requests.count = self.requests_sent() + 1
+
+        # Revalidated pages are not streamed, the rows are not parsed if the page did not change
+        if on_rows is not None and cached is None:
+            players, response, digest = self._stream(ranking_list, url, on_rows)
+        else:
+            with tracer.span('http get', 'fetch', url=url, conditional=bool(request_headers)):
+                response = self._session.get(url, headers=request_headers, timeout=self._timeout)
+
+            # the error pages (throttling, maintenance) have no rows, they must not be taken for the empty pages
+            response.raise_for_status()
+
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+
+        if on_rows is not None and cached is None:
+            self.stats['streamed'] += 1
+
+        elif cached is not None and response.status_code == 304:
+            self.stats['not_modified'] += 1
+            players = cached.players
+            digest = cached.digest
+
+            # 304 may omit the validators, the old ones are still valid then
+            etag = etag or cached.etag
+            last_modified = last_modified or cached.last_modified
+        else:
+            # Without validators the body hash tells if the page changed
+            digest = hashlib.sha1(response.content).digest()
+
+            if cached is not None and digest == cached.digest:
+                self.stats['unchanged'] += 1
+                players = cached.players
+            else:
+                self.stats['parsed'] += 1
+                players = self.parse(ranking_list, response.content)
+
+        page = CachedPage(players, etag, last_modified, digest)
+
+        # Only the verified pages get here, the error responses have raised above.
+        with self._cache_lock:
+            self._cache.append(key, page)
+            self._learn_total(key, players)
+
+        return players
+
+    def _stream(self, ranking_list, url, on_rows):
+        ''' [Private] Downloads the page parsing the rows as soon as they are received.
+
+        Returns
+        -------
+            (players, response, body hash) tuple.
+        '''
+
+        splitter = RowSplitter(ranking_list.row_tag, ranking_list.row_classes)
+        body_hash = hashlib.sha1()
+        players = []
+
+        with tracer.span('http stream', 'fetch', url=url):
+            with self._session.get(url, stream=True, timeout=self._timeout) as response:
+                response.raise_for_status()
+
+                # requests reports ISO-8859-1 for the text without the charset, the rows
+                # are left to BeautifulSoup to detect then, the way parse does it
+                encoding = None
+                if 'charset=' in response.headers.get('Content-Type', '').lower():
+                    encoding = response.encoding
+
+                for chunk in response.iter_content(chunk_size=self._stream_chunk_size):
+                    body_hash.update(chunk)
+
+                    rows = splitter.feed(chunk)
+                    if not rows:
+                        continue
+
+                    with tracer.span('parse rows', 'parse', list=ranking_list.name, rows=len(rows)):
+                        for row in rows:
+                            soup = BeautifulSoup(row, self._parser, from_encoding=encoding)
+                            players.append(ranking_list.parse_row(soup.find(ranking_list.row_tag), self.base_url))
+
+                    on_rows(list(players))
+
+        return players, response, body_hash.digest()
+
+    def requests_sent(self):
+        ''' Returns the number of the requests the calling thread sent to the site.
+        The downloads served from the cache or derived from it do not count.
+        '''
+
+        return getattr(self._requests, 'count', 0)
+
+    def cached(self, list_name, page_number, sort_name='DESC', params=None):
+        ''' Returns the cached page even if it is stale, or None. Used while the site is unavailable. '''
+
+        key = (list_name, tuple(sorted((params or {}).items())), sort_name, page_number)
+
+        with self._cache_lock:
+            page = self._cache.get_all().get(key)
+
+        return page.players if page is not None else None
+
+    def validators(self, list_name, page_number, sort_name='DESC', params=None):
+        ''' Returns (ETag, Last-Modified) of the cached page, (None, None) if it is not cached. '''
+
+        key = (list_name, tuple(sorted((params or {}).items())), sort_name, page_number)
+
+        with self._cache_lock:
+            page = self._cache.get_all().get(key)
+
+        return (page.etag, page.last_modified) if page is not None else (None, None)
+
+    def store(self, list_name, page_number, sort_name, params, players, etag=None, last_modified=None):
+        ''' Caches the page downloaded elsewhere, e.g. by another instance sharing the
+        cache daemon. The list size is learned from it as from the downloaded page and
+        the validators let the next download revalidate it conditionally.
+        '''
+
+        key = (list_name, tuple(sorted((params or {}).items())), sort_name, page_number)
+
+        with self._cache_lock:
+            self._cache.append(key, CachedPage(players, etag, last_modified))
+            self._learn_total(key, players)
+
+    def total(self, list_name, params=None):
+        ''' Returns the number of the players in the list or None if it is not known yet. '''
+
+        return self._totals.get((list_name, tuple(sorted((params or {}).items()))))
+
+    def _learn_total(self, key, players):
+        ''' [Private] Remembers the list size when its last page is downloaded.
+        The size the downloaded page contradicts is forgotten together with
+        the pages derived from it. Must be called under the cache lock.
+        '''
+
+        list_name, params, sort_name, page_number = key
+        players_on_page = self.lists[list_name].players_on_page
+
+        total = self._totals.get((list_name, params))
+
+        if total is not None and len(players) != max(0, min(players_on_page, total - players_on_page * (page_number - 1))):
+            del self._totals[(list_name, params)]
+
+            for cached_key, page in self._cache.get_all().items():
+                if page.derived and cached_key[:2] == (list_name, params):
+                    page.stale = True
+
+        if 0 < len(players) < players_on_page:
+            self._totals[(list_name, params)] = players_on_page * (page_number - 1) + len(players)
+
+        # the list ends with the full page
+        elif not players and page_number > 1:
+            previous = self._cache.get_all().get((list_name, params, sort_name, page_number - 1))
+
+            if previous is not None and len(previous.players) == players_on_page:
+                self._totals[(list_name, params)] = players_on_page * (page_number - 1)
+
+    def _derive(self, key):
+        ''' [Private] Builds the page from the cached pages of the mirror sort order.
+        Must be called under the cache lock.
+
+        Returns
+        -------
+            List of the Player instances or None if the list size is not known
+            or some of the mirror pages are not cached.
+        '''
+
+        list_name, params, sort_name, page_number = key
+
+        mirror_sort = self.mirror_sorts.get(sort_name)
+        total = self._totals.get((list_name, params))
+
+        if mirror_sort is None or total is None:
+            return None
+
+        players_on_page = self.lists[list_name].players_on_page
+        cache = self._cache.get_all()
+
+        players = []
+
+        for rank in range(players_on_page * (page_number - 1) + 1, min(players_on_page * page_number, total) + 1):
+            mirror_rank = total - rank + 1
+            mirror_page = cache.get((list_name, params, mirror_sort, (mirror_rank - 1) // players_on_page + 1))
+
+            if mirror_page is None or mirror_page.stale or len(mirror_page.players) <= (mirror_rank - 1) % players_on_page:
+                return None
+
+            players.append(mirror_page.players[(mirror_rank - 1) % players_on_page])
+
+        return players
+
+    def parse(self, ranking_list, content):
+        ''' Parses the rows of the list page.
+
+        Parameters
+        ----------
+            ranking_list : RankingList
+                Definition of the list.
+
+            content : bytes
+                Page markup.
+
+        Returns
+        -------
+            List of the Player instances.
+        '''
+
+        # Only the rows are built into the tree, the rest of the page is skipped.
+        rows_only = SoupStrainer(ranking_list.row_tag, {'class': ranking_list.row_classes})
+
+        with tracer.span('html parse', 'parse'):
+            soup = BeautifulSoup(content, self._parser, parse_only=rows_only)
+
+        with tracer.span('parse rows', 'parse', list=ranking_list.name):
+            return [ranking_list.parse_row(row, self.base_url)
+                    for row in soup.findAll(ranking_list.row_tag, {'class': ranking_list.row_classes})]
+
+    def submit(self, list_name, page_number, sort_name='DESC', params=None):
+        ''' Schedules the page download into the shared thread pool.
+
+        Returns
+        -------
+            concurrent.futures.Future with the list of Player instances.
+        '''
+
+        return self._executor.submit(self.download, list_name, page_number, sort_name, params)
+
+    def crawl(self, jobs):
+        ''' Crawls several lists concurrently.
+
+        Parameters
+        ----------
+            jobs : iterable
+                (list_name, params, sort_name, page_numbers) tuples.
+
+        Returns
+        -------
+            Generator of (list_name, params, sort_name, page_number, players) tuples
+            in the order the pages are downloaded.
+        '''
+
+        futures = {}
+
+        for list_name, params, sort_name, page_numbers in jobs:
+            for page_number in page_numbers:
+                future = self.submit(list_name, page_number, sort_name, params)
+                futures[future] = (list_name, params, sort_name, page_number)
+
+        for future in as_completed(futures):
+            yield futures[future] + (future.result(),)
+
+    def drop_cache(self, list_name=None):
+        ''' Marks the cached pages of the list or of all the lists stale.
+        The pages are kept with their validators, so the next download
+        of the page is conditional.
+        '''
+
+        with self._cache_lock:
+            for key, page in self._cache.get_all().items():
+                if list_name is None or key[0] == list_name:
+                    page.stale = True
@@ -0,0 +1,286 @@
+import datetime
+import sqlite3
+import zlib
+
+
+class SnapshotStore:
+    ''' Stores the history of daily crawls keyed by player ID and date.
+
+    The market value series of every player is split into chunks of CHUNK_DAYS days.
+    Each chunk keeps its first point as is and the following points as
+    (days delta, value delta) varints compressed with zlib. Only the days when the
+    value changed are stored, so a stable value costs nothing. For the same reason
+    the days are recorded in date order: the days without a change are not stored,
+    so a point put before them could not tell which value they had.
+    '''
+
+    CHUNK_DAYS = 32
+
+    def __init__(self, path):
+        ''' Constructs new SnapshotStore instance.
+
+        Parameters
+        ----------
+            path : str
+                Path to the SQLite database file.
+        '''
+
+        self._db = sqlite3.connect(path)
+        self._db.executescript('''
+            CREATE TABLE IF NOT EXISTS days (
+                day INTEGER PRIMARY KEY,
+                players_count INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS players (
+                player_id INTEGER PRIMARY KEY,
+                name TEXT,
+                club TEXT,
+                last_rank INTEGER,
+                last_day INTEGER,
+                last_value INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS chunks (
+                player_id INTEGER,
+                bucket INTEGER,
+                first_day INTEGER,
+                first_value INTEGER,
+                deltas BLOB,
+                PRIMARY KEY (player_id, bucket)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS chunks_by_day ON chunks (first_day, player_id, bucket);
+        ''')
+
+    def close(self):
+        ''' Closes the underlying database. '''
+
+        self._db.close()
+
+    def record(self, date, ranked_players):
+        ''' Records one crawl.
+
+        Parameters
+        ----------
+            date : datetime.date
+                Day of the crawl.
+
+            ranked_players : iterable
+                (rank, Player) tuples. Players without ID are skipped.
+
+        Raises ValueError if the date is earlier than the last recorded day,
+        the last day itself can be recorded again.
+        '''
+
+        day = date.toordinal()
+        count = 0
+
+        last_day, = self._db.execute('SELECT MAX(day) FROM days').fetchone()
+        if last_day is not None and day < last_day:
+            raise ValueError('Cannot record {}, the snapshots are recorded up to {}'.format(
+                date, datetime.date.fromordinal(last_day)))
+
+        with self._db:
+            for rank, player in ranked_players:
+                if player.player_id is None:
+                    continue
+
+                count += 1
+                value = player.market_value()
+
+                row = self._db.execute('SELECT last_value FROM players WHERE player_id = ?', (player.player_id,)).fetchone()
+
+                # the player without the value keeps the last known one, the next change is compared with it
+                last_value = row[0] if value is None and row is not None else value
+
+                self._db.execute('INSERT OR REPLACE INTO players VALUES (?, ?, ?, ?, ?, ?)',
+                                 (player.player_id, player.name, player.club, rank, day, last_value))
+
+                if value is None or (row is not None and row[0] == value):
+                    continue
+
+                self._append_point(player.player_id, day, value)
+
+            self._db.execute('INSERT OR REPLACE INTO days VALUES (?, ?)', (day, count))
+
+    def days(self):
+        ''' Returns the list of recorded days. '''
+
+        return [datetime.date.fromordinal(day) for day, in self._db.execute('SELECT day FROM days ORDER BY day')]
+
+    def players(self):
+        ''' Returns (player_id, name, club, last_rank) tuples of all the recorded players. '''
+
+        return self._db.execute('SELECT player_id, name, club, last_rank FROM players').fetchall()
+
+    def value_history(self, player_id):
+        ''' Returns the market value history of the player.
+
+        Parameters
+        ----------
+            player_id : int
+                Transfermarkt ID of the player.
+
+        Returns
+        -------
+            List of (datetime.date, value) tuples, one per value change.
+        '''
+
+        history = []
+
+        for first_day, first_value, deltas in self._db.execute(
+                'SELECT first_day, first_value, deltas FROM chunks WHERE player_id = ? ORDER BY bucket', (player_id,)):
+            history.extend(self._decode(first_day, first_value, deltas))
+
+        return [(datetime.date.fromordinal(day), value) for day, value in history]
+
+    def values_at(self, date):
+        ''' Returns the market values of all the players as they were at the date.
+
+        Parameters
+        ----------
+            date : datetime.date
+                Day to query.
+
+        Returns
+        -------
+            dict player_id -> value
+        '''
+
+        day = date.toordinal()
+        values = {}
+
+        # For every player take the latest chunk that starts not later than the date.
+        rows = self._db.execute('''
+            SELECT c.player_id, c.first_day, c.first_value, c.deltas
+            FROM chunks c JOIN (
+                SELECT player_id, MAX(bucket) AS bucket FROM chunks WHERE first_day <= ? GROUP BY player_id
+            ) latest ON c.player_id = latest.player_id AND c.bucket = latest.bucket
+        ''', (day,))
+
+        for player_id, first_day, first_value, deltas in rows:
+            value = first_value
+            for point_day, point_value in self._decode(first_day, first_value, deltas):
+                if point_day > day:
+                    break
+                value = point_value
+
+            values[player_id] = value
+
+        return values
+
+    def biggest_movers(self, date_from, date_to, limit=10):
+        ''' Returns the players whose market value changed the most between two dates.
+
+        Parameters
+        ----------
+            date_from : datetime.date
+                First day.
+
+            date_to : datetime.date
+                Second day.
+
+            limit : int
+                Maximum number of players to return.
+
+        Returns
+        -------
+            List of (player_id, name, club, value_from, value_to) tuples
+            ordered by the absolute value change.
+        '''
+
+        values_from = self.values_at(date_from)
+        values_to = self.values_at(date_to)
+
+        changes = [(player_id, values_from[player_id], value_to) for player_id, value_to in values_to.items()
+                   if player_id in values_from and values_from[player_id] != value_to]
+        changes.sort(key=lambda change: abs(change[2] - change[1]), reverse=True)
+        changes = changes[:limit]
+
+        names = {}
+        for player_id, name, club in self._db.execute(
+                'SELECT player_id, name, club FROM players WHERE player_id IN ({})'.format(','.join('?' * len(changes))),
+                [player_id for player_id, _, _ in changes]):
+            names[player_id] = (name, club)
+
+        return [(player_id,) + names[player_id] + (value_from, value_to) for player_id, value_from, value_to in changes]
+
+    def _append_point(self, player_id, day, value):
+        ''' [Private] Appends one value change into the player chunk. '''
+
+        bucket = day // self.CHUNK_DAYS
+
+        row = self._db.execute('SELECT first_day, first_value, deltas FROM chunks WHERE player_id = ? AND bucket = ?',
+                               (player_id, bucket)).fetchone()
+
+        if row is None:
+            points = [(day, value)]
+        else:
+            points = [point for point in self._decode(*row) if point[0] != day]
+            points.append((day, value))
+
+        self._db.execute('INSERT OR REPLACE INTO chunks VALUES (?, ?, ?, ?, ?)',
+                         (player_id, bucket) + self._encode(points))
+
+    @staticmethod
+    def _encode(points):
+        ''' [Private] Encodes the points of the chunk.
+
+        Returns
+        -------
+            (first_day, first_value, compressed deltas) tuple.
+        '''
+
+        first_day, first_value = points[0]
+
+        buffer = bytearray()
+        prev_day, prev_value = first_day, first_value
+
+        for day, value in points[1:]:
+            _write_varint(buffer, day - prev_day)
+            delta = value - prev_value
+            _write_varint(buffer, (delta << 1) ^ (delta >> 63))
+            prev_day, prev_value = day, value
+
+        return first_day, first_value, zlib.compress(bytes(buffer), 9)
+
+    @staticmethod
+    def _decode(first_day, first_value, deltas):
+        ''' [Private] Decodes the points of the chunk. '''
+
+        points = [(first_day, first_value)]
+        buffer = zlib.decompress(deltas)
+
+        day, value, pos = first_day, first_value, 0
+
+        while pos < len(buffer):
+            day_delta, pos = _read_varint(buffer, pos)
+            zigzag, pos = _read_varint(buffer, pos)
+            day += day_delta
+            value += (zigzag >> 1) ^ -(zigzag & 1)
+            points.append((day, value))
+
+        return points
+
+
+def _write_varint(buffer, number):
+    ''' Appends the unsigned number to the buffer in LEB128 encoding. '''
+
+    while number >= 0x80:
+        buffer.append((number & 0x7f) | 0x80)
+        number >>= 7
+
+    buffer.append(number)
+
+
+def _read_varint(buffer, pos):
+    ''' Reads the LEB128 encoded number. Returns (number, next position). '''
+
+    number = shift = 0
+
+    while True:
+        byte = buffer[pos]
+        pos += 1
+        number |= (byte & 0x7f) << shift
+        shift += 7
+
+        if byte < 0x80:
+            return number, pos
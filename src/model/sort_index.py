@@ -0,0 +1,131 @@
+import bisect
+
+
+class SortIndex:
+    ''' Keeps the loaded players sorted by every column the view has sorted by.
+    Each column has the list of (key, player_number) pairs which is built once on
+    the first sort and then maintained incrementally as players are added or
+    removed, so re-sorting never compares players through the model.
+    '''
+
+    def __init__(self, key_functions):
+        ''' Constructs new SortIndex instance.
+
+        Parameters
+        ----------
+            key_functions : dict
+                column -> callable returning the sort key of the Player.
+        '''
+
+        self._key_functions = key_functions
+
+        # player_number -> Player
+        self._players = {}
+
+        # column -> sorted list of (key, player_number)
+        self._sorted = {}
+
+        # column -> {player_number: dense rank}, dropped on every change
+        self._ranks = {}
+
+    def __len__(self):
+        return len(self._players)
+
+    def is_sortable(self, column):
+        ''' Check if the column can be sorted by. '''
+
+        return column in self._key_functions
+
+    def get(self, player_number):
+        ''' Returns the player by its number or None. '''
+
+        return self._players.get(player_number)
+
+    def add(self, player_number, player):
+        ''' Adds the player or replaces the one with the same number. '''
+
+        if player_number in self._players:
+            self.remove(player_number)
+
+        self._players[player_number] = player
+
+        for column, sorted_keys in self._sorted.items():
+            bisect.insort(sorted_keys, (self._key_functions[column](player), player_number))
+
+        self._ranks.clear()
+
+    def remove(self, player_number):
+        ''' Removes the player if it exists. '''
+
+        player = self._players.pop(player_number, None)
+        if player is None:
+            return
+
+        for column, sorted_keys in self._sorted.items():
+            del sorted_keys[bisect.bisect_left(sorted_keys, (self._key_functions[column](player), player_number))]
+
+        self._ranks.clear()
+
+    def clear(self):
+        ''' Removes all the players. '''
+
+        self._players.clear()
+        self._sorted.clear()
+        self._ranks.clear()
+
+    def permutation(self, sort_columns):
+        ''' Returns the player numbers in the requested order.
+
+        Parameters
+        ----------
+            sort_columns : list
+                (column, descending) tuples, the primary sort column first.
+
+        Returns
+        -------
+            List of player numbers.
+        '''
+
+        if len(sort_columns) == 1:
+            column, descending = sort_columns[0]
+            sorted_keys = self._sorted_keys(column)
+
+            if descending:
+                return [player_number for _, player_number in reversed(sorted_keys)]
+
+            return [player_number for _, player_number in sorted_keys]
+
+        # Compare the precomputed integer ranks instead of the keys themselves.
+        ranks = [(self._column_ranks(column), -1 if descending else 1) for column, descending in sort_columns]
+
+        return sorted(self._players, key=lambda player_number: tuple(sign * rank[player_number] for rank, sign in ranks))
+
+    def _sorted_keys(self, column):
+        ''' [Private] Returns the sorted keys of the column, building them on the first use. '''
+
+        sorted_keys = self._sorted.get(column)
+
+        if sorted_keys is None:
+            key_function = self._key_functions[column]
+            sorted_keys = sorted((key_function(player), player_number) for player_number, player in self._players.items())
+            self._sorted[column] = sorted_keys
+
+        return sorted_keys
+
+    def _column_ranks(self, column):
+        ''' [Private] Returns the dense ranks of the players by the column. '''
+
+        ranks = self._ranks.get(column)
+
+        if ranks is None:
+            ranks = {}
+            rank, prev_key = -1, None
+
+            for key, player_number in self._sorted_keys(column):
+                if rank < 0 or key != prev_key:
+                    rank, prev_key = rank + 1, key
+                ranks[player_number] = rank
+
+            self._ranks[column] = ranks
+
+        return ranks
@@ -0,0 +1,158 @@
+import bisect
+import collections
+
+
+class SummaryStats:
+    ''' Aggregates over the loaded players updated incrementally.
+    Every player added or removed changes the aggregates in place,
+    so the whole dataset is never rescanned.
+    '''
+
+    def __init__(self, previous_values=None):
+        ''' Constructs new SummaryStats instance.
+
+        Parameters
+        ----------
+            previous_values : dict
+                player_id -> market value from the last snapshot,
+                used to find the top movers.
+        '''
+
+        self._previous_values = previous_values or {}
+
+        # player_number -> Player
+        self._players = {}
+
+        # club -> [players count, total value]
+        self._clubs = {}
+
+        self._nationalities = collections.Counter()
+        self._roles = collections.Counter()
+        self._ages = collections.Counter()
+
+        # sorted (value, player_number) of the players with known value
+        self._by_value = []
+
+        # sorted (-abs(value change), player_number) of the players found in the snapshot
+        self._by_change = []
+
+    def __len__(self):
+        return len(self._players)
+
+    def add(self, player_number, player):
+        ''' Adds the player or replaces the one with the same number. '''
+
+        if player_number in self._players:
+            self.remove(player_number)
+
+        self._players[player_number] = player
+
+        value = player.market_value()
+
+        club = self._clubs.setdefault(player.club, [0, 0])
+        club[0] += 1
+        club[1] += value or 0
+
+        self._nationalities[player.nationality] += 1
+        self._roles[player.role] += 1
+        self._ages[player.age] += 1
+
+        if value is not None:
+            bisect.insort(self._by_value, (value, player_number))
+
+        change = self._change(player, value)
+        if change is not None:
+            bisect.insort(self._by_change, (-abs(change), player_number))
+
+    def remove(self, player_number):
+        ''' Removes the player if it exists. '''
+
+        player = self._players.pop(player_number, None)
+        if player is None:
+            return
+
+        value = player.market_value()
+
+        club = self._clubs[player.club]
+        club[0] -= 1
+        club[1] -= value or 0
+        if club[0] == 0:
+            del self._clubs[player.club]
+
+        self._decrement(self._nationalities, player.nationality)
+        self._decrement(self._roles, player.role)
+        self._decrement(self._ages, player.age)
+
+        if value is not None:
+            del self._by_value[bisect.bisect_left(self._by_value, (value, player_number))]
+
+        change = self._change(player, value)
+        if change is not None:
+            del self._by_change[bisect.bisect_left(self._by_change, (-abs(change), player_number))]
+
+    def clear(self):
+        ''' Removes all the players. '''
+
+        self.__init__(self._previous_values)
+
+    def most_expensive(self):
+        ''' Returns the most expensive loaded Player or None. '''
+
+        return self._players[self._by_value[-1][1]] if self._by_value else None
+
+    def less_expensive(self):
+        ''' Returns the least expensive loaded Player or None. '''
+
+        return self._players[self._by_value[0][1]] if self._by_value else None
+
+    def clubs(self):
+        ''' Returns (club, players count, total value) tuples, the most valuable club first. '''
+
+        return sorted(((club, count, total) for club, (count, total) in self._clubs.items()),
+                      key=lambda club: club[2], reverse=True)
+
+    def nationalities(self):
+        ''' Returns (nationality, players count) tuples, the most common first. '''
+
+        return self._nationalities.most_common()
+
+    def roles(self):
+        ''' Returns (role, players count) tuples, the most common first. '''
+
+        return self._roles.most_common()
+
+    def ages(self):
+        ''' Returns (age, players count) tuples ordered by age. '''
+
+        return sorted(self._ages.items(), key=lambda age: (age[0] is None, age[0]))
+
+    def top_movers(self, limit=10):
+        ''' Returns (Player, previous value, current value) tuples
+        of the players whose value changed the most since the last snapshot.
+        '''
+
+        movers = []
+
+        for _, player_number in self._by_change[:limit]:
+            player = self._players[player_number]
+            movers.append((player, self._previous_values[player.player_id], player.market_value()))
+
+        return movers
+
+    def _change(self, player, value):
+        ''' [Private] Returns the value change since the snapshot or None. '''
+
+        previous = self._previous_values.get(player.player_id)
+
+        if previous is None or value is None or previous == value:
+            return None
+
+        return value - previous
+
+    @staticmethod
+    def _decrement(counter, key):
+        ''' [Private] Decrements the counter dropping the zero entries. '''
+
+        counter[key] -= 1
+        if counter[key] <= 0:
+            del counter[key]
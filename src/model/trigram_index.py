@@ -0,0 +1,127 @@
+import collections
+import threading
+import unicodedata
+
+
+class TrigramIndex:
+    ''' Incrementally maintained trigram index for the fuzzy player search.
+    Every word of the document is padded with spaces and split into trigrams,
+    so the query with a typo still shares most of the trigrams with the document.
+    '''
+
+    def __init__(self, min_score=0.5):
+        ''' Constructs new TrigramIndex instance.
+
+        Parameters
+        ----------
+            min_score : float
+                Minimal share of the query trigrams the document should contain.
+        '''
+
+        self._min_score = min_score
+        self._lock = threading.Lock()
+
+        # trigram -> set of keys
+        self._postings = collections.defaultdict(set)
+
+        # key -> (trigrams, text, payload)
+        self._documents = {}
+
+    def __len__(self):
+        return len(self._documents)
+
+    def add(self, key, text, payload):
+        ''' Adds the document into the index or replaces the existing one.
+
+        Parameters
+        ----------
+            key : hashable
+                Unique document key (player ID).
+
+            text : str
+                Text to index.
+
+            payload
+                Any value returned with the search results.
+        '''
+
+        trigrams = self._trigrams(text)
+
+        with self._lock:
+            self._remove(key)
+
+            for trigram in trigrams:
+                self._postings[trigram].add(key)
+
+            self._documents[key] = (trigrams, text, payload)
+
+    def remove(self, key):
+        ''' Removes the document from the index if it exists. '''
+
+        with self._lock:
+            self._remove(key)
+
+    def search(self, query, limit=10):
+        ''' Returns the documents matching the query best.
+
+        Parameters
+        ----------
+            query : str
+                Search string, can contain typos.
+
+            limit : int
+                Maximum number of results.
+
+        Returns
+        -------
+            List of (key, text, payload) tuples, the best match first.
+        '''
+
+        query_trigrams = self._trigrams(query)
+
+        if not query_trigrams:
+            return []
+
+        hits = collections.Counter()
+
+        with self._lock:
+            for trigram in query_trigrams:
+                hits.update(self._postings.get(trigram, ()))
+
+            min_hits = self._min_score * len(query_trigrams)
+
+            # More shared trigrams first, shorter documents first among equal ones.
+            candidates = [(-count, len(self._documents[key][0]), key) for key, count in hits.items() if count >= min_hits]
+            candidates.sort(key=lambda candidate: candidate[:2])
+
+            return [(key,) + self._documents[key][1:] for _, _, key in candidates[:limit]]
+
+    def _remove(self, key):
+        ''' [Private] Removes the document. Must be called under the lock. '''
+
+        document = self._documents.pop(key, None)
+        if document is None:
+            return
+
+        for trigram in document[0]:
+            keys = self._postings[trigram]
+            keys.discard(key)
+
+            if not keys:
+                del self._postings[trigram]
+
+    @staticmethod
+    def _trigrams(text):
+        ''' [Private] Splits the text into the set of trigrams. '''
+
+        # drop diacritics so 'Mbappe' finds 'Mbappé'
+        normalized = unicodedata.normalize('NFKD', text.casefold())
+        normalized = ''.join(c if c.isalnum() else ' ' for c in normalized if not unicodedata.combining(c))
+
+        trigrams = set()
+
+        for word in normalized.split():
+            padded = ' ' + word + ' '
+            trigrams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+
+        return trigrams
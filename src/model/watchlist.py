@@ -0,0 +1,388 @@
+import dataclasses
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import pyqtSignal, QThread, QMutex, QMutexLocker, QWaitCondition
+
+from model.player_profile_page import PlayerProfilePage
+from model.players_page import PlayersPage
+
+
+@dataclasses.dataclass
+class WatchedPlayer:
+    ''' Last known state of the watched player. '''
+
+    player_id: int
+    name: str
+    club: str = None
+    value: int = None
+
+    # page of the DESC ranking the player was seen on, None if the player is out of the ranking
+    page_number: int = None
+    profile_url: str = None
+
+    # validators of the last profile download
+    etag: str = None
+    last_modified: str = None
+
+
+class Watchlist(QThread):
+    ''' Polls the watched players by their transfermarkt ID in the background.
+
+    The players are looked up on the DESC ranking pages. Every page is
+    requested once per poll however many watched players it holds, so the
+    number of the requests grows with the number of the distinct pages, not
+    the players. A player missing from its page is searched on the neighbouring
+    pages, the ranking moves as the values change. The players without the
+    page are searched by their value, bisecting between the polled
+    pages, so the players added without the page and the ones back in the
+    ranking return to the page polling. Only the players not found on any
+    page are polled by their profile pages. All the pages are requested
+    conditionally, an unchanged page costs a 304 response.
+
+    Value and club changes are emitted by the 'player_changed_signal'
+    and appended to the log file.
+    '''
+
+    # player_id, name, changed field ('value' or 'club'), old value, new value
+    player_changed_signal = pyqtSignal(int, str, str, str, str, name='watched_player_changed')
+
+    # number of the ranking pages and the profile pages requested by the poll
+    polled_signal = pyqtSignal(int, int, name='watchlist_polled')
+
+    def __init__(self, app_config):
+        ''' Constructs Watchlist instance and loads the watched players.
+
+        Parameters
+        ----------
+            app_config : AppConfig
+                Instance of application configuration file.
+        '''
+
+        super(self.__class__, self).__init__()
+
+        config = app_config.watchlist
+
+        self._poll_interval = config['pollSeconds'] * 1000
+        self._max_workers = config['maxWorkers']
+        self._log_path = config['logPath']
+
+        self._players_page = PlayersPage(app_config)
+        self._profile_page = PlayerProfilePage(app_config)
+
+        # guards the watched players and the database
+        self._lock = QMutex()
+        self._wake_up = QWaitCondition()
+
+        self._db = sqlite3.connect(config['path'], check_same_thread=False)
+        self._db.execute('''
+            CREATE TABLE IF NOT EXISTS watched (
+                player_id INTEGER PRIMARY KEY,
+                name TEXT,
+                club TEXT,
+                value INTEGER,
+                page_number INTEGER,
+                profile_url TEXT,
+                etag TEXT,
+                last_modified TEXT
+            )
+        ''')
+        self._db.commit()
+
+        # player_id -> WatchedPlayer
+        self._watched = {row[0]: WatchedPlayer(*row) for row in self._db.execute('SELECT * FROM watched')}
+
+        self._poll_requested = False
+        self.stopped = False
+
+    def add(self, player, page_number=None):
+        ''' Starts watching the player, its current state is the baseline of the changes.
+
+        Parameters
+        ----------
+            player : Player
+                The player with the known ID.
+
+            page_number : int
+                Page of the DESC ranking the player is on, if known.
+        '''
+
+        watched = WatchedPlayer(player.player_id, player.name, player.club, player.market_value(),
+                                page_number, player.profile_url)
+
+        with QMutexLocker(self._lock):
+            self._watched[player.player_id] = watched
+            self._save([watched])
+
+    def remove(self, player_id):
+        ''' Stops watching the player. '''
+
+        with QMutexLocker(self._lock):
+            self._watched.pop(player_id, None)
+            self._db.execute('DELETE FROM watched WHERE player_id = ?', (player_id,))
+            self._db.commit()
+
+    def is_watched(self, player_id):
+        with QMutexLocker(self._lock):
+            return player_id in self._watched
+
+    def players(self):
+        ''' Returns the copies of the WatchedPlayer instances ordered by name. '''
+
+        with QMutexLocker(self._lock):
+            return sorted((dataclasses.replace(watched) for watched in self._watched.values()),
+                          key=lambda watched: watched.name)
+
+    def poll_now(self):
+        ''' Wakes the thread up to poll without waiting for the interval. '''
+
+        with QMutexLocker(self._lock):
+            self._poll_requested = True
+            self._wake_up.wakeOne()
+
+    def stop(self):
+        ''' Stops the thread and closes the database. '''
+
+        with QMutexLocker(self._lock):
+            self.stopped = True
+            self._wake_up.wakeOne()
+
+        self.wait()
+        self._db.close()
+
+    def run(self):
+        ''' This code runs in the separate thread. '''
+
+        self._lock.lock()
+
+        while not self.stopped:
+            if not self._poll_requested:
+                self._wake_up.wait(self._lock, self._poll_interval)
+
+            if self.stopped:
+                break
+
+            self._poll_requested = False
+            self._lock.unlock()
+
+            try:
+                self.poll()
+            except Exception as e:
+                print('Watchlist poll failed: {}'.format(e))
+
+            self._lock.lock()
+
+        self._lock.unlock()
+
+    def poll(self):
+        ''' Polls all the watched players in the caller thread.
+        Emits the changes and stores the new state.
+        '''
+
+        with QMutexLocker(self._lock):
+            watched = {player_id: dataclasses.replace(player) for player_id, player in self._watched.items()}
+
+        if not watched:
+            return
+
+        # player_id -> (page number, Player) of the players found on the ranking pages
+        found = {}
+
+        # page number -> (highest, lowest) market value of the polled pages, None past the ranking end
+        value_ranges = {}
+
+        page_numbers = {player.page_number for player in watched.values() if player.page_number is not None}
+        polled_pages = self._poll_pages(page_numbers, watched, found, value_ranges)
+
+        lost = [player for player in watched.values()
+                if player.page_number in polled_pages and player.player_id not in found]
+
+        neighbour_pages = {player.page_number + step for player in lost for step in (-1, 1)}
+        neighbour_pages.difference_update(page_numbers)
+        neighbour_pages.discard(0)
+
+        self._poll_pages(neighbour_pages, watched, found, value_ranges)
+
+        # the players still not found are searched by their value between the polled pages
+        lost_ids = {player.player_id for player in lost}
+        searched_pages = page_numbers | neighbour_pages
+
+        while True:
+            value_pages = {self._page_of_value(player.value, value_ranges) for player in watched.values()
+                           if player.player_id not in found and player.value is not None
+                           and (player.page_number is None or player.player_id in lost_ids)}
+            value_pages.difference_update(searched_pages, {None})
+
+            if not value_pages:
+                break
+
+            searched_pages.update(value_pages)
+            self._poll_pages(value_pages, watched, found, value_ranges)
+
+        ranking_pages = len(searched_pages)
+
+        changes = []
+
+        for player_id, (page_number, player) in found.items():
+            watched[player_id].page_number = page_number
+            watched[player_id].name = player.name
+            changes.extend(self._changes(watched[player_id], player.club, player.market_value()))
+
+        # the players out of the ranking are polled by their profiles
+        for player in lost:
+            if player.player_id not in found:
+                player.page_number = None
+
+        profile_players = [player for player in watched.values()
+                           if player.page_number is None and player.profile_url and player.player_id not in found]
+
+        for player, profile in self._poll_profiles(profile_players):
+            if profile is not None and profile.market_value_history:
+                changes.extend(self._changes(player, player.club, profile.market_value_history[-1][1]))
+
+        with QMutexLocker(self._lock):
+            still_watched = [player for player_id, player in watched.items() if player_id in self._watched]
+
+            for player in still_watched:
+                self._watched[player.player_id] = player
+
+            self._save(still_watched)
+
+        if changes:
+            self._log(changes)
+
+        for player, field_name, old_value, new_value in changes:
+            self.player_changed_signal.emit(player.player_id, player.name, field_name, str(old_value), str(new_value))
+
+        print('Watchlist polled {} ranking pages and {} profiles for {} players, {} changes'.format(
+            ranking_pages, len(profile_players), len(watched), len(changes)))
+
+        self.polled_signal.emit(ranking_pages, len(profile_players))
+
+    def _poll_pages(self, page_numbers, watched, found, value_ranges):
+        ''' [Private] Downloads the ranking pages concurrently, collects the watched players
+        on them and the range of the market values of every page.
+
+        Returns
+        -------
+            Set of the page numbers downloaded successfully.
+        '''
+
+        polled_pages = set()
+
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            futures = {page_number: executor.submit(self._players_page.revalidate, page_number)
+                       for page_number in sorted(page_numbers)}
+
+        for page_number, future in futures.items():
+            try:
+                players = future.result()
+            except Exception as e:
+                print('Watchlist page {} download failed: {}'.format(page_number, e))
+                continue
+
+            # the error pages have no rows, the players on them are not lost
+            if not players:
+                value_ranges[page_number] = None
+                continue
+
+            polled_pages.add(page_number)
+
+            for player in players:
+                if player.player_id in watched:
+                    found[player.player_id] = (page_number, player)
+
+            values = [player.market_value() for player in players if player.market_value() is not None]
+            if values:
+                value_ranges[page_number] = (max(values), min(values))
+
+        return polled_pages
+
+    @staticmethod
+    def _page_of_value(value, value_ranges):
+        ''' [Private] Returns the next DESC ranking page to search for the value. The page
+        between the polled pages around the value is halved, past the last polled page the
+        page number is doubled until the empty page is met. None if no page is left to
+        search between them, the value is on a page already polled or no page has values.
+        '''
+
+        # the last polled page with the values above the searched one
+        upper = 0
+
+        for page_number in sorted(value_ranges):
+            value_range = value_ranges[page_number]
+
+            if value_range is None or value > value_range[0]:
+                return (upper + page_number) // 2 if page_number - upper > 1 else None
+
+            if value >= value_range[1]:
+                return page_number
+
+            upper = page_number
+
+        return upper * 2 if upper else None
+
+    def _poll_profiles(self, players):
+        ''' [Private] Downloads the profile pages of the players concurrently.
+
+        Returns
+        -------
+            List of (WatchedPlayer, PlayerProfile) tuples, the profile is None
+            if the page did not change or failed to download.
+        '''
+
+        def revalidate(player):
+            try:
+                profile, player.etag, player.last_modified = self._profile_page.revalidate(
+                    player.player_id, player.profile_url, player.etag, player.last_modified)
+            except Exception as e:
+                print('Watchlist profile {} download failed: {}'.format(player.player_id, e))
+                profile = None
+
+            return player, profile
+
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            return list(executor.map(revalidate, players))
+
+    @staticmethod
+    def _changes(player, club, value):
+        ''' [Private] Updates the player state.
+
+        Returns
+        -------
+            List of (WatchedPlayer, field name, old value, new value) tuples.
+        '''
+
+        changes = []
+
+        if value is not None and player.value is not None and value != player.value:
+            changes.append((player, 'value', player.value, value))
+
+        if club and player.club and club != player.club:
+            changes.append((player, 'club', player.club, club))
+
+        if value is not None:
+            player.value = value
+
+        if club:
+            player.club = club
+
+        return changes
+
+    def _save(self, players):
+        ''' [Private] Stores the players. Must be called under the lock. '''
+
+        self._db.executemany('INSERT OR REPLACE INTO watched VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                             [dataclasses.astuple(player) for player in players])
+        self._db.commit()
+
+    def _log(self, changes):
+        ''' [Private] Appends the changes to the log file, one tab separated line per change. '''
+
+        timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
+
+        with open(self._log_path, 'a', encoding='utf-8') as log_file:
+            for player, field_name, old_value, new_value in changes:
+                log_file.write('{}\t{}\t{}\t{}\t{}\t{}\n'.format(timestamp, player.player_id, player.name,
+                                                             field_name, old_value, new_value))
@@ -2,6 +2,7 @@ import os
 
 from PyQt5.QtWidgets import QDialog, QFileDialog
 
+from misc.exporters import available_formats
 from ui.export_dialog_ui import Ui_Dialog
 
 
@@ -25,8 +26,10 @@ class ExportDialogWindow(QDialog, Ui_Dialog):
 
         self.setupUi(self)
 
+        # formats whose optional dependencies are not installed are hidden
         for f in config['formats']:
-            self.formatCombo.addItem(f)
+            if f in available_formats():
+                self.formatCombo.addItem(f)
 
         self.formatCombo.currentIndexChanged.connect(self._on_format_changed)
 
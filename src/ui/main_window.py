@@ -1,18 +1,19 @@
-from PyQt5.QtWidgets import QHeaderView, QMainWindow, QErrorMessage, QMessageBox
-from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QHeaderView, QMainWindow, QErrorMessage, QMessageBox, QListWidgetItem, QDockWidget
+from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QIntValidator
 
 from pyqtspinner.spinner import WaitingSpinner
 
 from ui.main_window_ui import Ui_MainWindow
 from ui.export_dialog import ExportDialogWindow
+from ui.summary_panel import SummaryPanel
 
-from model.players_page import PlayersPage
 from model.players_manager import PlayersManager
 from model.players_table_model import PlayersTableModel
 
-from misc.csv_exporter import CsvExporter
-from misc.xlsx_exporter import XlsxExporter
+from misc.export_thread import ExportThread
+from misc.memory_monitor import memory_monitor
+from misc.exporters import get_exporter
 
 
 class MainWindow(QMainWindow, Ui_MainWindow):
@@ -47,18 +48,90 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.players_table_model = PlayersTableModel(app_config, self.players_manager, parent=self)
         self.playersTable.setModel(self.players_table_model)
 
+        # Header clicks sort the loaded data on the client side, start in the ranking order.
+        self.playersTable.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.playersTable.setSortingEnabled(True)
+        self.playersTable.horizontalHeader().sortIndicatorChanged.connect(self.sort_indicator_changed)
+
         # Connect signal handlers
         self.exitButton.clicked.connect(self.close)
         self.refreshButton.clicked.connect(self.refresh)
+
+        # combo box items follow the PlayersPage.SortType values
+        self.sortOrder.setCurrentIndex(self.players_manager.sort_method())
+        self.sortOrder.currentIndexChanged.connect(self.change_sort_order)
         self.exportButton.clicked.connect(self.export_table_data)
 
         self.aboutAction.triggered.connect(self.show_about_dialog)
 
+        self.watchAction.triggered.connect(self.watch_selected_player)
+        self.unwatchAction.triggered.connect(self.unwatch_selected_player)
+        self.pollWatchlistAction.triggered.connect(self.players_manager.poll_watchlist)
+
         self.gotoRowOk.clicked.connect(self.scroll_to_row)
 
+        self.searchEdit.textChanged.connect(self.search_players)
+
+        self.playersTable.verticalScrollBar().valueChanged.connect(self.viewport_changed)
+        self.searchResults.itemActivated.connect(self.goto_search_result)
+
         self.gotoRow.setValidator(QIntValidator(1, self.app_config.players_table_model['maxRowCount']))
 
-        self.set_most_less_expensive_players()
+        # Summary panel is updated from the aggregates kept by the players manager.
+        self.summary_panel = SummaryPanel(self)
+        self.summaryDock = QDockWidget(self.summary_panel.windowTitle(), self)
+        self.summaryDock.setWidget(self.summary_panel)
+        self.addDockWidget(Qt.BottomDockWidgetArea, self.summaryDock)
+
+        self.players_manager.download_finished_signal.connect(self.update_summary)
+        self.players_manager.page_evicted_signal.connect(self.update_summary)
+        self.players_manager.page_failed_signal.connect(self.show_download_error)
+        self.players_manager.watched_player_changed_signal.connect(self.show_watched_change)
+        self.players_manager.watchlist_polled_signal.connect(self.update_watchlist)
+
+        self.update_summary()
+        self.summary_panel.update_watchlist(self.players_manager.watched_players())
+
+        # the running export, the table is inactive meanwhile
+        self.export_thread = None
+
+        # Memory of the subsystems is sampled only while the monitor is enabled.
+        if memory_monitor.enabled:
+            self.memory_timer = QTimer(self)
+            self.memory_timer.timeout.connect(self.update_memory)
+            self.memory_timer.start(self.app_config.memory_monitor['intervalSeconds'] * 1000)
+
+            self.summary_panel.update_memory(memory_monitor.last_report())
+
+    def closeEvent(self, event):
+        ''' Saves the loaded table and the accessed pages for the next launch before closing. '''
+
+        if self.export_thread is not None:
+            self.export_thread.wait()
+
+        try:
+            self.players_table_model.save_snapshot()
+        except OSError as e:
+            print('Failed to save the snapshot: {}'.format(e))
+
+        self.players_manager.close()
+
+        super(self.__class__, self).closeEvent(event)
+
+    def sort_indicator_changed(self, column, order):
+        ''' Puts the header sort indicator back to the applied sort when
+        the column which can not be sorted by is clicked.
+        '''
+
+        if column < 0 or self.players_table_model.is_sortable(column):
+            return
+
+        header = self.playersTable.horizontalHeader()
+
+        # the view must not sort by the restored indicator once again
+        header.blockSignals(True)
+        header.setSortIndicator(*self.players_table_model.sort_indicator())
+        header.blockSignals(False)
 
     def set_table_inactive(self):
         ''' Set the table view state to inactive. '''
@@ -70,49 +143,176 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
         self.spinner.stop()
 
+    def show_download_error(self, player_num_start, player_num_end, message, stale):
+        ''' Callback called when the page failed to download, the error is shown in the status bar. '''
+
+        if stale:
+            text = 'Игроки {}-{}: ошибка загрузки ({}), показаны сохранённые данные'
+        else:
+            text = 'Игроки {}-{}: ошибка загрузки ({}), повтор позже'
+
+        self.statusbar.showMessage(text.format(player_num_start, player_num_end, message))
+
+    def watch_selected_player(self):
+        ''' Callback called on 'watch' menu action. Adds the selected player to the watchlist. '''
+
+        self._change_watchlist(self.players_manager.watch, 'Игрок добавлен в список наблюдения')
+
+    def unwatch_selected_player(self):
+        ''' Callback called on 'unwatch' menu action. Removes the selected player from the watchlist. '''
+
+        self._change_watchlist(self.players_manager.unwatch, 'Игрок удалён из списка наблюдения')
+
+    def update_watchlist(self, pages, profiles):
+        ''' Callback called when the watchlist is polled. '''
+
+        self.summary_panel.update_watch_status(pages, profiles)
+        self.summary_panel.update_watchlist(self.players_manager.watched_players())
+
+    def show_watched_change(self, player_id, name, field_name, old_value, new_value):
+        ''' Callback called when the watched player value or club changed. '''
+
+        field_titles = {'value': 'стоимость', 'club': 'клуб'}
+
+        self.statusbar.showMessage('{}: {} {} -> {}'.format(name, field_titles.get(field_name, field_name), old_value, new_value))
+
     def refresh(self):
         ''' Callback called on 'refresh' button clicked.
-        Drops the model internal cache and scroll to the top of the table.
+        Revalidates the loaded pages, the table stays as is until the changed ones arrive.
         '''
 
-        self.players_table_model.drop_data()
+        self.players_table_model.refresh_data()
+
+        self.update_summary()
+
+    def change_sort_order(self, sort_type):
+        ''' Callback called when the ranking order is changed.
+        Pages already downloaded in the reversed order are reused.
+        '''
+
+        self.players_table_model.set_sort_method(sort_type)
+        self.playersTable.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
         self.playersTable.scrollToTop()
+        self.update_summary()
 
     def export_table_data(self):
         ''' Callback called on 'export' button clicked.
         Draw export dialog window, read params and dump the data on disk
-        using the particular exporter.
+        using the particular exporter in the background thread.
         '''
 
         self.set_table_inactive()
 
         export_format, output_filename = ExportDialogWindow(self.app_config).get_export_params()
 
-        exporter = None
-
-        if export_format == 'csv':
-            exporter = CsvExporter()
+        exporter = get_exporter(export_format)
 
-        elif export_format == 'xlsx':
-            exporter = XlsxExporter()
-
-        else:
+        if exporter is None:
             self.set_table_active()
-            QErrorMessage(self).showMessage('Неизвестный формат экспорта {}'.format(export_format))
+
+            error_message = QErrorMessage(self)
+            error_message.setAttribute(Qt.WA_DeleteOnClose)
+            error_message.showMessage('Неизвестный формат экспорта {}'.format(export_format))
 
             return
 
-        exporter.export(self.players_manager, output_filename)
+        self.export_thread = ExportThread(exporter, self.players_manager, output_filename)
+        self.export_thread.exported_signal.connect(self.export_finished)
+        self.export_thread.export_failed_signal.connect(self.export_failed)
+        self.export_thread.start()
+
+    def export_finished(self, output_filename):
+        ''' Callback called when the export thread wrote the file. '''
+
+        # the signal is emitted right before the thread finishes
+        self.export_thread.wait()
+        self.export_thread = None
+        self.set_table_active()
 
         self.show_msg('Данные экспортированы в файл {}'.format(output_filename))
 
+    def export_failed(self, output_filename, message):
+        ''' Callback called when the export thread failed. '''
+
+        # the signal is emitted right before the thread finishes
+        self.export_thread.wait()
+        self.export_thread = None
         self.set_table_active()
 
+        self.show_msg('Не удалось экспортировать данные в файл {}: {}'.format(output_filename, message))
+
     def scroll_to_row(self):
         ''' Callback called to scroll the table view to a particular row. '''
 
         row = int(self.gotoRow.text())
 
+        self._scroll_to(row)
+
+    def viewport_changed(self):
+        ''' Callback called when the table view is scrolled.
+        Tells the players manager which players are visible now.
+        '''
+
+        # rows of the sorted view are not tied to the ranking pages
+        if self.players_table_model.sorted_rows is not None:
+            return
+
+        first_row = self.playersTable.rowAt(0)
+        last_row = self.playersTable.rowAt(self.playersTable.viewport().height() - 1)
+
+        if first_row < 0:
+            return
+
+        if last_row < 0:
+            last_row = self.players_table_model.rowCount() - 1
+
+        self.players_manager.set_viewport(first_row + 1, last_row + 1)
+
+    def search_players(self, text):
+        ''' Callback called when the search string is edited.
+        Fills the search results list with the best matching players.
+        '''
+
+        self.searchResults.clear()
+
+        for result_text, player_number in self.players_manager.search(text):
+            item = QListWidgetItem('{}. {}'.format(player_number, result_text))
+            item.setData(Qt.UserRole, player_number)
+            self.searchResults.addItem(item)
+
+    def goto_search_result(self, item):
+        ''' Callback called when the search result is chosen.
+        Scrolls the table view to the player row, downloading its page if needed.
+        '''
+
+        player_number = item.data(Qt.UserRole)
+
+        self.players_manager.get(player_number)
+
+        row = self.players_table_model.row_of_player(player_number)
+
+        if row is not None:
+            self._scroll_to(row)
+
+    def _change_watchlist(self, change, done_text):
+        ''' [Private] Applies the watchlist change to the player of the selected row. '''
+
+        index = self.playersTable.currentIndex()
+
+        if not index.isValid():
+            self.statusbar.showMessage('Выберите игрока в таблице')
+            return
+
+        if not change(self.players_table_model.player_of_row(index.row())):
+            self.statusbar.showMessage('Игрок ещё не загружен')
+            return
+
+        self.statusbar.showMessage(done_text)
+        self.summary_panel.update_watchlist(self.players_manager.watched_players())
+
+    def _scroll_to(self, row):
+        ''' [Private] Scrolls the table view to the row. '''
+
         self.players_table_model.goto_row(row)
 
         # FIXME: only after the second scroll it actually happens
@@ -135,22 +335,31 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
         self.show_msg(msg)
 
-    def set_most_less_expensive_players(self):
-        ''' Sets the labels with most expensive and less expensive players.
-        Calls download in main thread.
+    def update_summary(self):
+        ''' Updates the summary panel and the labels with the most and the least
+        expensive players from the data already loaded.
         '''
 
-        players_page = PlayersPage(self.app_config)
+        summary = self.players_manager.get_summary()
+
+        self.summary_panel.update_summary(summary)
+
+        most_expensive = summary['most_expensive']
+        less_expensive = summary['less_expensive']
+
+        self.mostExpensivePlayer.setText('{} ({})'.format(most_expensive.name, most_expensive.price) if most_expensive else '-')
+        self.lessExpensivePlayer.setText('{} ({})'.format(less_expensive.name, less_expensive.price) if less_expensive else '-')
 
-        most_expensive = players_page.download(1, PlayersPage.SortType.DESC)[0]
-        less_expensive = players_page.download(1, PlayersPage.SortType.ASC)[0]
+    def update_memory(self):
+        ''' Callback called by the memory timer. Samples the memory and shows it in the summary panel. '''
 
-        self.mostExpensivePlayer.setText('{} ({})'.format(most_expensive.name, most_expensive.price))
-        self.lessExpensivePlayer.setText('{} ({})'.format(less_expensive.name, less_expensive.price))
+        self.summary_panel.update_memory(memory_monitor.sample())
 
     def show_msg(self, text):
         ''' Helper method to show Qt message box. '''
 
+        # the box is owned by the window, it would live as long as the window otherwise
         msg = QMessageBox(self)
+        msg.setAttribute(Qt.WA_DeleteOnClose)
         msg.setText(text)
         msg.exec()
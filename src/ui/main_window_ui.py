@@ -30,6 +30,12 @@ class Ui_MainWindow(object):
         self.refreshButton.setFlat(False)
         self.refreshButton.setObjectName("refreshButton")
         self.verticalLayout.addWidget(self.refreshButton)
+        self.sortOrder = QtWidgets.QComboBox(self.centralwidget)
+        self.sortOrder.setObjectName("sortOrder")
+        self.sortOrder.addItem("")
+        self.sortOrder.addItem("")
+        self.sortOrder.addItem("")
+        self.verticalLayout.addWidget(self.sortOrder)
         self.exportButton = QtWidgets.QPushButton(self.centralwidget)
         self.exportButton.setObjectName("exportButton")
         self.verticalLayout.addWidget(self.exportButton)
@@ -39,6 +45,12 @@ class Ui_MainWindow(object):
         self.gotoRowOk = QtWidgets.QPushButton(self.centralwidget)
         self.gotoRowOk.setObjectName("gotoRowOk")
         self.verticalLayout.addWidget(self.gotoRowOk)
+        self.searchEdit = QtWidgets.QLineEdit(self.centralwidget)
+        self.searchEdit.setObjectName("searchEdit")
+        self.verticalLayout.addWidget(self.searchEdit)
+        self.searchResults = QtWidgets.QListWidget(self.centralwidget)
+        self.searchResults.setObjectName("searchResults")
+        self.verticalLayout.addWidget(self.searchResults)
         self.label = QtWidgets.QLabel(self.centralwidget)
         self.label.setWordWrap(False)
         self.label.setObjectName("label")
@@ -65,6 +77,8 @@ class Ui_MainWindow(object):
         self.menubar.setGeometry(QtCore.QRect(0, 0, 738, 22))
         self.menubar.setNativeMenuBar(False)
         self.menubar.setObjectName("menubar")
+        self.watchMenu = QtWidgets.QMenu(self.menubar)
+        self.watchMenu.setObjectName("watchMenu")
         self.menu = QtWidgets.QMenu(self.menubar)
         self.menu.setObjectName("menu")
         MainWindow.setMenuBar(self.menubar)
@@ -75,7 +89,17 @@ class Ui_MainWindow(object):
         self.actionFile.setObjectName("actionFile")
         self.aboutAction = QtWidgets.QAction(MainWindow)
         self.aboutAction.setObjectName("aboutAction")
+        self.watchAction = QtWidgets.QAction(MainWindow)
+        self.watchAction.setObjectName("watchAction")
+        self.unwatchAction = QtWidgets.QAction(MainWindow)
+        self.unwatchAction.setObjectName("unwatchAction")
+        self.pollWatchlistAction = QtWidgets.QAction(MainWindow)
+        self.pollWatchlistAction.setObjectName("pollWatchlistAction")
+        self.watchMenu.addAction(self.watchAction)
+        self.watchMenu.addAction(self.unwatchAction)
+        self.watchMenu.addAction(self.pollWatchlistAction)
         self.menu.addAction(self.aboutAction)
+        self.menubar.addAction(self.watchMenu.menuAction())
         self.menubar.addAction(self.menu.menuAction())
 
         self.retranslateUi(MainWindow)
@@ -85,14 +109,22 @@ class Ui_MainWindow(object):
         _translate = QtCore.QCoreApplication.translate
         MainWindow.setWindowTitle(_translate("MainWindow", "MainWindow"))
         self.refreshButton.setText(_translate("MainWindow", "Обновить"))
+        self.sortOrder.setItemText(0, _translate("MainWindow", "Без сортировки"))
+        self.sortOrder.setItemText(1, _translate("MainWindow", "Сначала дешевые"))
+        self.sortOrder.setItemText(2, _translate("MainWindow", "Сначала дорогие"))
         self.exportButton.setText(_translate("MainWindow", "Экспорт"))
         self.gotoRow.setPlaceholderText(_translate("MainWindow", "Перейти к номеру..."))
         self.gotoRowOk.setText(_translate("MainWindow", "Ok"))
+        self.searchEdit.setPlaceholderText(_translate("MainWindow", "Поиск игрока..."))
         self.label.setText(_translate("MainWindow", "Самый дорогой"))
         self.mostExpensivePlayer.setText(_translate("MainWindow", "TextLabel"))
         self.label_2.setText(_translate("MainWindow", "Самый дешевый"))
         self.lessExpensivePlayer.setText(_translate("MainWindow", "TextLabel"))
         self.exitButton.setText(_translate("MainWindow", "Выход"))
+        self.watchMenu.setTitle(_translate("MainWindow", "Наблюдение"))
         self.menu.setTitle(_translate("MainWindow", "О программе"))
         self.actionFile.setText(_translate("MainWindow", "File"))
         self.aboutAction.setText(_translate("MainWindow", "About"))
+        self.watchAction.setText(_translate("MainWindow", "Следить за игроком"))
+        self.unwatchAction.setText(_translate("MainWindow", "Не следить за игроком"))
+        self.pollWatchlistAction.setText(_translate("MainWindow", "Проверить сейчас"))
@@ -0,0 +1,88 @@
+from PyQt5.QtWidgets import QWidget, QTableWidgetItem, QHeaderView
+
+from misc.memory_monitor import memory_monitor
+from ui.summary_panel_ui import Ui_SummaryPanel
+
+
+class SummaryPanel(QWidget, Ui_SummaryPanel):
+    ''' Panel with the aggregates over the loaded players. '''
+
+    def __init__(self, parent=None):
+        ''' Constructs new SummaryPanel instance. '''
+
+        super(self.__class__, self).__init__(parent)
+
+        self.setupUi(self)
+
+        self._setup_table(self.clubsTable, ['клуб', 'игроков', 'общая стоимость'])
+        self._setup_table(self.nationalitiesTable, ['национальность', 'игроков'])
+        self._setup_table(self.rolesTable, ['роль', 'игроков'])
+        self._setup_table(self.agesTable, ['возраст', 'игроков'])
+        self._setup_table(self.moversTable, ['имя', 'клуб', 'было', 'стало', 'изменение'])
+        self._setup_table(self.watchTable, ['имя', 'клуб', 'стоимость', 'страница'])
+        self._setup_table(self.memoryTable, ['подсистема', 'МБ', 'изменение', 'с запуска'])
+        self._setup_table(self.objectsTable, ['тип', 'объектов', 'изменение'])
+
+        self.watchStatus.setText('Список наблюдения проверяется в фоне')
+
+        # the memory is sampled only by the --memory option
+        if not memory_monitor.enabled:
+            self.tabWidget.removeTab(self.tabWidget.indexOf(self.memoryTab))
+
+    def update_summary(self, summary):
+        ''' Fills the panel from the PlayersManager.get_summary() result. '''
+
+        self.playersCount.setText('Загружено игроков: {}'.format(summary['players']))
+
+        self._fill_table(self.clubsTable, summary['clubs'])
+        self._fill_table(self.nationalitiesTable, summary['nationalities'])
+        self._fill_table(self.rolesTable, summary['roles'])
+        self._fill_table(self.agesTable, summary['ages'])
+        self._fill_table(self.moversTable, [(player.name, player.club, previous, current, '{:+}'.format(current - previous))
+                                            for player, previous, current in summary['top_movers']])
+
+    def update_watchlist(self, watched_players):
+        ''' Fills the watchlist tab from the PlayersManager.watched_players() result. '''
+
+        self._fill_table(self.watchTable, [(player.name, player.club or '-',
+                                            '{:,}'.format(player.value) if player.value is not None else '-',
+                                            player.page_number or 'профиль')
+                                           for player in watched_players])
+
+    def update_watch_status(self, pages, profiles):
+        ''' Shows the number of the pages requested by the last watchlist poll. '''
+
+        self.watchStatus.setText('Последняя проверка: страниц рейтинга {}, профилей {}'.format(pages, profiles))
+
+    def update_memory(self, report):
+        ''' Fills the memory tab from the MemoryMonitor report. '''
+
+        if report is None:
+            return
+
+        self.memoryTraced.setText('Отслежено {:.1f} МБ, пик {:.1f} МБ'.format(report['traced'] / 2 ** 20, report['peak'] / 2 ** 20))
+
+        self._fill_table(self.memoryTable, [(subsystem, '{:.2f}'.format(size / 2 ** 20), '{:+.2f}'.format(change / 2 ** 20),
+                                             '{:+.2f}'.format(growth / 2 ** 20))
+                                            for subsystem, size, change, growth in report['subsystems']])
+        self._fill_table(self.objectsTable, [(type_name, count, '{:+}'.format(change))
+                                             for type_name, count, change in report['objects']])
+
+    @staticmethod
+    def _setup_table(table, headers):
+        ''' [Private] Sets the table headers. '''
+
+        table.setColumnCount(len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        table.setEditTriggers(table.NoEditTriggers)
+
+    @staticmethod
+    def _fill_table(table, rows):
+        ''' [Private] Replaces the table content with the rows. '''
+
+        table.setRowCount(len(rows))
+
+        for row_idx, row in enumerate(rows):
+            for column_idx, value in enumerate(row):
+                table.setItem(row_idx, column_idx, QTableWidgetItem(str(value)))
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+# Form implementation generated from reading ui file 'ui/summary_panel.ui'
+#
+# Created by: PyQt5 UI code generator 5.13.1
+#
+# WARNING! All changes made in this file will be lost!
+
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+
+class Ui_SummaryPanel(object):
+    def setupUi(self, SummaryPanel):
+        SummaryPanel.setObjectName("SummaryPanel")
+        SummaryPanel.resize(600, 220)
+        self.verticalLayout = QtWidgets.QVBoxLayout(SummaryPanel)
+        self.verticalLayout.setObjectName("verticalLayout")
+        self.playersCount = QtWidgets.QLabel(SummaryPanel)
+        self.playersCount.setObjectName("playersCount")
+        self.verticalLayout.addWidget(self.playersCount)
+        self.tabWidget = QtWidgets.QTabWidget(SummaryPanel)
+        self.tabWidget.setObjectName("tabWidget")
+        self.clubsTab = QtWidgets.QWidget()
+        self.clubsTab.setObjectName("clubsTab")
+        self.clubsLayout = QtWidgets.QVBoxLayout(self.clubsTab)
+        self.clubsLayout.setObjectName("clubsLayout")
+        self.clubsTable = QtWidgets.QTableWidget(self.clubsTab)
+        self.clubsTable.setObjectName("clubsTable")
+        self.clubsTable.setColumnCount(0)
+        self.clubsTable.setRowCount(0)
+        self.clubsLayout.addWidget(self.clubsTable)
+        self.tabWidget.addTab(self.clubsTab, "")
+        self.nationalitiesTab = QtWidgets.QWidget()
+        self.nationalitiesTab.setObjectName("nationalitiesTab")
+        self.nationalitiesLayout = QtWidgets.QVBoxLayout(self.nationalitiesTab)
+        self.nationalitiesLayout.setObjectName("nationalitiesLayout")
+        self.nationalitiesTable = QtWidgets.QTableWidget(self.nationalitiesTab)
+        self.nationalitiesTable.setObjectName("nationalitiesTable")
+        self.nationalitiesTable.setColumnCount(0)
+        self.nationalitiesTable.setRowCount(0)
+        self.nationalitiesLayout.addWidget(self.nationalitiesTable)
+        self.tabWidget.addTab(self.nationalitiesTab, "")
+        self.rolesTab = QtWidgets.QWidget()
+        self.rolesTab.setObjectName("rolesTab")
+        self.rolesLayout = QtWidgets.QVBoxLayout(self.rolesTab)
+        self.rolesLayout.setObjectName("rolesLayout")
+        self.rolesTable = QtWidgets.QTableWidget(self.rolesTab)
+        self.rolesTable.setObjectName("rolesTable")
+        self.rolesTable.setColumnCount(0)
+        self.rolesTable.setRowCount(0)
+        self.rolesLayout.addWidget(self.rolesTable)
+        self.tabWidget.addTab(self.rolesTab, "")
+        self.agesTab = QtWidgets.QWidget()
+        self.agesTab.setObjectName("agesTab")
+        self.agesLayout = QtWidgets.QVBoxLayout(self.agesTab)
+        self.agesLayout.setObjectName("agesLayout")
+        self.agesTable = QtWidgets.QTableWidget(self.agesTab)
+        self.agesTable.setObjectName("agesTable")
+        self.agesTable.setColumnCount(0)
+        self.agesTable.setRowCount(0)
+        self.agesLayout.addWidget(self.agesTable)
+        self.tabWidget.addTab(self.agesTab, "")
+        self.moversTab = QtWidgets.QWidget()
+        self.moversTab.setObjectName("moversTab")
+        self.moversLayout = QtWidgets.QVBoxLayout(self.moversTab)
+        self.moversLayout.setObjectName("moversLayout")
+        self.moversTable = QtWidgets.QTableWidget(self.moversTab)
+        self.moversTable.setObjectName("moversTable")
+        self.moversTable.setColumnCount(0)
+        self.moversTable.setRowCount(0)
+        self.moversLayout.addWidget(self.moversTable)
+        self.tabWidget.addTab(self.moversTab, "")
+        self.watchTab = QtWidgets.QWidget()
+        self.watchTab.setObjectName("watchTab")
+        self.watchLayout = QtWidgets.QVBoxLayout(self.watchTab)
+        self.watchLayout.setObjectName("watchLayout")
+        self.watchStatus = QtWidgets.QLabel(self.watchTab)
+        self.watchStatus.setObjectName("watchStatus")
+        self.watchLayout.addWidget(self.watchStatus)
+        self.watchTable = QtWidgets.QTableWidget(self.watchTab)
+        self.watchTable.setObjectName("watchTable")
+        self.watchTable.setColumnCount(0)
+        self.watchTable.setRowCount(0)
+        self.watchLayout.addWidget(self.watchTable)
+        self.tabWidget.addTab(self.watchTab, "")
+        self.memoryTab = QtWidgets.QWidget()
+        self.memoryTab.setObjectName("memoryTab")
+        self.memoryLayout = QtWidgets.QVBoxLayout(self.memoryTab)
+        self.memoryLayout.setObjectName("memoryLayout")
+        self.memoryTraced = QtWidgets.QLabel(self.memoryTab)
+        self.memoryTraced.setObjectName("memoryTraced")
+        self.memoryLayout.addWidget(self.memoryTraced)
+        self.memoryTable = QtWidgets.QTableWidget(self.memoryTab)
+        self.memoryTable.setObjectName("memoryTable")
+        self.memoryTable.setColumnCount(0)
+        self.memoryTable.setRowCount(0)
+        self.memoryLayout.addWidget(self.memoryTable)
+        self.objectsTable = QtWidgets.QTableWidget(self.memoryTab)
+        self.objectsTable.setObjectName("objectsTable")
+        self.objectsTable.setColumnCount(0)
+        self.objectsTable.setRowCount(0)
+        self.memoryLayout.addWidget(self.objectsTable)
+        self.tabWidget.addTab(self.memoryTab, "")
+        self.verticalLayout.addWidget(self.tabWidget)
+
+        self.retranslateUi(SummaryPanel)
+        self.tabWidget.setCurrentIndex(0)
+        QtCore.QMetaObject.connectSlotsByName(SummaryPanel)
+
+    def retranslateUi(self, SummaryPanel):
+        _translate = QtCore.QCoreApplication.translate
+        SummaryPanel.setWindowTitle(_translate("SummaryPanel", "Сводка"))
+        self.playersCount.setText(_translate("SummaryPanel", "TextLabel"))
+        self.tabWidget.setTabText(self.tabWidget.indexOf(self.clubsTab), _translate("SummaryPanel", "Клубы"))
+        self.tabWidget.setTabText(self.tabWidget.indexOf(self.nationalitiesTab), _translate("SummaryPanel", "Национальности"))
+        self.tabWidget.setTabText(self.tabWidget.indexOf(self.rolesTab), _translate("SummaryPanel", "Роли"))
+        self.tabWidget.setTabText(self.tabWidget.indexOf(self.agesTab), _translate("SummaryPanel", "Возраст"))
+        self.tabWidget.setTabText(self.tabWidget.indexOf(self.moversTab), _translate("SummaryPanel", "Динамика"))
+        self.watchStatus.setText(_translate("SummaryPanel", "TextLabel"))
+        self.tabWidget.setTabText(self.tabWidget.indexOf(self.watchTab), _translate("SummaryPanel", "Наблюдение"))
+        self.memoryTraced.setText(_translate("SummaryPanel", "TextLabel"))
+        self.tabWidget.setTabText(self.tabWidget.indexOf(self.memoryTab), _translate("SummaryPanel", "Память"))